@@ -120,6 +120,9 @@ class PortSpawn(SpawnBase, t.Generic[T]):
         self.logger = kwargs.get('logger') or logger
         # Save serial logs to file
         self.log_file = log_file
+        # kept open by the read thread between writes, reopened if log_file was changed
+        self._log_f: t.Optional[t.IO[bytes]] = None
+        self._log_f_path = ''
 
         self._data_cache = b''
         self._line_cache = b''
@@ -183,14 +186,30 @@ class PortSpawn(SpawnBase, t.Generic[T]):
 
         if data_to_write:
             self._last_write_log_time = time.time()
-            if self.log_file:
-                with open(self.log_file, 'ab+') as f:
-                    _time_info = f'\n[{timestamp_str()}]\n'.encode()
-                    f.write(_time_info)
-                    f.write(data_to_write)
+            log_f = self._get_log_f()
+            if log_f:
+                log_f.write(f'\n[{timestamp_str()}]\n'.encode() + data_to_write)
+                # log file may be read while the port is still open
+                log_f.flush()
             else:
                 self.logger.debug(f'[{self.name}]: {to_str(data_to_write)}')
 
+    def _get_log_f(self) -> t.Optional[t.IO[bytes]]:
+        """Return the opened log file, do not reopen it for each line"""
+        log_file = self.log_file or ''
+        if self._log_f_path != log_file:
+            self._close_log_f()
+        if self._log_f is None and log_file:
+            self._log_f = open(log_file, 'ab')  # pylint: disable=consider-using-with
+            self._log_f_path = log_file
+        return self._log_f
+
+    def _close_log_f(self) -> None:
+        if self._log_f is not None:
+            self._log_f.close()
+            self._log_f = None
+        self._log_f_path = ''
+
     def _try_reconnect_after_error(self, err: Exception) -> bool:
         if self._serial_error_reconnect_count_left <= 0:
             return False
@@ -312,6 +331,7 @@ class PortSpawn(SpawnBase, t.Generic[T]):
         self.logger.debug(f'Stopping SerialSpawn {self.name}')
         self._read_thread_stop_event.set()
         self._read_thread.join()
+        self._close_log_f()
         self._read_queue.empty()
         self._rx_log_callback = None
         self._monitors = []
@@ -319,6 +339,13 @@ class PortSpawn(SpawnBase, t.Generic[T]):
         self._line_cache = b''
 
 
+@functools.lru_cache(maxsize=256)
+def _to_bytes_pattern(pattern: 're.Pattern[str]') -> 're.Pattern[bytes]':
+    """Re-compile a str regex pattern using bytes with same flags, pexpect searches the bytes buffer"""
+    re_flags = pattern.flags & (re.DOTALL | re.MULTILINE | re.IGNORECASE)
+    return re.compile(to_bytes(pattern.pattern), re_flags)
+
+
 def handle_expect_timeout(func: t.Callable) -> t.Callable:
     """Raise same type exception ExpectTimeout for ports from different frameworks"""
 
@@ -571,9 +598,8 @@ class BasePort(DataMonitorMixin, _BasePort, t.Generic[T]):  # pylint: disable=to
 
             assert isinstance(pattern, re.Pattern)
             if isinstance(pattern.pattern, str):
-                # re-compile regex pattern using bytes, with same flags
-                re_flags = pattern.flags & (re.DOTALL | re.MULTILINE | re.IGNORECASE)
-                pexpect_pattern = re.compile(to_bytes(pattern.pattern), re_flags)
+                # same str pattern is usually expected many times, reuse the bytes pattern
+                pexpect_pattern = _to_bytes_pattern(pattern)
             else:
                 pexpect_pattern = pattern
             self._pexpect_spawn.expect(pexpect_pattern, timeout=timeout)
@@ -9,6 +9,7 @@ from typing import (
     AnyStr,
     Callable,
     Dict,
+    FrozenSet,
     Generator,
     Generic,
     Iterable,
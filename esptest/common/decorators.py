@@ -1,5 +1,6 @@
 import contextlib
 import io
+import random
 import threading
 import time
 import warnings
@@ -47,11 +48,15 @@ class _NotUsedException(UserWarning):
     pass
 
 
-def retry(
+def retry(  # pylint: disable=too-many-positional-arguments,too-many-arguments
     max_retry: int = 3,
     on_result: t.Union[t.List[t.Any], t.Callable[[t.Any], bool]] = lambda x: False,
     on_exception: t.Tuple[t.Type[Exception], ...] = (_NotUsedException,),
     delay: float = 0,
+    *,
+    backoff: float = 1.0,
+    max_delay: t.Optional[float] = None,
+    jitter: float = 0.0,
 ) -> t.Callable[[GenericFunc], GenericFunc]:
     """Retry decorator
 
@@ -71,16 +76,31 @@ def retry(
         max_retry: Maximum number of total calls. Defaults to 3.
         on_result: Retry based on return value, see description above. Default: no retry on result.
         on_exception: Retry when one of these exceptions is raised. Default: no exception handled.
-        delay: Delay before next retry. Defaults to 0.
+        delay: Delay before the first retry. Defaults to 0.
+        backoff: Multiplier of the delay after each retry, 2.0 doubles it. Defaults to 1.0 (fixed delay).
+        max_delay: Upper limit of the delay before jitter is applied. Defaults to None (no limit).
+        jitter: Randomize each delay within ``[1 - jitter, 1 + jitter]`` of it, so that callers retrying
+            at the same time spread out. Defaults to 0.0.
 
     Returns:
         t.Callable[[GenericFunc], GenericFunc]: A decorator for the target function.
     """
 
     def decorator(func: GenericFunc) -> GenericFunc:
+        # own generator for the jitter, do not share the global random state
+        _random = random.Random()
+
+        def _retry_delay(attempt: int) -> float:
+            _delay = delay * backoff**attempt
+            if max_delay is not None:
+                _delay = min(_delay, max_delay)
+            if jitter:
+                _delay *= _random.uniform(1 - jitter, 1 + jitter)
+            return _delay
+
         @wraps(func)
         def wrapper(*args: t.Any, **kwargs: t.Any) -> t.Any:
-            for _ in range(max_retry - 1):
+            for attempt in range(max_retry - 1):
                 try:
                     ret = func(*args, **kwargs)
                     if isinstance(on_result, list):
@@ -94,7 +114,7 @@ def retry(
                 except on_exception as e:
                     logger.info(f'Func {func.__name__} {type(e)}: {str(e)}, retrying ...')
                 if delay:
-                    time.sleep(delay)
+                    time.sleep(_retry_delay(attempt))
             # Last retry
             return func(*args, **kwargs)
 
@@ -1,5 +1,3 @@
-import urllib.request
-
 import esptest.common.compat_typing as t
 
 from .encoding import to_str
@@ -11,6 +9,8 @@ def _is_http_url(path_or_url: str) -> bool:
 
 def _read_raw(path_or_url: str, timeout: t.Optional[float] = None) -> bytes:
     if _is_http_url(path_or_url):
+        import urllib.request  # lazy import, urllib.request is slow to import
+
         with urllib.request.urlopen(path_or_url, timeout=timeout) as response:
             return t.cast(bytes, response.read())
     with open(path_or_url, 'rb') as f:
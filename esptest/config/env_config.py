@@ -2,7 +2,8 @@ import logging
 import os
 import pathlib
 import sys
-from typing import Any, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
 
 import yaml
 
@@ -31,6 +32,15 @@ def get_variable_from_env(key: str) -> Any:
     return None
 
 
+@lru_cache(maxsize=32)
+def _load_config_file_cached(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:  # pylint: disable=unused-argument
+    """mtime_ns and size are only part of the cache key, a changed file is parsed again"""
+    with open(path, 'r', encoding='utf-8') as f:
+        raw_data = yaml.load(f.read(), Loader=yaml.FullLoader)
+    assert isinstance(raw_data, dict)
+    return raw_data
+
+
 class EnvConfig:
     """Get test environment variables from config file.
 
@@ -72,12 +82,12 @@ class EnvConfig:
         self.config_data = {}
         if self.config_file:
             if os.path.isfile(self.config_file):
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    raw_data = yaml.load(f.read(), Loader=yaml.FullLoader)
-                assert isinstance(raw_data, dict)
+                stat = os.stat(self.config_file)
+                raw_data = _load_config_file_cached(os.path.abspath(self.config_file), stat.st_mtime_ns, stat.st_size)
                 assert env_tag in raw_data
                 assert isinstance(raw_data[env_tag], dict)
-                self.config_data = raw_data[env_tag]
+                # do not hand out the cached dict
+                self.config_data = dict(raw_data[env_tag])
             elif not self.ALLOW_INPUT:
                 raise FileNotFoundError(f'Could not optn config file: {self.config_file}')
             else:
@@ -38,14 +38,16 @@ class EspPortInfo:
     target: str = 'unknown'
 
 
+# esptool CHIP_NAME -> target, built once instead of formatting names on every lookup
+_CHIP_NAME_TARGETS = {'ESP32': 'esp32'}
+_CHIP_NAME_TARGETS.update(
+    (f'ESP32-{suffix.upper()}', f'esp32{suffix}')
+    for suffix in ['s2', 's3', 's5', 's6', 'c2', 'c3', 'c5', 'c61', 'c6', 'p4', 'h2', 'h4']
+)
+
+
 def _chip_name_to_target(name: str) -> str:
-    # c61 must after c6
-    for suffix in ['s2', 's3', 's5', 's6', 'c2', 'c3', 'c5', 'c61', 'c6', 'p4', 'h2', 'h4']:
-        if name == f'ESP32-{suffix.upper()}':
-            return f'esp32{suffix}'
-    if name == 'ESP32':
-        return 'esp32'
-    return 'unknown'
+    return _CHIP_NAME_TARGETS.get(name, 'unknown')
 
 
 def _get_esp_port_info(esp: esptool.ESPLoader) -> t.Dict[str, t.Any]:
@@ -22,6 +22,29 @@ LINK_TYPE_MAP = {
     'H': 'hybrid',
 }
 
+# patterns of H3C display outputs, re.ASCII where only digits/ips/spaces are matched
+# names matched by \w may be configured with non-ASCII characters
+VLAN_ID_PATTERN = re.compile(r'VLAN ID: (\d+)', re.ASCII)
+VLAN_NAME_PATTERN = re.compile(r'Name:\s*([\S ]+)', re.ASCII)
+VLAN_IP_PATTERN = re.compile(r'IPv4 address:\s*(\d+\.\d+\.\d+\.\d+)', re.ASCII)
+VLAN_MASK_PATTERN = re.compile(r'IPv4 subnet mask:\s*(\d+\.\d+\.\d+\.\d+)', re.ASCII)
+VLAN_TYPE_PATTERN = re.compile(r'VLAN type:\s*(\w+)')
+DESCRIPTION_PATTERN = re.compile(r'Description:\s*([\S ]+)', re.ASCII)
+# all fields of "display dhcp server pool" in one scan, dispatched by match.lastgroup
+POOL_INFO_PATTERN = re.compile(
+    r'Pool name:\s*(?P<name>\w+)'
+    r'|gateway-list\s*(?P<gateway>\d+\.\d+\.\d+\.\d+)'
+    r'|Network:\s*(?P<network>\d+\.\d+\.\d+\.\d+) mask (?P<network_mask>\d+\.\d+\.\d+\.\d+)'
+    r'|mask (?P<mask>\d+\.\d+\.\d+\.\d+)'
+    r'|dns-list\s*(?P<dns>[\d\. ]+)'
+)
+INTERFACE_FULL_NAME_PATTERN = re.compile(r'interface\s+(\S+)', re.ASCII)
+INTERFACE_PERMIT_VLAN_PATTERN = re.compile(r'port trunk permit vlan\s+([\S ]+)', re.ASCII)
+INTERFACE_LINK_MODE_PATTERN = re.compile(r'port link-mode\s+(\w+)')
+IPV4_PREFIX_PATTERN = re.compile(r'\d+\.\d+\.\d+\.\d+', re.ASCII)
+POOL_NAME_LIST_PATTERN = re.compile(r'Pool name:\s*(\S+)', re.ASCII)
+STATIC_BIND_PATTERN = re.compile(r'ip-address\s+([\d\.]+)\s+mask\s+([\d\.]+)\s+hardware-address\s+(\S+)\s', re.ASCII)
+
 
 @dataclass
 class SwitchConfig:
@@ -78,24 +101,24 @@ class VlanInfo:
         Description: Server
         Name: VLAN 0001
         """
-        match = re.search(r'VLAN ID: (\d+)', line)
+        match = VLAN_ID_PATTERN.search(line)
         if not match or int(match.group(1)) != self.id:
             raise AssertionError(f'VLAN ID does not match current VLAN ID {self.id}')
         # name
-        match = re.search(r'Name:\s*([\S ]+)', line)
+        match = VLAN_NAME_PATTERN.search(line)
         assert match
         self.name = match.group(1).strip()
         # ip and mask
-        match = re.search(r'IPv4 address:\s*(\d+\.\d+\.\d+\.\d+)', line)
+        match = VLAN_IP_PATTERN.search(line)
         assert match and match.group(1) == self.ip, f'IP address does not match current IP address {self.ip}'
-        match = re.search(r'IPv4 subnet mask:\s*(\d+\.\d+\.\d+\.\d+)', line)
+        match = VLAN_MASK_PATTERN.search(line)
         assert match
         self.mask = match.group(1).strip()
         # other fields
-        match = re.search(r'VLAN type:\s*(\w+)', line)
+        match = VLAN_TYPE_PATTERN.search(line)
         if match:
             self.type = match.group(1).strip()
-        match = re.search(r'Description:\s*([\S ]+)', line)
+        match = DESCRIPTION_PATTERN.search(line)
         if match:
             self.description = match.group(1).strip()
 
@@ -125,27 +148,28 @@ class PoolInfo:
                 ip-address 10.0.0.10 mask 255.255.254.0
                 hardware-address 1122-3344-aabb ethernet
         """
-        match = re.search(r'Pool name:\s*(\w+)', output)
-        assert match, f'Failed to parse pool name from output: {output}'
-        pool_name = match.group(1).strip()
-        match = re.search(r'gateway-list\s*(\d+\.\d+\.\d+\.\d+)', output)
-        assert match, f'Failed to parse gateway from output: {output}'
-        gateway = match.group(1).strip()
-        match = re.search(r'Network:\s*(\d+\.\d+\.\d+\.\d+) mask (\d+\.\d+\.\d+\.\d+)', output)
-        if match:
-            ip = match.group(1).strip()
-            mask = match.group(2).strip()
+        # the first match of each field, the same as searching the fields one by one
+        found: t.Dict[t.Optional[str], 're.Match[str]'] = {}
+        for match in POOL_INFO_PATTERN.finditer(output):
+            found.setdefault(match.lastgroup, match)
+        assert 'name' in found, f'Failed to parse pool name from output: {output}'
+        pool_name = found['name'].group('name').strip()
+        assert 'gateway' in found, f'Failed to parse gateway from output: {output}'
+        gateway = found['gateway'].group('gateway').strip()
+        if 'network_mask' in found:
+            ip = found['network_mask'].group('network').strip()
+            mask = found['network_mask'].group('network_mask').strip()
         else:
             logger.warning(
                 f'Failed to parse network info from pool {pool_name}, trying parse ip/mask from static bindings'
             )
             ip = gateway.split(' ')[0]
-            mask_match = re.search(r'mask (\d+\.\d+\.\d+\.\d+)', output)
-            assert mask_match, f'Failed to parse ip/mask from pool: {pool_name}, Please set network config to the pool'
-            mask = mask_match.group(1).strip()
-        match = re.search(r'dns-list\s*([\d\. ]+)', output)
-        assert match
-        dns_list = match.group(1).strip()
+            assert 'mask' in found, (
+                f'Failed to parse ip/mask from pool: {pool_name}, Please set network config to the pool'
+            )
+            mask = found['mask'].group('mask').strip()
+        assert 'dns' in found
+        dns_list = found['dns'].group('dns').strip()
         return cls(pool_name, ip, mask, gateway, dns_list)
 
 
@@ -201,15 +225,15 @@ class InterfaceInfo:
         port link-aggregation group 1
         """
         # full name
-        match = re.search(r'interface\s+(\S+)', data)
+        match = INTERFACE_FULL_NAME_PATTERN.search(data)
         assert match
         self.full_name = match.group(1).strip()
         # vlan
-        match = re.search(r'port trunk permit vlan\s+([\S ]+)', data)
+        match = INTERFACE_PERMIT_VLAN_PATTERN.search(data)
         assert match
         self.permit_vlan = match.group(1).strip()
         # link mode
-        match = re.search(r'port link-mode\s+(\w+)', data)
+        match = INTERFACE_LINK_MODE_PATTERN.search(data)
         if match:
             self.link_mode = match.group(1).strip()
 
@@ -229,7 +253,7 @@ class ArpInfo:
     def parse_arp_line(cls, line: str) -> t.Optional['ArpInfo']:
         """IP address      MAC address    VLAN/VSI name Interface                Aging Type"""
         parts = line.split(maxsplit=5)
-        if len(parts) != 6 or not re.match(r'\d+\.\d+\.\d+\.\d+', parts[0]):
+        if len(parts) != 6 or not IPV4_PREFIX_PATTERN.match(parts[0]):
             return None
         ip = parts[0]
         mac = normalize_mac(parts[1])
@@ -399,7 +423,7 @@ class H3CSwitch:
         command = 'display dhcp server pool | include name'
         output = self.execute_command(command)
         self._pool_name_list = []
-        for match in re.finditer(r'Pool name:\s*(\S+)', output):
+        for match in POOL_NAME_LIST_PATTERN.finditer(output):
             pool_name = match.group(1)
             self._pool_name_list.append(pool_name)
         return self._pool_name_list
@@ -465,11 +489,10 @@ class H3CSwitch:
         if self._static_bind_info_list:
             return self._static_bind_info_list
         self._static_bind_info_list = []
-        pattern = re.compile(r'ip-address\s+([\d\.]+)\s+mask\s+([\d\.]+)\s+hardware-address\s+(\S+)\s')
         for pool in self.get_pool_name_list():
             command = f'display dhcp server pool {pool}'
             output = self.execute_command(command)
-            for match in pattern.finditer(output):
+            for match in STATIC_BIND_PATTERN.finditer(output):
                 ip_address = match.group(1)
                 mask = match.group(2)
                 hardware_address = match.group(3)
@@ -80,6 +80,28 @@ class WifiCmd:
     # wifi connected
     WIFI_CONNECTED_PATTERN = re.compile('WIFI_EVENT_STA_CONNECTED')
     GOT_IP4_PATTERN = re.compile(r'IPv4 address: ([\.\d]+)[^\.\d]')
+    # any of the above, expected by connect_to_ap
+    CONNECT_EXPECT_PATTERN = re.compile(
+        '|'.join(
+            f'(?:{p.pattern})'
+            for p in (
+                WIFI_CONNECTED_PATTERN,
+                GOT_IP4_PATTERN,
+                # Try to get more info from idf logs
+                IDF_WIFI_CONNECTED_PATTERN,
+                IDF_WIFI_CONNECTED_AP_INFO_PATTERN,
+                IDF_GOT_IP4_PATTERN,
+            )
+        )
+    )
+    # fields of IDF_WIFI_CONNECTED_PATTERN
+    IDF_AID_PATTERN = re.compile(r'aid = (\d+)')
+    IDF_CHANNEL_PATTERN = re.compile(r'channel (\d+), (\w+)?,?')
+    IDF_BSSID_PATTERN = re.compile(r'bssid = ([\w:]+)[^\w:]')
+    # commands in help text
+    HELP_SCAN_PATTERN = re.compile(r'\nscan\s+')
+    HELP_STA_SCAN_PATTERN = re.compile(r'\nsta_scan\s+')
+    ALL_DATA_PATTERN = re.compile('.*', re.DOTALL)
 
     @classmethod
     def detect_version(
@@ -101,12 +123,12 @@ class WifiCmd:
             assert dut
             dut.write(to_bytes('help\r\n'))
             time.sleep(2)
-            match = dut.expect(re.compile('.*', re.DOTALL), timeout=0)
+            match = dut.expect(cls.ALL_DATA_PATTERN, timeout=0)
             assert match
             help_text = to_str(match.group(0))
 
-        match_scan = re.search(r'\nscan\s+', help_text)
-        match_sta_scan = re.search(r'\nsta_scan\s+', help_text)
+        match_scan = cls.HELP_SCAN_PATTERN.search(help_text)
+        match_sta_scan = cls.HELP_STA_SCAN_PATTERN.search(help_text)
 
         version = cls.VERSION
         if not match_sta_scan:
@@ -174,22 +196,6 @@ class WifiCmd:
         """
         sta_dut.write_line(conn_cmd)
 
-        all_expect = re.compile(
-            '|'.join(
-                [
-                    f'(?:{p.pattern})'
-                    for p in [
-                        cls.WIFI_CONNECTED_PATTERN,
-                        cls.GOT_IP4_PATTERN,
-                        # Try to get more info from idf logs
-                        cls.IDF_WIFI_CONNECTED_PATTERN,
-                        cls.IDF_WIFI_CONNECTED_AP_INFO_PATTERN,
-                        cls.IDF_GOT_IP4_PATTERN,
-                    ]
-                ]
-            )
-        )
-
         t0 = time.perf_counter()
 
         connected_info = ConnectedInfo(ssid=conn_cmd.split()[1])
@@ -197,7 +203,7 @@ class WifiCmd:
         got_ip4 = False
         while time.perf_counter() - t0 < timeout:
             time_left = t0 + timeout - time.perf_counter()
-            match = sta_dut.expect(all_expect, timeout=time_left)
+            match = sta_dut.expect(cls.CONNECT_EXPECT_PATTERN, timeout=time_left)
             assert match
             data = to_str(match.group(0))
             logger.debug(f'Matched data: {data}')
@@ -220,15 +226,15 @@ class WifiCmd:
                 got_ip4 = True
             # Parse extra connection info from IDF wifi log
             elif cls.IDF_WIFI_CONNECTED_PATTERN.match(data):
-                _match = re.search(r'aid = (\d+)', data)
+                _match = cls.IDF_AID_PATTERN.search(data)
                 if _match:
                     connected_info.aid = int(_match.group(1))
-                _match = re.search(r'channel (\d+), (\w+)?,?', data)
+                _match = cls.IDF_CHANNEL_PATTERN.search(data)
                 if _match:
                     connected_info.channel = int(_match.group(1))
                     if _match.group(2):
                         connected_info.bandwidth = _match.group(2)
-                _match = re.search(r'bssid = ([\w:]+)[^\w:]', data)
+                _match = cls.IDF_BSSID_PATTERN.search(data)
                 if _match:
                     connected_info.bssid = _match.group(1)
             elif cls.IDF_WIFI_CONNECTED_AP_INFO_PATTERN.match(data):
@@ -133,12 +133,17 @@ class IperfResultsRecord:
         self._targets.add(result.target)
         self._types.add(result.type)
 
+    def extend_results(self, results: t.Iterable[IperfResult]) -> None:
+        """Append many results at once, the ap/target/type sets are updated once per batch"""
+        new_results = list(results)
+        self._results.extend(new_results)
+        self._aps.update(r.ap_name for r in new_results)
+        self._targets.update(r.target for r in new_results)
+        self._types.update(r.type for r in new_results)
+
     def part(self, filter_fn: t.Callable[[IperfResult], bool]) -> 't.Self':
         new_record = self.__class__()
-        for result in self._results:
-            if filter_fn(result):
-                continue
-            new_record.append_result(result)
+        new_record.extend_results(result for result in self._results if not filter_fn(result))
         return new_record
 
     def _dict_by_key(
@@ -24,6 +24,9 @@ class IperfDataParser:
         self._parse_data()
 
     def _parse_data(self) -> None:
+        if 'bits/sec' not in self.raw_data:
+            # no bandwidth report at all, do not scan the whole log with both patterns
+            raise ValueError('Can not parse data!')
         match_list = list(self.PC_BANDWIDTH_LOG_PATTERN.finditer(self.raw_data))
         if not match_list:
             # failed to find raw data by PC pattern, it might be DUT pattern
@@ -1,3 +1,7 @@
+import array
+import base64
+import itertools
+import sys
 from typing import TYPE_CHECKING
 
 import esptest.common.compat_typing as t
@@ -48,9 +52,42 @@ def _calculate_adjacent_diffs(series_data: t.Sequence[t.Union[int, float, None]]
     return diffs
 
 
+def _series_columns(
+    y_data: t.Sequence[YVarType], y_names: t.Sequence[str]
+) -> t.List[t.List[t.Union[int, float, None]]]:
+    """Split rows of {name: value} into one column per name, the columns are shared by legends and tooltips."""
+    return [[y[name] for y in y_data] for name in y_names]  # type: ignore
+
+
+def _max_min_legend(series_data: t.Sequence[t.Union[int, float, None]]) -> str:
+    """Get the ' (max: x, min: y)' legend suffix in one pass, skipping None values."""
+    max_value: t.Optional[t.Union[int, float]] = None
+    min_value: t.Optional[t.Union[int, float]] = None
+    for value in series_data:
+        if value is None:
+            continue
+        if not isinstance(value, (int, float)):
+            return ''
+        if max_value is None or value > max_value:
+            max_value = value
+        if min_value is None or value < min_value:
+            min_value = value
+    if max_value is None:
+        return ''
+    return f' (max: {max_value}, min: {min_value})'
+
+
+def _pack_float32_base64(rows: t.Sequence[t.Sequence[t.Union[int, float]]]) -> str:
+    """Pack rows of numbers as little-endian float32 and encode with base64, for JS Float32Array."""
+    packed = array.array('f', itertools.chain.from_iterable(rows))
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return base64.b64encode(packed.tobytes()).decode('ascii')
+
+
 @enhance_import_error_message('please install pyecharts or "pip install esp-test-utils[all]"')
 def _create_tooltip_options(
-    show_diff_tooltip: bool, y_data: t.Sequence[YVarType], y_names: t.List[str]
+    show_diff_tooltip: bool, columns: t.Sequence[t.Sequence[t.Union[int, float, None]]]
 ) -> 'opts.TooltipOpts':
     """
     create tooltip for auto calculate diff value by mouseover
@@ -61,52 +98,64 @@ def _create_tooltip_options(
 
     # Create tooltip with diff display
     if show_diff_tooltip:
-        assert y_data and y_names, 'y_data and y_names must be provided'
-        all_diffs = []
-        assert all(isinstance(y, dict) for y in y_data)
-        for name in y_names:
-            values: t.Sequence[t.Union[int, float, None]] = [y[name] for y in y_data]  # type: ignore
+        assert columns and columns[0], 'columns must be provided'
+        data_len = len(columns[0])
+        all_diffs: t.List[t.List[t.Union[int, float]]] = []
+        for values in columns:
+            if len(values) < 2 or all(v is None for v in values):
+                # nothing to compare
+                all_diffs.append([0] * len(values))
+                continue
             all_diffs.append(_calculate_adjacent_diffs(values))
+        # embed diffs as base64 packed float32, the browser decodes them only once
+        diffs_b64 = _pack_float32_base64(all_diffs)
         formatter = f"""
-            function(params) {{
-                var alldiffs = {all_diffs};
-                var tooltip = '<div style="padding: 10px;">';
-                tooltip += '<b>X: ' + params[0].axisValue + '</b><br/>';
-                if (Array.isArray(params)) {{
-                    for (var i = 0; i < params.length; i++) {{
-                        var param = params[i];
-                        var seriesIndex = param.seriesIndex;
-                        var seriesName = param.seriesName;
-                        var seriesColor = param.color || '#2E86DE';
-                        var diffs = alldiffs[seriesIndex];
-                        var dataIndex = param.dataIndex;
-                        var yValue = Array.isArray(param.value) ? param.value[1] : param.value;
-
-                        if (yValue === null || yValue === undefined) {{
-                            tooltip += '<span style="color: ' + seriesColor + ';">●</span> ' + seriesName;
-                            tooltip += ': <b>N/A</b><br/>';
-                            continue;
-                        }}
-
-                        var diff = diffs[dataIndex];
-                        var diffStr = diff >= 0 ? '+' + diff.toFixed(2) : diff.toFixed(2);
-                        var diffColor = diff >= 0 ? '#52c41a' : '#f5222d';
-                        var diffIcon = diff >= 0 ? '▲' : '▼';
-
-                        tooltip += '<span style="color: ' + seriesColor + ';">●</span> ' + seriesName + ': <b>';
-                        tooltip += '<span style="display:inline-block;min-width:70px;">';
-                        tooltip += yValue.toFixed(2) + '</span></b> ';
-
-                        if (dataIndex > 0 && diff !== 0) {{
-                            tooltip += '<span style="color: ' + diffColor + ';">' + diffIcon + '</span> ';
-                            tooltip += '<span style="color:' + diffColor + '"><b>' + diffStr + '</b></span>';
+            (function() {{
+                var buf = Uint8Array.from(atob('{diffs_b64}'), function(c) {{ return c.charCodeAt(0); }});
+                var flat = new Float32Array(buf.buffer);
+                var alldiffs = [];
+                for (var k = 0; k < {len(all_diffs)}; k++) {{
+                    alldiffs.push(flat.subarray(k * {data_len}, (k + 1) * {data_len}));
+                }}
+                return function(params) {{
+                    var tooltip = '<div style="padding: 10px;">';
+                    tooltip += '<b>X: ' + params[0].axisValue + '</b><br/>';
+                    if (Array.isArray(params)) {{
+                        for (var i = 0; i < params.length; i++) {{
+                            var param = params[i];
+                            var seriesIndex = param.seriesIndex;
+                            var seriesName = param.seriesName;
+                            var seriesColor = param.color || '#2E86DE';
+                            var diffs = alldiffs[seriesIndex];
+                            var dataIndex = param.dataIndex;
+                            var yValue = Array.isArray(param.value) ? param.value[1] : param.value;
+
+                            if (yValue === null || yValue === undefined) {{
+                                tooltip += '<span style="color: ' + seriesColor + ';">●</span> ' + seriesName;
+                                tooltip += ': <b>N/A</b><br/>';
+                                continue;
+                            }}
+
+                            var diff = diffs[dataIndex];
+                            var diffStr = diff >= 0 ? '+' + diff.toFixed(2) : diff.toFixed(2);
+                            var diffColor = diff >= 0 ? '#52c41a' : '#f5222d';
+                            var diffIcon = diff >= 0 ? '▲' : '▼';
+
+                            tooltip += '<span style="color: ' + seriesColor + ';">●</span> ' + seriesName + ': <b>';
+                            tooltip += '<span style="display:inline-block;min-width:70px;">';
+                            tooltip += yValue.toFixed(2) + '</span></b> ';
+
+                            if (dataIndex > 0 && diff !== 0) {{
+                                tooltip += '<span style="color: ' + diffColor + ';">' + diffIcon + '</span> ';
+                                tooltip += '<span style="color:' + diffColor + '"><b>' + diffStr + '</b></span>';
+                            }}
+                            tooltip += '<br/>';
                         }}
-                        tooltip += '<br/>';
                     }}
-                }}
-                tooltip += '</div>';
-                return tooltip;
-            }}
+                    tooltip += '</div>';
+                    return tooltip;
+                }};
+            }})()
         """
         tooltip_opts_obj = opts.TooltipOpts(
             trigger='axis',
@@ -191,12 +240,10 @@ def draw_line_chart_basic(  # pylint: disable=too-many-positional-arguments,too-
     assert len(x_data) == len(y_data)
 
     x_type = 'value'
-    for x in x_data:
-        if isinstance(x, str):
-            x_type = 'category'
-            break
-    if x_type == 'category':
-        x_data = list(map(str, x_data))
+    if any(isinstance(x, str) for x in x_data):
+        x_type = 'category'
+        if not all(isinstance(x, str) for x in x_data):
+            x_data = list(map(str, x_data))
 
     line.add_xaxis(x_data)
 
@@ -207,15 +254,10 @@ def draw_line_chart_basic(  # pylint: disable=too-many-positional-arguments,too-
     # Collect all series data and calculate diffs
     assert isinstance(y_data[0], dict)
     y_names: t.List[str] = list(y_data[0].keys())
-    for name in y_names:
-        legend = name
-        _data: t.Sequence[t.Union[int, float, None]] = [y[name] for y in y_data]  # type: ignore
-        # Remove None values before calculating max/min, as pyecharts supports
-        # Calculate diffs for this series
-        _data_except_none = [y for y in _data if y is not None]
-        if all((isinstance(y, (int, float)) for y in _data_except_none)):
-            # show max/min
-            legend += f' (max: {max(_data_except_none)}, min: {min(_data_except_none)})'
+    columns = _series_columns(y_data, y_names)
+    for name, _data in zip(y_names, columns):
+        # show max/min, None values are skipped as pyecharts supports them
+        legend = name + _max_min_legend(_data)
         line.add_yaxis(legend, _data, is_connect_nones=True, is_smooth=True)
 
     # create axis
@@ -226,7 +268,7 @@ def draw_line_chart_basic(  # pylint: disable=too-many-positional-arguments,too-
         datazoom_opts=opts.DataZoomOpts(range_start=0, range_end=100),
         title_opts=opts.TitleOpts(title=title, pos_left='center'),
         legend_opts=opts.LegendOpts(pos_top='10%', pos_left='right', orient='vertical'),
-        tooltip_opts=_create_tooltip_options(show_diff_tooltip, y_data, y_names),
+        tooltip_opts=_create_tooltip_options(show_diff_tooltip, columns),
         xaxis_opts=xaxis_opts,
         yaxis_opts=yaxis_opts,
         toolbox_opts=opts.ToolboxOpts(
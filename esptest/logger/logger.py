@@ -1,8 +1,10 @@
 import logging
+from functools import lru_cache
 
 module_logger = logging.getLogger('esptest')
 
 
+@lru_cache(maxsize=None)
 def get_logger(suffix: str = '') -> logging.Logger:
     """get a child logger from esptest, returning the parent logger if suffix is not given."""
     if not suffix:
@@ -25,4 +27,7 @@ class MultiLineFormatter(logging.Formatter):
 
     def format(self, record: logging.LogRecord) -> str:
         s = super().format(record)
+        # most records are single line, skip replace for them
+        if '\n' not in s:
+            return s
         return s.replace('\n', '\n    ')
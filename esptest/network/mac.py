@@ -1,8 +1,14 @@
+# translation table to remove all MAC separators in one pass
+_MAC_SEPARATORS = str.maketrans('', '', ':-.')
+_MAC_MASK = (1 << 48) - 1
+
+
 def mac_offset(mac_address: str, offset: int) -> str:
-    mac_int = int(mac_address.replace(':', ''), 16)
-    new_mac_int = mac_int + offset
-    new_mac_address = f'{new_mac_int:012x}'
-    return ':'.join(new_mac_address[i : i + 2] for i in range(0, len(new_mac_address), 2))
+    mac_int = int(mac_address.translate(_MAC_SEPARATORS), 16)
+    # wrap around within 48 bits, also for negative offsets
+    new_mac_int = (mac_int + offset) & _MAC_MASK
+    m = f'{new_mac_int:012x}'
+    return f'{m[0:2]}:{m[2:4]}:{m[4:6]}:{m[6:8]}:{m[8:10]}:{m[10:12]}'
 
 
 def normalize_mac(mac: str) -> str:
@@ -12,10 +18,11 @@ def normalize_mac(mac: str) -> str:
     Output: XX:XX:XX:XX:XX:XX (uppercase)
     """
     # Remove all separators
-    mac_clean = mac.replace(':', '').replace('-', '').replace('.', '').upper()
+    mac_clean = mac.translate(_MAC_SEPARATORS).upper()
     if len(mac_clean) != 12:
         raise ValueError(f'Invalid MAC address: {mac}')
-    return ':'.join([mac_clean[i : i + 2] for i in range(0, 12, 2)])
+    c = mac_clean
+    return f'{c[0:2]}:{c[2:4]}:{c[4:6]}:{c[6:8]}:{c[8:10]}:{c[10:12]}'
 
 
 def format_mac_to_h3c(mac: str) -> str:
@@ -25,7 +32,7 @@ def format_mac_to_h3c(mac: str) -> str:
     Output format: xxxx-xxxx-xxxx (lowercase)
     """
     # Remove all separators
-    mac_clean = mac.replace(':', '').replace('-', '').replace('.', '').lower()
+    mac_clean = mac.translate(_MAC_SEPARATORS).lower()
     if len(mac_clean) != 12:
         raise ValueError(f'Invalid MAC address: {mac}')
     return f'{mac_clean[0:4]}-{mac_clean[4:8]}-{mac_clean[8:12]}'
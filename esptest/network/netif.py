@@ -1,10 +1,10 @@
 import ipaddress
 import socket
 import sys
+import time
+from functools import lru_cache
 from socket import AddressFamily  # type hint
-from typing import Iterator, List
-
-import psutil
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
 
 from ..logger import get_logger
 from .mac import normalize_mac
@@ -16,6 +16,67 @@ from .mac import normalize_mac
 
 logger = get_logger('network')
 
+# psutil.net_if_addrs() enumerates every NIC, reuse the result for a short time
+_IF_ADDRS_CACHE_TTL = 0.5
+_if_addrs_cache: Tuple[float, Dict[str, list]] = (0.0, {})
+# (if_addrs snapshot, {interface: mac}, {mac: interface}), rebuilt when the snapshot changes
+_if_mac_maps: Tuple[Dict[str, list], Dict[str, str], Dict[str, str]] = ({}, {}, {})
+
+
+def _cached_if_addrs() -> Dict[str, list]:
+    """Get psutil.net_if_addrs(), reusing the previous result if it is not expired."""
+    global _if_addrs_cache  # pylint: disable=global-statement
+    ts, if_addrs = _if_addrs_cache
+    now = time.monotonic()
+    if if_addrs and now - ts < _IF_ADDRS_CACHE_TTL:
+        return if_addrs
+    import psutil  # lazy import, psutil is slow to initialize
+
+    if_addrs = psutil.net_if_addrs()
+    _if_addrs_cache = (now, if_addrs)
+    return if_addrs
+
+
+def invalidate_if_addrs_cache() -> None:
+    """Drop the cached interface addresses, eg: after interfaces are reconfigured."""
+    global _if_addrs_cache, _if_mac_maps  # pylint: disable=global-statement
+    _if_addrs_cache = (0.0, {})
+    _if_mac_maps = ({}, {}, {})
+
+
+def _cached_mac_maps() -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Get ({interface: mac}, {mac: interface}) of the cached interface addresses, macs are normalized lower case."""
+    global _if_mac_maps  # pylint: disable=global-statement
+    if_addrs = _cached_if_addrs()
+    snapshot, if_to_mac, mac_to_if = _if_mac_maps
+    if snapshot is if_addrs:
+        return if_to_mac, mac_to_if
+    import psutil
+
+    mac_family = psutil.AF_LINK if sys.platform == 'win32' else socket.AF_PACKET
+    if_to_mac, mac_to_if = {}, {}
+    for interface, addrs in if_addrs.items():
+        for addr in addrs:
+            if addr.family != mac_family:
+                continue
+            try:
+                mac = normalize_mac(addr.address).lower()
+            except ValueError:
+                continue  # eg: tunnel interfaces with longer hardware address
+            # the first mac address of an interface / first interface of a mac wins, as the lookups always did
+            if_to_mac.setdefault(interface, mac)
+            mac_to_if.setdefault(mac, interface)
+    _if_mac_maps = (if_addrs, if_to_mac, mac_to_if)
+    return if_to_mac, mac_to_if
+
+
+def _select_if_addrs(interface: str = '') -> Iterable[list]:
+    """Get address lists of the given interface, or of all interfaces if interface is not given."""
+    addrs_map = _cached_if_addrs()
+    if interface:
+        return [addrs_map[interface]] if interface in addrs_map else []
+    return addrs_map.values()
+
 
 def _compatible_ipv6_address(address: str) -> str:
     """Remove the zone/index suffix from an IPv6 address (e.g. '%eth0') for older python versions."""
@@ -25,13 +86,42 @@ def _compatible_ipv6_address(address: str) -> str:
     return address
 
 
+def _netmask_to_prefix_len(netmask: str) -> int:
+    """Count the set bits of a netmask, eg: 'ffff:ffff:ffff:ffff::' -> 64."""
+    mask_int = int(ipaddress.ip_address(netmask))
+    if sys.version_info >= (3, 10):
+        return mask_int.bit_count()
+    return bin(mask_int).count('1')
+
+
+@lru_cache(maxsize=256)
+def _ip_network(network: str) -> Union[ipaddress.IPv4Network, ipaddress.IPv6Network]:
+    """Parse the network string only once for repeated membership checks."""
+    return ipaddress.ip_network(network, strict=False)
+
+
 def get_interfaces() -> List[str]:
     """Get all network interfaces names.
 
     Returns:
         List[str]: interface names
     """
-    return list(psutil.net_if_addrs().keys())
+    return list(_cached_if_addrs().keys())
+
+
+def _is_loopback_or_link_local(address: str, family: AddressFamily) -> bool:
+    """Check loopback or link-local address by prefix, psutil always gives the compressed format."""
+    if family == socket.AF_INET:
+        # '127.x.x.x', '169.254.x.x'
+        return address.startswith(('127.', '169.254.'))
+    if family == socket.AF_INET6:
+        # '::1', 'fe80::/10'
+        if address == '::1':
+            return True
+        first_group = address.split(':', 1)[0]
+        return len(first_group) == 4 and first_group[:3].lower() in ('fe8', 'fe9', 'fea', 'feb')
+    _ip = ipaddress.ip_address(_compatible_ipv6_address(address))
+    return _ip.is_loopback or _ip.is_link_local
 
 
 def get_all_ips_from_interface(interface: str, family: AddressFamily = socket.AF_INET, prefix: str = '') -> List[str]:
@@ -48,26 +138,23 @@ def get_all_ips_from_interface(interface: str, family: AddressFamily = socket.AF
     Returns:
         List[str]: IP addresses from the interface
     """
-    addr_list = []
-    for if_name, addrs in psutil.net_if_addrs().items():
-        if interface and if_name != interface:
-            continue
+    preferred: List[str] = []
+    deferred: List[str] = []
+    for addrs in _select_if_addrs(interface):
         for addr in addrs:
             if addr.family != family:
                 continue
-            _ip = ipaddress.ip_address(_compatible_ipv6_address(addr.address))
             if prefix and not addr.address.startswith(prefix):
                 continue
             # Sort all available IP addresses.
-            # Put private ip4 or link-local ipv6 to the last
-            if _ip.is_loopback:
-                # Do not ignore loopback addresses
-                addr_list.append(addr.address)
-            elif _ip.is_link_local:
-                # '169.254.x.x', 'fe80::'
-                addr_list.append(addr.address)
+            # Put loopback or link-local addresses to the last, do not ignore them
+            if _is_loopback_or_link_local(addr.address, family):
+                deferred.append(addr.address)
             else:
-                addr_list.insert(0, addr.address)
+                preferred.append(addr.address)
+    # preferred addresses are returned in reverse enumeration order, as they always were
+    preferred.reverse()
+    addr_list = preferred + deferred
     if not addr_list:
         raise ValueError(f'Can not get IP address from interface {interface}')
     return addr_list
@@ -132,7 +219,7 @@ def ip_in_network(ip: str, network: str) -> bool:
     Returns:
         bool: True if the IP address is in the network
     """
-    return ipaddress.ip_address(ip) in ipaddress.ip_network(network, strict=False)
+    return ipaddress.ip_address(ip) in _ip_network(network)
 
 
 def guess_local_ip6(
@@ -149,22 +236,20 @@ def guess_local_ip6(
         Iterator[str]: possible IP addresses (eg: fe80::2%eth0) that may connect to the given to_addr.
     """
     target = ipaddress.ip_address(_compatible_ipv6_address(to_addr))
+    target_is_global = target.is_global
 
-    for if_name, addrs in psutil.net_if_addrs().items():
-        if interface and if_name != interface:
-            continue
+    for addrs in _select_if_addrs(interface):
         for addr in addrs:
             if addr.family != socket.AF_INET6:
                 continue
-            _ip = ipaddress.ip_address(_compatible_ipv6_address(addr.address))
-            assert addr.netmask
-            _mask_len = bin(int(ipaddress.ip_address(addr.netmask))).count('1')
             base_addr = _compatible_ipv6_address(addr.address)
-            _net = ipaddress.ip_network(f'{base_addr}/{_mask_len}', strict=False)
-            if target in _net:
+            # If target is global address, any global local address may connect to it
+            if target_is_global and ipaddress.ip_address(base_addr).is_global:
                 yield addr.address
-            # If target is global address, do not check
-            if target.is_global and _ip.is_global:
+                continue
+            assert addr.netmask
+            _mask_len = _netmask_to_prefix_len(addr.netmask)
+            if target in _ip_network(f'{base_addr}/{_mask_len}'):
                 yield addr.address
 
 
@@ -177,19 +262,11 @@ def get_mac_by_interface(interface: str) -> str:
     Returns:
         str: mac address (lower case)
     """
-    if_addrs = psutil.net_if_addrs()
-    mac_addr = ''
-    for addr in if_addrs[interface]:
-        if sys.platform == 'win32':
-            if addr.family == psutil.AF_LINK:
-                assert isinstance(addr.address, str)
-                mac_addr = addr.address
-        else:
-            if addr.family == socket.AF_PACKET:
-                assert isinstance(addr.address, str)
-                mac_addr = addr.address
-    if mac_addr:
-        return normalize_mac(mac_addr).lower()
+    if_to_mac, _ = _cached_mac_maps()
+    if interface in if_to_mac:
+        return if_to_mac[interface]
+    # unknown interface raises KeyError, known interface without mac address raises ValueError
+    _cached_if_addrs()[interface]  # pylint: disable=expression-not-assigned
     raise ValueError(f'Failed to get addr info from {interface}')
 
 
@@ -202,16 +279,8 @@ def get_interface_by_mac(mac_addr: str) -> str:
     Returns:
         str: network interface name
     """
-    for interface, addrs in psutil.net_if_addrs().items():
-        for addr in addrs:
-            if sys.platform == 'win32':
-                if addr.family != psutil.AF_LINK:
-                    continue
-            else:
-                if addr.family != socket.AF_PACKET:
-                    continue
-
-            if normalize_mac(addr.address).lower() == mac_addr.lower():
-                assert isinstance(interface, str)
-                return interface
+    _, mac_to_if = _cached_mac_maps()
+    interface = mac_to_if.get(normalize_mac(mac_addr).lower())
+    if interface is not None:
+        return interface
     raise ValueError(f'Failed to get interface with mac {mac_addr}')
@@ -1,8 +1,9 @@
 import re
+import shlex
 import shutil
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
-from itertools import permutations
 
 from ..common import compat_typing as t
 from ..common.decorators import enhance_import_error_message
@@ -10,6 +11,16 @@ from ..common.shell import run_cmd
 from ..logger import get_logger
 
 logger = get_logger('wnic')
+FREQUENCY_CHANNEL_PATTERN = re.compile(r'MHz \[(\d+)\]')
+CAPTURE_START_TIMEOUT = 1.0
+# channel flags of "iw phy info" frequency lines, eg: "(no IR, radar detection)"
+CHANNEL_FLAGS_PATTERN = re.compile(r'radar detection|disabled|no IR')
+
+
+@lru_cache(maxsize=None)
+def _which(name: str) -> str:
+    """Cached shutil.which, network tools are not expected to change at runtime."""
+    return shutil.which(name) or ''
 
 
 class Nic:
@@ -21,32 +32,44 @@ class Nic:
         self.iface_down()
         self.iface_up()
 
+    def _link_args(self, state: str) -> t.List[str]:
+        """Get args to set interface state: up or down"""
+        if _which('ifconfig'):
+            return ['ifconfig', self.iface, state]
+        return ['ip', 'link', 'set', self.iface, state]
+
     def iface_up(self, sudo: bool = True) -> None:
-        args = []
-        if shutil.which('ifconfig'):
-            args = ['ifconfig', self.iface, 'up']
-        else:
-            args = ['ip', 'link', 'set', self.iface, 'up']
+        args = self._link_args('up')
         if sudo:
             args = ['sudo'] + args
         run_cmd(args)
 
     def iface_down(self, sudo: bool = True) -> None:
-        args = []
-        if shutil.which('ifconfig'):
-            args = ['ifconfig', self.iface, 'down']
-        else:
-            args = ['ip', 'link', 'set', self.iface, 'down']
+        args = self._link_args('down')
         if sudo:
             args = ['sudo'] + args
         run_cmd(args)
 
+    @staticmethod
+    def run_batch(cmds: t.Sequence[t.Union[str, t.List[str]]], sudo: bool = True) -> str:
+        """Run commands in one shell process, stop at the first failed command.
+
+        Args:
+            cmds: commands args, or raw shell command strings
+            sudo (bool, optional): run the shell with sudo. Defaults to True.
+        """
+        script = ' && '.join(cmd if isinstance(cmd, str) else ' '.join(shlex.quote(arg) for arg in cmd) for cmd in cmds)
+        args = ['sh', '-c', script]
+        if sudo:
+            args = ['sudo'] + args
+        return run_cmd(args)
+
     def dhcp_start(self, sudo: bool = True) -> None:
         args = []
-        if shutil.which('dhclient'):
+        if _which('dhclient'):
             # args = ['dhclient', '-nw', 'eth0']
             args = ['dhclient', self.iface]
-        elif shutil.which('dhcpcd'):
+        elif _which('dhcpcd'):
             args = ['dhcpcd', '-G', self.iface, '-t', '15']
         else:
             raise NotImplementedError()
@@ -75,9 +98,19 @@ class Nic:
             logger.warning('start capture without filter! This may cause a large memory usage!')
             logger.warning('filter syntax Ref: https://biot.com/capstats/bpf.html')
             # kwargs["filter"] = "wlan src c4:4f:33:16:f9:49 or wlan src 30:ae:a4:80:62:2c"
-        self.sniffer = AsyncSniffer(iface=self.iface, **kwargs)
+        started = threading.Event()
+        user_started_callback = kwargs.pop('started_callback', None)
+
+        def _on_started():  # type: ignore
+            if user_started_callback:
+                user_started_callback()
+            started.set()
+
+        self.sniffer = AsyncSniffer(iface=self.iface, started_callback=_on_started, **kwargs)
         self.sniffer.start()
-        time.sleep(1)  # make sure the operation work
+        # scapy calls started_callback once the sniffing sockets are opened
+        if not started.wait(CAPTURE_START_TIMEOUT):
+            logger.warning(f'capture on {self.iface} is not started in {CAPTURE_START_TIMEOUT}s')
 
     @enhance_import_error_message('please install scapy or "pip install esp-test-utils[all]"')
     def stop_capture(self, join=True):  # type: ignore
@@ -92,6 +125,10 @@ class WiFiNic(Nic):  # pylint: disable=too-many-public-methods
     def __init__(self, iface: str) -> None:
         super().__init__(iface)
         self.phy = self._get_phy()
+        # parsed from phy_info on first use, instances are reused by _cached()
+        self._phy_info: t.Optional[t.Tuple[t.List[str], t.Dict[str, t.Set[int]], bool]] = None
+        self._send_channels: t.Optional[t.FrozenSet[int]] = None
+        self._capture_channels: t.Optional[t.FrozenSet[int]] = None
 
     def reset_nic(self) -> None:
         self.iface_down()
@@ -113,78 +150,94 @@ class WiFiNic(Nic):  # pylint: disable=too-many-public-methods
         return self.get_phy_info(self.phy)
 
     @property
-    @lru_cache(maxsize=1)
-    def supported_modes(self) -> t.List[str]:
-        modes = []
-        _start = False
-        for line in self.phy_info.splitlines():
-            if 'Supported interface modes' in line:
-                _start = True
-                continue
-            if _start:
-                if not line.strip().startswith('*'):
-                    # there's only one line include "Supported interface modes"
-                    break
-                modes.append(line.replace('*', '').strip())
-        return modes
-
-    def is_ap_supported(self) -> bool:
-        return 'AP' in self.supported_modes
-
-    def is_he_supported(self) -> bool:
-        return 'HTC HE Supported' in self.phy_info
-
-    @property
-    @lru_cache(maxsize=1)
-    def channels(self) -> t.Dict[str, t.Set[int]]:
+    def _parsed_phy_info(self) -> t.Tuple[t.List[str], t.Dict[str, t.Set[int]], bool]:
+        if self._phy_info is None:
+            self._phy_info = self._parse_phy_info()
+        return self._phy_info
+
+    def _parse_phy_info(self) -> t.Tuple[t.List[str], t.Dict[str, t.Set[int]], bool]:
+        """Parse supported modes, channels and HE support from phy info in one pass."""
+        modes: t.List[str] = []
         channels: t.Dict[str, t.Set[int]] = {
             'all': set(),
             'radar detection': set(),
             'disabled': set(),
             'no IR': set(),
         }
-        _start = False
+        he_supported = False
+        section = ''
         for line in self.phy_info.splitlines():
+            if 'HTC HE Supported' in line:
+                he_supported = True
+            if 'Supported interface modes' in line:
+                section = 'modes'
+                continue
             if 'Frequencies' in line:
-                _start = True
+                section = 'frequencies'
                 continue
-            if _start:
-                match = re.search(r'MHz \[(\d+)\]', line)
+            if section == 'modes':
+                if not line.strip().startswith('*'):
+                    # there's only one line include "Supported interface modes"
+                    section = ''
+                    continue
+                modes.append(line.replace('*', '').strip())
+            elif section == 'frequencies':
+                match = FREQUENCY_CHANNEL_PATTERN.search(line)
                 if not line.strip().startswith('*') or not match:
                     # continue for 5G Frequencies
-                    _start = False
+                    section = ''
                     continue
                 cur_ch = int(match.group(1))
                 channels['all'].add(cur_ch)
-                for typ, val in channels.items():
-                    if typ in line:
-                        val.add(cur_ch)
-        return channels
+                # all flags in one scan of the line
+                for flag in CHANNEL_FLAGS_PATTERN.findall(line, match.end()):
+                    channels[flag].add(cur_ch)
+        return modes, channels, he_supported
 
     @property
-    def send_channels(self) -> t.List[int]:
-        _disabled_chs = self.channels['radar detection'] | self.channels['disabled'] | self.channels['no IR']
-        ch_set = self.channels['all'].difference(_disabled_chs)
-        return list(ch_set)
+    def supported_modes(self) -> t.List[str]:
+        return self._parsed_phy_info[0]
+
+    def is_ap_supported(self) -> bool:
+        return 'AP' in self.supported_modes
+
+    def is_he_supported(self) -> bool:
+        return self._parsed_phy_info[2]
+
+    @property
+    def channels(self) -> t.Dict[str, t.Set[int]]:
+        return self._parsed_phy_info[1]
+
+    # frozensets cached per instance: "channel in send_channels" without rebuilding the set
+    @property
+    def send_channels(self) -> t.FrozenSet[int]:
+        if self._send_channels is None:
+            _disabled_chs = self.channels['radar detection'] | self.channels['disabled'] | self.channels['no IR']
+            self._send_channels = frozenset(self.channels['all'].difference(_disabled_chs))
+        return self._send_channels
 
     @property
-    def capture_channels(self) -> t.List[int]:
-        ch_set = self.channels['all'].difference(self.channels['disabled'])
-        return list(ch_set)
+    def capture_channels(self) -> t.FrozenSet[int]:
+        if self._capture_channels is None:
+            self._capture_channels = frozenset(self.channels['all'].difference(self.channels['disabled']))
+        return self._capture_channels
 
     def iw_set_type(self, if_type: str) -> None:
         """Set interface type: managed, monitor, etc..."""
         args = ['sudo', 'iw', 'dev', self.iface, 'set', 'type', if_type]
         run_cmd(args)
 
-    def set_channel(self, channel: int, bw: str = '') -> None:
-        """Start wifi nic channel, bw can be ``[NOHT|HT20|HT40+|HT40-|5MHz|10MHz|80MHz]``"""
-        args = ['sudo', 'iw', 'dev', self.iface, 'set', 'channel', str(channel)]
+    def _channel_args(self, channel: int, bw: str = '') -> t.List[str]:
+        args = ['iw', 'dev', self.iface, 'set', 'channel', str(channel)]
         if bw:
             args += [bw]
-        run_cmd(args)
+        return args
 
-    def set_rate(self, rate: float, short_gi: bool = False) -> None:
+    def set_channel(self, channel: int, bw: str = '') -> None:
+        """Start wifi nic channel, bw can be ``[NOHT|HT20|HT40+|HT40-|5MHz|10MHz|80MHz]``"""
+        run_cmd(['sudo'] + self._channel_args(channel, bw))
+
+    def _rate_args(self, rate: float, short_gi: bool = False) -> t.List[str]:
         dot11b_rates = [1, 2, 5.5, 11]
         dot11g_rates = [6, 9, 12, 18, 24, 36, 48, 54]
         dot11n_ht20_short_gi_rates = [7.2, 14.4, 21.7, 28.9, 43.3, 57.8, 65, 72.2]
@@ -192,23 +245,23 @@ class WiFiNic(Nic):  # pylint: disable=too-many-public-methods
         dot11n_ht40_short_gi_rates = [15, 30, 45, 60, 90, 120, 135, 150]
         dot11n_ht40_long_gi_rates = [13.5, 27, 40.5, 54, 81, 108, 121.5, 135]
 
-        args = []
         if rate in dot11b_rates or rate in dot11g_rates:
-            args = ['sudo', 'iw', 'dev', self.iface, 'set', 'bitrates', 'legacy-2.4', str(rate)]
-        elif rate in dot11n_ht20_short_gi_rates + dot11n_ht40_short_gi_rates and short_gi:
-            args = ['sudo', 'iw', 'dev', self.iface, 'set', 'bitrates', 'ht-mcs-2.4', str(rate), 'sgi-2.4']
-        elif rate in dot11n_ht20_long_gi_rates + dot11n_ht40_long_gi_rates and not short_gi:
-            args = ['sudo', 'iw', 'dev', self.iface, 'set', 'bitrates', 'ht-mcs-2.4', str(rate), 'lgi-2.4']
-        else:
-            raise ValueError(f'Invalid rate: {rate}! please check!')
-        run_cmd(args)
+            return ['iw', 'dev', self.iface, 'set', 'bitrates', 'legacy-2.4', str(rate)]
+        if rate in dot11n_ht20_short_gi_rates + dot11n_ht40_short_gi_rates and short_gi:
+            return ['iw', 'dev', self.iface, 'set', 'bitrates', 'ht-mcs-2.4', str(rate), 'sgi-2.4']
+        if rate in dot11n_ht20_long_gi_rates + dot11n_ht40_long_gi_rates and not short_gi:
+            return ['iw', 'dev', self.iface, 'set', 'bitrates', 'ht-mcs-2.4', str(rate), 'lgi-2.4']
+        raise ValueError(f'Invalid rate: {rate}! please check!')
+
+    def set_rate(self, rate: float, short_gi: bool = False) -> None:
+        run_cmd(['sudo'] + self._rate_args(rate, short_gi))
 
     def nic_ready(self, channel: int, rate: float = 0, short_gi: bool = False, bw: str = '') -> None:
-        self.iface_down()
-        self.iface_up()
-        self.set_channel(channel, bw)
+        # run all the commands in one sudo shell
+        cmds = [self._link_args('down'), self._link_args('up'), self._channel_args(channel, bw)]
         if rate:
-            self.set_rate(rate, short_gi)
+            cmds.append(self._rate_args(rate, short_gi))
+        self.run_batch(cmds)
 
     def monitor_ready(self, channel: int, bw: str = '') -> None:
         """Start wifi nic to monitor mode
@@ -217,12 +270,16 @@ class WiFiNic(Nic):  # pylint: disable=too-many-public-methods
             channel (int): monitor channel to set
             bw (str, optional): ``[NOHT|HT20|HT40+|HT40-|5MHz|10MHz|80MHz]``. Defaults to 'HT20'.
         """
-        # AX200 sometime set monitor mode failed if wpa_supplicant process is running
-        self.kill_wpa_supplicant()
-        self.iface_down()
-        self.iw_set_type('monitor')
-        self.iface_up()
-        self.set_channel(channel, bw)
+        self.run_batch(
+            [
+                # AX200 sometime set monitor mode failed if wpa_supplicant process is running
+                '(killall wpa_supplicant || true)',
+                self._link_args('down'),
+                ['iw', 'dev', self.iface, 'set', 'type', 'monitor'],
+                self._link_args('up'),
+                self._channel_args(channel, bw),
+            ]
+        )
 
     @staticmethod
     @lru_cache(maxsize=1)
@@ -234,6 +291,8 @@ class WiFiNic(Nic):  # pylint: disable=too-many-public-methods
     def set_country_code(country_code: str = '') -> None:
         """Need set country before get full supported channels"""
         run_cmd(['sudo', 'iw', 'reg', 'set', country_code])
+        # supported channels may change with the country
+        WiFiNic.clear_cache()
 
     @staticmethod
     @lru_cache(maxsize=1)
@@ -272,22 +331,66 @@ class WiFiNic(Nic):  # pylint: disable=too-many-public-methods
                 dev_phy_map[iface] = current_phy
         return dev_phy_map
 
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _cached(cls, iface: str) -> 'WiFiNic':
+        """Reuse the instance, so that the parsed phy info of the instance is reused."""
+        return cls(iface)
+
     @classmethod
     def get_wlan_interfaces(cls) -> t.List[str]:
         return list(cls.parse_phy_interfaces().keys())
 
+    @classmethod
+    def _prefetch_phy_info(cls) -> None:
+        """Run "iw <phy> info" of all phys concurrently to fill the get_phy_info cache."""
+        phys = set(cls.parse_phy_interfaces().values())
+        if len(phys) < 2:
+            return
+        with ThreadPoolExecutor(max_workers=len(phys)) as executor:
+            list(executor.map(cls.get_phy_info, phys))
+
+    @classmethod
+    @lru_cache(maxsize=1)
+    def _iface_index(cls) -> t.Dict[str, t.Dict[int, t.List[str]]]:
+        """Index interfaces by mode and channel once: {mode: {channel: [iface, ...]}}.
+
+        Channel ``0`` of mode ``he`` lists all HE interfaces. Interfaces keep the ``iw dev`` order.
+        """
+        cls._prefetch_phy_info()
+        index: t.Dict[str, t.Dict[int, t.List[str]]] = {'ap': {}, 'he': {}, 'send': {}, 'capture': {}}
+        for iface in cls.get_wlan_interfaces():
+            wnic = cls._cached(iface)
+            send_channels = wnic.send_channels
+            for ch in send_channels:
+                index['send'].setdefault(ch, []).append(iface)
+            for ch in wnic.capture_channels:
+                index['capture'].setdefault(ch, []).append(iface)
+            if wnic.is_ap_supported():
+                for ch in send_channels:
+                    index['ap'].setdefault(ch, []).append(iface)
+            if wnic.is_he_supported():
+                for ch in [0, *send_channels]:
+                    index['he'].setdefault(ch, []).append(iface)
+        return index
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Drop the cached phy info and interface index, eg: after the country code is changed."""
+        WiFiNic.get_phy_info.cache_clear()
+        WiFiNic._cached.cache_clear()
+        WiFiNic._iface_index.cache_clear()
+
     @classmethod
     def get_tx_and_rx_iface_pair(cls, channel: int, country: str = '') -> t.Tuple[str, str]:
         """Get a pair of interface for send/monitor"""
         if country:
             cls.set_country_code(country)
-        ifaces = cls.get_wlan_interfaces()
-        for tx_iface, rx_iface in permutations(ifaces, 2):
-            if channel not in cls(tx_iface).send_channels:
-                continue
-            if channel not in cls(rx_iface).capture_channels:
-                continue
-            return tx_iface, rx_iface
+        index = cls._iface_index()
+        for tx_iface in index['send'].get(channel, []):
+            for rx_iface in index['capture'].get(channel, []):
+                if tx_iface != rx_iface:
+                    return tx_iface, rx_iface
         raise ValueError('no available interfaces for tx/rx')
 
     @classmethod
@@ -295,27 +398,11 @@ class WiFiNic(Nic):  # pylint: disable=too-many-public-methods
         """Get interface, mode: ap, send, capture, he"""
         mode = mode.lower()  # allow uppercase
         assert mode in ['ap', 'send', 'capture', 'he']
+        # currently channel is only used for send/capture modes, it's optional for he mode
+        assert channel or mode == 'he'
         if country:
             cls.set_country_code(country)
-        ifaces = cls.get_wlan_interfaces()
-        # currently channel is only used for send/capture modes
-        for iface in ifaces:
-            if mode == 'ap':
-                assert channel
-                if cls(iface).is_ap_supported():
-                    if channel in cls(iface).send_channels:
-                        return iface
-            elif mode == 'he':
-                if cls(iface).is_he_supported():
-                    # check channel if set
-                    if not channel or channel in cls(iface).send_channels:
-                        return iface
-            elif mode == 'send':
-                assert channel
-                if channel in cls(iface).send_channels:
-                    return iface
-            elif mode == 'capture':
-                assert channel
-                if channel in cls(iface).capture_channels:
-                    return iface
-        raise ValueError('Unknown error!')
+        ifaces = cls._iface_index()[mode].get(channel)
+        if not ifaces:
+            raise ValueError('Unknown error!')
+        return ifaces[0]
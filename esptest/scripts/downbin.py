@@ -4,9 +4,21 @@ import os
 import re
 import sys
 
+import esptest.common.compat_typing as t
 from esptest.devices.serial_tools import get_all_serial_ports
 from esptest.tools.download_bin import bin_path_to_dir, bin_path_to_dir_or_bin, download_bin_to_ports
 
+PORT_RANGE_PATTERN = re.compile(r'^(\d+)-(\d+)$')
+
+
+def _parse_port_range(port_range: str) -> t.List[str]:
+    """Parse port range like "0-10" to ["ttyUSB0", ..., "ttyUSB10"]."""
+    match = PORT_RANGE_PATTERN.match(port_range)
+    if not match:
+        raise ValueError(f'Invalid port range: {port_range}')
+    start, end = map(int, match.groups())
+    return [f'ttyUSB{i}' for i in range(start, end + 1)]
+
 
 def main() -> None:
     usage_string = '%(prog)s [bin_path] [options]'
@@ -54,10 +66,10 @@ def main() -> None:
     if args.ports:
         ports = args.ports
     elif args.range:
-        match = re.match(r'(\d+)-(\d+)', args.range)
-        assert match
-        start, end = map(int, match.groups())
-        ports = [f'ttyUSB{i}' for i in range(start, end + 1)]
+        try:
+            ports = _parse_port_range(args.range)
+        except ValueError as e:
+            parser.error(str(e))
     elif args.all:
         ports = [p.device for p in get_all_serial_ports()]
     else:
@@ -1,11 +1,13 @@
 import argparse
+import fnmatch
 import logging
 import os
 import shutil
 import subprocess
+import sys
 import tempfile
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 try:
     # from import or `python -m esptest.tools.pip_check`
@@ -43,6 +45,49 @@ class BuildFilesPatterns:
     ]
 
 
+def _collect_build_files(from_path: Path, patterns: List[str]) -> Dict[Path, Path]:
+    """Find files matching any of the glob patterns in one walk, returns {relative_path: path}.
+
+    Only directories that some pattern can reach are entered, patterns with ``**`` use Path.glob.
+    """
+    files: Dict[Path, Path] = {}
+    for pattern in patterns:
+        if '**' in pattern:
+            for _file in from_path.glob(pattern):
+                if _file.is_file():
+                    files.setdefault(_file.relative_to(from_path), _file)
+    split_patterns = [pattern.replace('\\', '/').split('/') for pattern in patterns if '**' not in pattern]
+    for root, dirs, names in os.walk(str(from_path), followlinks=True):
+        rel_parts = Path(root).relative_to(from_path).parts
+        depth = len(rel_parts)
+        # patterns whose leading parts match the current directory
+        reachable = [
+            parts
+            for parts in split_patterns
+            if len(parts) > depth and all(fnmatch.fnmatch(name, part) for name, part in zip(rel_parts, parts))
+        ]
+        dirs[:] = [
+            d for d in dirs if any(len(parts) > depth + 1 and fnmatch.fnmatch(d, parts[depth]) for parts in reachable)
+        ]
+        for name in names:
+            if any(len(parts) == depth + 1 and fnmatch.fnmatch(name, parts[depth]) for parts in reachable):
+                relative_path = Path(*rel_parts, name)
+                files.setdefault(relative_path, from_path / relative_path)
+    return files
+
+
+def _gen_partition_csv(parttool: Path, part_bin: Path, part_csv: Path) -> None:
+    try:
+        # lazy import, parse_bin_path is only needed when IDF_PATH is set
+        from ..utility.parse_bin_path import _parse_partition_table_to_csv
+    except ImportError:
+        # run as a script, esptest is not importable
+        subprocess.check_call([sys.executable, str(parttool.absolute()), str(part_bin), str(part_csv)], shell=False)
+        return
+    # in process with the cached gen_esp32part module, falls back to running it as a script
+    _parse_partition_table_to_csv(str(parttool), str(part_bin), str(part_csv))
+
+
 def copy_bin_to_new_path(
     from_dir: str,
     to_path: str,
@@ -86,15 +131,13 @@ def copy_bin_to_new_path(
     if extra_files:
         all_patterns.extend(extra_files)
 
-    for pattern in all_patterns:
-        for _file in from_path.glob(pattern):
-            assert _file.is_file()
-            relative_path = _file.relative_to(from_path)
-            to_file = to_dir / relative_path
-            if not to_file.parent.is_dir():
-                to_file.parent.mkdir(parents=True)
-            logging.debug(f'Copying file {relative_path}')
-            shutil.copy(_file, to_dir / relative_path)
+    # collect first: patterns may overlap, copy each file and create each directory only once
+    files_to_copy = _collect_build_files(from_path, all_patterns)
+    for parent in sorted({relative_path.parent for relative_path in files_to_copy}):
+        (to_dir / parent).mkdir(parents=True, exist_ok=True)
+    for relative_path, _file in files_to_copy.items():
+        logging.debug(f'Copying file {relative_path}')
+        shutil.copy(_file, to_dir / relative_path)
 
     # parse 'partition-table.bin'
     if IDF_PATH:
@@ -104,9 +147,8 @@ def copy_bin_to_new_path(
         if not part_csv.is_file() and part_bin.is_file():
             assert parttool.is_file(), 'Can not find gen_esp32part.py'
             try:
-                _cmd = ['python', str(parttool.absolute()), str(part_bin), str(part_csv)]
-                subprocess.check_call(_cmd, shell=False)
-            except subprocess.SubprocessError as e:
+                _gen_partition_csv(parttool, part_bin, part_csv)
+            except (OSError, subprocess.SubprocessError) as e:
                 logger.error(f'Failed to gen partition-table.csv: {str(e)}')
     # zip the destination directory
     if zip_output:
@@ -1,13 +1,13 @@
 import asyncio
-import concurrent
 import concurrent.futures
 import os
 import re
+import shlex
 import subprocess
 import sys
-from asyncio.events import AbstractEventLoop
+import threading
 from dataclasses import dataclass
-from functools import lru_cache, partial
+from functools import lru_cache
 
 from esptool import get_default_connected_device
 
@@ -21,41 +21,130 @@ from esptest.utility.parse_bin_path import (  # pylint: disable=unused-import
 )
 
 logger = get_logger('download_bin')
-FLASH_CRYPT_CNT_PATTERN = re.compile(r'(?:FLASH_CRYPT_CNT|SPI_BOOT_CRYPT_CNT).*\(0b([01]+)')
+FLASH_CRYPT_CNT_PATTERN = re.compile(r'^[ \t]*(?:FLASH_CRYPT_CNT|SPI_BOOT_CRYPT_CNT)[^\n]*?\(0b([01]+)', re.MULTILINE)
 SECURE_BOOT_EN_PATTERN = re.compile(r'(?:ABS_DONE_1|SECURE_BOOT_EN).*?\((0b[01]+)\)')
+# max length of one esptool output line, for the asyncio stream reader
+ESPTOOL_LINE_LIMIT = 1024 * 1024
+WRITING_AT_RUN_PATTERN = re.compile(r'(?:^Writing at[^\n]*\n)+(?=Writing at)', re.MULTILINE)
 
 
-@lru_cache()
+@lru_cache(maxsize=32)
 def _get_bin_parser(bin_path: str, parttool: str) -> ParseBinPath:
     return ParseBinPath(bin_path, parttool)
 
 
+def _bin_parser_key(bin_path: str) -> str:
+    """Different relative paths or symlinks to the same local build share one cached parser, urls are kept."""
+    if os.path.exists(bin_path):
+        return os.path.realpath(bin_path)
+    return bin_path
+
+
+# {port: device} resolved by compute_serial_port()
+_resolved_ports: t.Dict[str, str] = {}
+
+
+def _resolve_port(port: str) -> str:
+    """compute_serial_port() with a memo, the port is resolved again once the device is gone (eg: replugged)."""
+    device = _resolved_ports.get(port)
+    if device is None or not os.path.exists(device):
+        # failed lookups raise and are not cached
+        device = compute_serial_port(port, strict=True)
+        _resolved_ports[port] = device
+    return device
+
+
+def _split_cmd(cmd: str) -> t.List[str]:
+    """Split a command line like a shell, paths with spaces can be quoted."""
+    if sys.platform == 'win32':
+        # posix mode would treat the backslashes in windows paths as escapes
+        return [
+            arg[1:-1] if len(arg) > 1 and arg[0] == arg[-1] == '"' else arg for arg in shlex.split(cmd, posix=False)
+        ]
+    return shlex.split(cmd)
+
+
 @lru_cache()
-def _get_efuse_summary(port: str, espefuse: str = '') -> str:
-    espefuse = espefuse or f'{sys.executable} -m espefuse'
-    try:
-        summary = subprocess.check_output(
-            espefuse.split() + ['--port', port, 'summary'], stderr=subprocess.STDOUT, text=True
-        )
-    except subprocess.CalledProcessError as err:
-        logger.error(err.output)
-        raise RuntimeError(f'Failed to get efuse information from {port} with {espefuse}') from err
-    return summary.strip()
+def _get_efuse_summary(port: str, espefuse: t.Union[str, t.Tuple[str, ...]] = '') -> str:
+    """Get espefuse summary, *espefuse* is a command line string or an argv tuple."""
+    if isinstance(espefuse, str):
+        espefuse_argv = _split_cmd(espefuse) if espefuse else [sys.executable, '-m', 'espefuse']
+    else:
+        espefuse_argv = list(espefuse)
+    ret = subprocess.run(espefuse_argv + ['--port', port, 'summary'], capture_output=True, text=True, check=False)
+    if ret.returncode != 0:
+        logger.error(ret.stdout + ret.stderr)
+        raise RuntimeError(f'Failed to get efuse information from {port} with {espefuse}')
+    return ret.stdout.strip()
+
+
+class _EsptoolOutput:
+    """Collect esptool output (stdout and stderr interleaved) line by line.
+
+    Consecutive "Writing at ..." progress lines are dropped on the fly except the last one,
+    so the memory does not grow with them.
+    """
+
+    def __init__(self) -> None:
+        self._lines: t.List[str] = []
+        self._last_writing_line = ''
+
+    def add_line(self, raw_line: bytes) -> None:
+        line = raw_line.decode(errors='replace')
+        if line.startswith('Writing at'):
+            self._last_writing_line = line
+            return
+        if self._last_writing_line:
+            self._lines.append(self._last_writing_line)
+            self._last_writing_line = ''
+        self._lines.append(line)
+
+    def getvalue(self) -> str:
+        if self._last_writing_line:
+            return ''.join(self._lines) + self._last_writing_line
+        return ''.join(self._lines)
+
+
+def _run_esptool(args: t.List[str]) -> t.Tuple[int, str]:
+    """Run esptool and get the return code and output, see _EsptoolOutput."""
+    output = _EsptoolOutput()
+    with subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT) as proc:
+        assert proc.stdout is not None
+        for raw_line in proc.stdout:
+            output.add_line(raw_line)
+        returncode = proc.wait()
+    return returncode, output.getvalue()
+
+
+async def _run_esptool_async(args: t.List[str]) -> t.Tuple[int, str]:
+    """Run esptool as asyncio subprocess and get the return code and output, see _EsptoolOutput."""
+    proc = await asyncio.create_subprocess_exec(
+        *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT, limit=ESPTOOL_LINE_LIMIT
+    )
+    assert proc.stdout is not None
+    output = _EsptoolOutput()
+    async for raw_line in proc.stdout:
+        output.add_line(raw_line)
+    returncode = await proc.wait()
+    return returncode, output.getvalue()
+
+
+def _async_subprocess_supported() -> bool:
+    """Whether asyncio subprocesses can be used in the current thread.
+
+    Before python 3.8, the default event loop on windows (SelectorEventLoop) does not support subprocesses,
+    and on posix the child watcher only works for the event loop of the main thread.
+    """
+    if sys.version_info >= (3, 8):
+        return True
+    if sys.platform == 'win32':
+        return False
+    return threading.current_thread() is threading.main_thread()
 
 
 def _filter_esptool_log(log: str) -> str:
-    lines = log.splitlines(keepends=True)
-    new_log = ''
-    last_line = ''
-    for _, line in enumerate(lines):
-        if not line.startswith('Writing at'):
-            if last_line.startswith('Writing at'):
-                new_log += last_line
-            new_log += line
-        elif not last_line.startswith('Writing at'):
-            new_log += line
-        last_line = line
-    return new_log
+    # keep only the last line of consecutive "Writing at ..." progress lines
+    return WRITING_AT_RUN_PATTERN.sub('', log)
 
 
 def check_flash_encrypted(efuse_summary: str) -> bool:
@@ -89,20 +178,30 @@ class DownBinTool:
         force_no_stub: bool = False,
         check_no_stub: bool = False,
         output_log: str = '',
+        check_encryption: bool = True,
     ):  # pylint: disable=too-many-positional-arguments,too-many-arguments
         self.bin_path = bin_path
-        self.port = compute_serial_port(port, strict=True)
+        self.port = _resolve_port(port)
         if isinstance(baud, int):
             self.baud_list = [baud] if baud > 0 else self.DEFAULT_BAUD_LIST
         else:
             self.baud_list = baud
         self.esptool = esptool or f'{sys.executable} -m esptool'
         self.espefuse = self.esptool.replace('esptool', 'espefuse')
+        # split once, the args are built for every baud retry
+        if esptool:
+            self._esptool_argv = _split_cmd(self.esptool)
+            self._espefuse_argv = _split_cmd(self.espefuse)
+        else:
+            self._esptool_argv = [sys.executable, '-m', 'esptool']
+            self._espefuse_argv = [sys.executable, '-m', 'espefuse']
         self.erase_nvs = erase_nvs
-        self.bin_parser = _get_bin_parser(bin_path, parttool)
+        self.bin_parser = _get_bin_parser(_bin_parser_key(bin_path), parttool)
         self.force_no_stub = force_no_stub
         self.check_no_stub = check_no_stub
         self.output_log = output_log
+        # skip reading efuse if the caller knows flash encryption and secure boot are disabled
+        self.check_encryption = check_encryption
 
     def _append_output_log(self, text: str) -> None:
         if not self.output_log or not text:
@@ -117,7 +216,7 @@ class DownBinTool:
 
     @property
     def _base_esptool_args(self) -> t.List[str]:
-        args = self.esptool.split()
+        args = self._esptool_argv.copy()
         if self.force_no_stub:
             args += ['--no-stub'] if '--no-stub' not in args else []
         elif self.check_no_stub:
@@ -134,38 +233,104 @@ class DownBinTool:
         args += ['-p', self.port]
         return args
 
-    def download(self) -> None:
-        summary = _get_efuse_summary(self.port, self.espefuse)
+    def _download_args(self, encrypted: bool, secure_boot: bool) -> t.Tuple[t.List[str], t.List[str]]:
+        """esptool args before and after ``-b <baud>``, built once and shared by all baud retries."""
+        flash_args = self.bin_parser.flash_bin_args(
+            erase_nvs=self.erase_nvs, encrypted=encrypted, secure_boot=secure_boot
+        )
+        return self._base_esptool_args, flash_args
+
+    def _download_indicators(self, summary: str) -> t.Tuple[str, str]:
+        """Encrypted and secure boot indicators for the download logs, from the efuse summary."""
         encrypted_indicator = ' [encrypted]' if check_flash_encrypted(summary) else ''
         secure_boot_indicator = ' [secure_boot]' if check_secure_boot_enabled(summary) else ''
+        return encrypted_indicator, secure_boot_indicator
+
+    def _download_result(self, args: t.List[str], baud: int, returncode: int, esptool_msg: str) -> str:
+        """Log the result of one download attempt, returns the failure log or empty string if succeeded."""
+        if esptool_msg:
+            self._append_output_log(f'esptool output:\n{esptool_msg}')
+        if returncode == 0:
+            logger.info(f'Download success: [{self.port}@{baud}]')
+            self._append_output_log(f'Download success: [{self.port}@{baud}]')
+            return ''
+        download_log = f'esptool cmd failed ({returncode}): ' + ' '.join(args)
+        download_log += f'\nDownload failed: [{self.port}@{baud}]\n'
+        download_log += f'esptool output: {esptool_msg}'
+        return download_log
+
+    def _download_start(self, args: t.List[str], baud: int, indicators: t.Tuple[str, str]) -> None:
+        logger.info(f'Downloading {self.port}@{baud}{"".join(indicators)}: {self.bin_path}')
+        logger.debug(f'esptool cmd: {" ".join(args)}')
+        self._append_output_log(f'esptool cmd: {" ".join(args)}')
+
+    def _download_failed(self, download_log: str) -> None:
+        logger.error(download_log)
+        self._append_output_log(download_log)
+        raise RuntimeError(f'Failed to download Bin to {self.port}')
+
+    def _download_attempts(
+        self, base_args: t.List[str], flash_args: t.List[str], indicators: t.Tuple[str, str]
+    ) -> t.Generator[t.List[str], t.Tuple[int, str], None]:
+        """Try the bauds in order, yields esptool args of each attempt and receives its (returncode, output).
 
+        download() and download_async() only differ in how esptool is run. Stops on success,
+        raises RuntimeError if all bauds failed.
+        """
         download_log = ''
         for baud in self.baud_list:
-            args = self._base_esptool_args
-            args += ['-b', f'{baud}']
-            args += self.bin_parser.flash_bin_args(
-                erase_nvs=self.erase_nvs, encrypted=bool(encrypted_indicator), secure_boot=bool(secure_boot_indicator)
-            )
-
-            logger.info(f'Downloading {self.port}@{baud}{encrypted_indicator}{secure_boot_indicator}: {self.bin_path}')
-            logger.debug(f'esptool cmd: {" ".join(args)}')
-            self._append_output_log(f'esptool cmd: {" ".join(args)}')
-            # get return code rather than check
-            ret = subprocess.run(args, capture_output=True, text=True, check=False)
-            esptool_msg = ret.stdout + ret.stderr
-            if esptool_msg:
-                self._append_output_log(f'esptool output:\n{_filter_esptool_log(esptool_msg)}')
-            if ret.returncode == 0:
-                logger.info(f'Download success: [{self.port}@{baud}]')
-                self._append_output_log(f'Download success: [{self.port}@{baud}]')
+            args = base_args + ['-b', f'{baud}'] + flash_args
+            self._download_start(args, baud, indicators)
+            # get return code rather than check, the output is already filtered while reading
+            returncode, esptool_msg = yield args
+            failed_log = self._download_result(args, baud, returncode, esptool_msg)
+            if not failed_log:
                 return  # succeed
-            # failed
-            download_log += f'esptool cmd failed ({ret.returncode}): ' + ' '.join(args)
-            download_log += f'\nDownload failed: [{self.port}@{baud}]\n'
-            download_log += f'esptool output: {_filter_esptool_log(esptool_msg)}'
-        logger.error(download_log)
-        self._append_output_log(download_log)
-        raise RuntimeError(f'Failed to download Bin to {self.port}')
+            download_log += failed_log
+        self._download_failed(download_log)
+
+    async def download_async(self, executor: t.Optional[concurrent.futures.Executor] = None) -> None:
+        """Download bin with esptool running as asyncio subprocess.
+
+        Before python 3.8, asyncio subprocesses need a ProactorEventLoop on windows
+        and the main thread on posix, use download() in that case.
+
+        Args:
+            executor: Executor for the blocking steps. Defaults to the default executor of the loop.
+        """
+        loop = asyncio.get_running_loop()
+        # efuse summary, stub checking and nvs bin generation are blocking, run them in executor
+        summary = ''
+        if self.check_encryption:
+            summary = await loop.run_in_executor(executor, _get_efuse_summary, self.port, tuple(self._espefuse_argv))
+        indicators = self._download_indicators(summary)
+
+        # the stub check connects to the device and erase_nvs writes a temp bin, do them once, not per baud
+        base_args, flash_args = await loop.run_in_executor(
+            executor, self._download_args, bool(indicators[0]), bool(indicators[1])
+        )
+        attempts = self._download_attempts(base_args, flash_args, indicators)
+        try:
+            args = next(attempts)
+            while True:
+                args = attempts.send(await _run_esptool_async(args))
+        except StopIteration:
+            pass  # succeed
+
+    def download(self) -> None:
+        """Download bin with esptool, blocks until done. Can be called while an event loop is running."""
+        summary = _get_efuse_summary(self.port, tuple(self._espefuse_argv)) if self.check_encryption else ''
+        indicators = self._download_indicators(summary)
+
+        # the stub check connects to the device and erase_nvs writes a temp bin, do them once, not per baud
+        base_args, flash_args = self._download_args(bool(indicators[0]), bool(indicators[1]))
+        attempts = self._download_attempts(base_args, flash_args, indicators)
+        try:
+            args = next(attempts)
+            while True:
+                args = attempts.send(_run_esptool(args))
+        except StopIteration:
+            pass  # succeed
 
     def download_partition(self, partition_bins: t.Dict[str, str], baud: t.Union[int, t.List[int]] = 0) -> None:
         """
@@ -181,11 +346,11 @@ class DownBinTool:
         else:
             baud_list = baud
 
+        base_args = self._base_esptool_args
+        flash_args = self.bin_parser.flash_partition_args(partition_bins)
         download_log = ''
         for baud_to_use in baud_list:
-            args = self._base_esptool_args
-            args += ['-b', f'{baud_to_use}']
-            args += self.bin_parser.flash_partition_args(partition_bins)
+            args = base_args + ['-b', f'{baud_to_use}'] + flash_args
             self._append_output_log(f'esptool cmd: {" ".join(args)}')
             ret = subprocess.run(args, capture_output=True, text=True, check=False)
             esptool_msg = ret.stdout + ret.stderr
@@ -204,13 +369,23 @@ class DownBinTool:
         raise RuntimeError(f'Failed to download partitions {list(partition_bins.keys())} to {self.port}')
 
 
-def _download_bin(down_tool: DownBinTool) -> None:
-    down_tool.download()
+async def _async_download_bin(
+    down_tool: DownBinTool, semaphore: asyncio.Semaphore, executor: concurrent.futures.Executor
+) -> None:
+    async with semaphore:
+        if _async_subprocess_supported():
+            await down_tool.download_async(executor)
+        else:
+            await asyncio.get_running_loop().run_in_executor(executor, down_tool.download)
 
 
-async def _async_download_bin(down_tool: DownBinTool, loop: AbstractEventLoop) -> None:
-    async_func = partial(_download_bin, down_tool)
-    await loop.run_in_executor(None, async_func)
+async def _gather_downloads(down_tools: t.List[DownBinTool], max_workers: int) -> None:
+    workers = max_workers or len(down_tools) or 1
+    # limit the number of esptool processes running at the same time
+    semaphore = asyncio.Semaphore(workers)
+    # per-call executor, threads are released when all downloads are done
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        await asyncio.gather(*[_async_download_bin(down_tool, semaphore, executor) for down_tool in down_tools])
 
 
 async def async_download_bin_scheduler(  # pylint: disable=too-many-positional-arguments,too-many-arguments
@@ -222,12 +397,9 @@ async def async_download_bin_scheduler(  # pylint: disable=too-many-positional-a
     check_no_stub: bool = False,
     baud: t.Union[int, t.List[int]] = 0,
     esptool: str = '',
+    check_encryption: bool = True,
 ) -> None:
-    max_workers = max_workers or len(ports)
-    loop = asyncio.get_running_loop()
-    loop.set_default_executor(concurrent.futures.ThreadPoolExecutor(max_workers=max_workers))
-
-    coroutines = []
+    down_tools = []
     for _port in ports:
         down_tool = DownBinTool(
             bin_path,
@@ -237,10 +409,11 @@ async def async_download_bin_scheduler(  # pylint: disable=too-many-positional-a
             esptool=esptool,
             force_no_stub=force_no_stub,
             check_no_stub=check_no_stub,
+            check_encryption=check_encryption,
         )
-        coroutines.append(_async_download_bin(down_tool, loop))
+        down_tools.append(down_tool)
 
-    await asyncio.gather(*coroutines)
+    await _gather_downloads(down_tools, max_workers)
 
 
 def download_bin_to_ports(  # pylint: disable=too-many-positional-arguments,too-many-arguments
@@ -252,6 +425,7 @@ def download_bin_to_ports(  # pylint: disable=too-many-positional-arguments,too-
     check_no_stub: bool = False,
     baud: t.Union[int, t.List[int]] = 0,
     esptool: str = '',
+    check_encryption: bool = True,
 ) -> None:
     """
     Download bin to ports using esptool.
@@ -265,10 +439,11 @@ def download_bin_to_ports(  # pylint: disable=too-many-positional-arguments,too-
         check_no_stub: Whether to check no stub.
         baud: Baud rate to use. If given a list, will try each baud rate in order.
         esptool: Path to the esptool executable.
+        check_encryption: Whether to read efuse to check flash encryption and secure boot.
     """
     asyncio.run(
         async_download_bin_scheduler(
-            bin_path, ports, erase_nvs, max_workers, force_no_stub, check_no_stub, baud, esptool
+            bin_path, ports, erase_nvs, max_workers, force_no_stub, check_no_stub, baud, esptool, check_encryption
         )
     )
 
@@ -301,11 +476,7 @@ async def async_downbin_scheduler(
     bin_configs: t.List[BinConfig],
     max_workers: int = 0,
 ) -> None:
-    max_workers = max_workers or len(bin_configs)
-    loop = asyncio.get_running_loop()
-    loop.set_default_executor(concurrent.futures.ThreadPoolExecutor(max_workers=max_workers))
-
-    coroutines = []
+    down_tools = []
     for cfg in bin_configs:
         down_tool = DownBinTool(
             cfg.bin_path,
@@ -316,9 +487,9 @@ async def async_downbin_scheduler(
             force_no_stub=cfg.force_no_stub,
             check_no_stub=cfg.check_no_stub,
         )
-        coroutines.append(_async_download_bin(down_tool, loop))
+        down_tools.append(down_tool)
 
-    await asyncio.gather(*coroutines)
+    await _gather_downloads(down_tools, max_workers)
 
 
 def download_bins(bin_configs: t.List[BinConfig], max_workers: int = 0) -> None:
@@ -1,17 +1,38 @@
 import logging
 import os
 import sys
-import urllib.request
-from typing import Optional
+import time
+from typing import IO, Optional
+
+# block size used when the Content-Length is unknown
+DOWNLOAD_BLOCK_SIZE = 128 * 1024
+MIN_DOWNLOAD_BLOCK_SIZE = 8 * 1024
+MAX_DOWNLOAD_BLOCK_SIZE = 1024 * 1024
+# redraw the progress bar at most 20 times a second
+PROGRESS_INTERVAL = 0.05
+PROGRESS_BAR_LEN = 50
+# the bar is sliced from these on every update, not built by repeating characters
+_PROGRESS_FILLED = '█' * PROGRESS_BAR_LEN
+_PROGRESS_EMPTY = '-' * PROGRESS_BAR_LEN
+
+
+def _download_block_size(total_length: int) -> int:
+    """Pick the read block size from the Content-Length, about 1/256 of the file.
+
+    Bigger blocks mean less python <-> C round trips per MB for large files, but
+    the buffer is capped at 1 MiB to not inflate memory, and small files are
+    read with small blocks.
+    """
+    if total_length <= 0:
+        return DOWNLOAD_BLOCK_SIZE
+    return max(MIN_DOWNLOAD_BLOCK_SIZE, min(MAX_DOWNLOAD_BLOCK_SIZE, total_length // 256))
 
 
 def _progress(downloaded: int, total_size: int) -> None:
     if total_size > 0:
         percent = min(downloaded / total_size * 100, 100)
-        bar_len = 50
-        filled_len = int(bar_len * downloaded // total_size)
-        progress_bar = '█' * filled_len + '-' * (bar_len - filled_len)
-        sys.stdout.write(f'\r[{progress_bar}] {percent:6.1f}%')
+        filled_len = min(PROGRESS_BAR_LEN * downloaded // total_size, PROGRESS_BAR_LEN)
+        sys.stdout.write(f'\r[{_PROGRESS_FILLED[:filled_len]}{_PROGRESS_EMPTY[filled_len:]}] {percent:6.1f}%')
         sys.stdout.flush()
     else:
         # show downloaded size if no total_size
@@ -19,37 +40,39 @@ def _progress(downloaded: int, total_size: int) -> None:
         sys.stdout.flush()
 
 
-def download_file(url: str, local_filename: str, timeout: Optional[float] = None, progress: bool = True) -> None:
+def download_fileobj(url: str, out_file: IO[bytes], timeout: Optional[float] = None, progress: bool = True) -> None:
     """
-    Download a file from a URL.
-
-    The optional *timeout* parameter specifies a timeout in seconds for
-    blocking operations like the connection attempt (if not specified, the
-    global default timeout setting will be used). This only works for HTTP,
-    HTTPS and FTP connections.
+    Download a file from a URL and write it to a writable binary file object.
 
     Args:
         url: The URL of the file to download.
-        local_filename: The local filename to save the downloaded file.
+        out_file: The binary file object to write to, eg: a tempfile.SpooledTemporaryFile.
+        timeout: Timeout in seconds for blocking operations, see download_file.
         progress: Whether to show the download progress.
     """
-    if os.path.exists(local_filename):
-        os.remove(local_filename)
+    import urllib.request  # lazy import, urllib.request is slow to import
+
     try:
-        logging.info(f'Downloading {url} -> {local_filename}')
-        with urllib.request.urlopen(url, timeout=timeout) as response, open(local_filename, 'wb') as out_file:
+        logging.info(f'Downloading {url}')
+        with urllib.request.urlopen(url, timeout=timeout) as response:
             total_length = int(response.getheader('Content-Length') or '0')
             downloaded = 0
-            block_size = 8192
+            # read into one reused buffer, no new bytes object per block
+            buffer = bytearray(_download_block_size(total_length))
+            view = memoryview(buffer)
+            last_progress = 0.0
             while True:
-                chunk = response.read(block_size)
-                if not chunk:
+                size = response.readinto(buffer)
+                if not size:
                     break
-                out_file.write(chunk)
-                downloaded += len(chunk)
-                if progress:
+                out_file.write(view[:size])
+                downloaded += size
+                if progress and time.monotonic() - last_progress >= PROGRESS_INTERVAL:
                     _progress(downloaded, total_length)
+                    last_progress = time.monotonic()
             if progress:
+                # always show the final state
+                _progress(downloaded, total_length)
                 sys.stdout.write('\n')
                 sys.stdout.flush()
             if total_length and total_length != downloaded:
@@ -59,3 +82,30 @@ def download_file(url: str, local_filename: str, timeout: Optional[float] = None
     except OSError as e:
         logging.error(f'Download {url} failed: {str(e)}')
         raise e
+
+
+def download_file(url: str, local_filename: str, timeout: Optional[float] = None, progress: bool = True) -> None:
+    """
+    Download a file from a URL.
+
+    The optional *timeout* parameter specifies a timeout in seconds for
+    blocking operations like the connection attempt (if not specified, the
+    global default timeout setting will be used). This only works for HTTP,
+    HTTPS and FTP connections.
+
+    Args:
+        url: The URL of the file to download.
+        local_filename: The local filename to save the downloaded file.
+        progress: Whether to show the download progress.
+    """
+    if os.path.exists(local_filename):
+        os.remove(local_filename)
+    logging.info(f'Saving {url} -> {local_filename}')
+    try:
+        with open(local_filename, 'wb') as out_file:
+            download_fileobj(url, out_file, timeout=timeout, progress=progress)
+    except OSError:
+        # do not leave a partial file
+        if os.path.exists(local_filename):
+            os.remove(local_filename)
+        raise
@@ -2,7 +2,7 @@ import argparse
 import logging
 import sys
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Union
 
 try:
     # from import or `python -m esptest.tools.pip_check`
@@ -14,7 +14,9 @@ except ImportError:
 
 
 def simple_check_requirements(
-    requirements_file: Union[str, Path] = 'requirements.txt', _pkg_results: Optional[List[str]] = None
+    requirements_file: Union[str, Path] = 'requirements.txt',
+    _pkg_results: Optional[List[str]] = None,
+    _installed_versions: Optional[Dict[str, str]] = None,
 ) -> bool:
     """Verify that installed packages meet the requirements specified in the requirements file.
 
@@ -37,6 +39,7 @@ def simple_check_requirements(
             return get_distribution(distribution_name).version
 
     from packaging.requirements import InvalidRequirement, Requirement
+    from packaging.utils import canonicalize_name
     from packaging.version import InvalidVersion, Version
 
     # setuptools may vendor packaging under pkg_resources.extern with a distinct class.
@@ -53,6 +56,8 @@ def simple_check_requirements(
     invalid_version_errors_t = tuple(invalid_version_errors)
 
     pkg_results = [] if _pkg_results is None else _pkg_results
+    # installed versions looked up so far, shared with nested requirements files
+    installed_versions = {} if _installed_versions is None else _installed_versions
 
     with open(requirements_file, 'r', encoding='utf-8') as f:
         for line in f:
@@ -65,13 +70,16 @@ def simple_check_requirements(
                 if cmd in ['-r', '--requirement']:
                     # the file should be in absolute path or relative path to
                     # the current work directory
-                    simple_check_requirements(arg_line, pkg_results)
+                    simple_check_requirements(arg_line, pkg_results, installed_versions)
                 continue
 
             try:
                 req = Requirement(requirement)
                 try:
-                    installed_version = Version(version(req.name))
+                    name = canonicalize_name(req.name)
+                    if name not in installed_versions:
+                        installed_versions[name] = version(req.name)
+                    installed_version = Version(installed_versions[name])
                     if installed_version not in req.specifier:
                         pkg_results.append(
                             f"Package '{req.name}' version '{installed_version}' "
@@ -5,7 +5,7 @@ import threading
 import time
 from collections import deque
 from dataclasses import dataclass
-from queue import Queue
+from functools import partial
 from typing import Deque, Dict, List, Optional
 
 from rich import box
@@ -19,6 +19,12 @@ from ..devices.esp_serial import EspPortInfo, detect_port_info_no_cache
 MAX_RECENT_DEVICES = 5
 MAX_DETECT_RETRY = 2
 MAX_DEBUG_LOGS = 20
+DETECT_WORKER_NUM = 4
+POLL_INTERVAL = 1
+# udev events within this delay (e.g. one per port when plugging a hub) result in one port rescan
+UDEV_EVENT_DELAY = 0.05
+# redraw requests within this interval are coalesced into one table render
+REDRAW_INTERVAL = 0.1
 
 # Debug mode: set UART_MONITOR_DEBUG=1 to keep screen history and show debug logs.
 DEBUG = os.environ.get('UART_MONITOR_DEBUG', '').lower() in ('1', 'true', 'yes', 'on')
@@ -57,10 +63,12 @@ class Device:
 console = Console()
 devices: Dict[str, Device] = {}
 devices_lock = threading.Lock()
-detect_queue: 'Queue[Device]' = Queue()  # queue.Queue is not subscriptable on Python 3.7
+detect_queue: Optional['asyncio.Queue[Device]'] = None  # created in the running loop by monitor_serial_ports
 recent_devices: List[Device] = []  # recent connecting devices
 debug_logs: Deque[str] = deque(maxlen=MAX_DEBUG_LOGS)
 debug_logs_lock = threading.Lock()
+_redraw_pending = threading.Event()
+_refresh_scheduled = False  # only accessed in the monitor event loop
 
 
 def debug_print(*args) -> None:  # type: ignore
@@ -71,6 +79,12 @@ def debug_print(*args) -> None:  # type: ignore
         debug_logs.append('[DEBUG] ' + ' '.join(str(arg) for arg in args))
 
 
+def _get_detect_queue() -> 'asyncio.Queue[Device]':
+    if detect_queue is None:
+        raise RuntimeError('detect queue is not created, serial ports are not being monitored')
+    return detect_queue
+
+
 def _update_chip_from_port_info(chip: Chip, esp_port: EspPortInfo) -> bool:
     if not esp_port.support_esptool:
         chip.clear()
@@ -87,20 +101,19 @@ def _update_chip_from_port_info(chip: Chip, esp_port: EspPortInfo) -> bool:
 
 
 async def _detect_port_info(device: Device) -> EspPortInfo:
-    """Run the (blocking) port detection off the event loop.
+    """Run the (blocking) port detection in the default executor of the running loop.
 
-    Uses ``asyncio.to_thread`` (Python 3.9+) when available; on Python 3.7/3.8
-    it falls back to calling the detection synchronously.
+    ``run_in_executor`` is used instead of ``asyncio.to_thread`` (Python 3.9+), so
+    detections of several devices overlap on Python 3.7/3.8 as well.
     """
-    if hasattr(asyncio, 'to_thread'):
-        return await asyncio.to_thread(
-            detect_port_info_no_cache,
-            device.sys_device,
-            device.location,
-            device.description,
-        )
-    # Python 3.7/3.8 fallback: asyncio.to_thread is unavailable, call directly.
-    return detect_port_info_no_cache(device.sys_device, device.location, device.description)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None,
+        detect_port_info_no_cache,
+        device.sys_device,
+        device.location,
+        device.description,
+    )
 
 
 async def detect_port_chip(device: Device) -> None:
@@ -131,10 +144,11 @@ async def detect_chip(device: Device) -> None:
     """Detect the espressif chip on specified serial port."""
     # lsof is Linux-only; on Windows / when missing, skip occupancy check.
     try:
+        # only the return code is used, do not buffer or decode lsof output
         proc = await asyncio.create_subprocess_exec(
-            'lsof', device.sys_device, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            'lsof', device.sys_device, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
         )
-        await proc.communicate()
+        await proc.wait()
 
         if proc.returncode == 0:
             debug_print(f'{device.sys_device} is occupied (lsof)')
@@ -146,17 +160,27 @@ async def detect_chip(device: Device) -> None:
     await detect_port_chip(device)
 
 
+async def detect_chips(batch: List[Device]) -> None:
+    """Detect the given devices concurrently."""
+    await asyncio.gather(*(detect_chip(device) for device in batch), return_exceptions=False)
+
+
 async def detect_all_chips() -> None:
-    """Detect all devices concurrently."""
-    tasks = [detect_chip(detect_queue.get()) for _ in range(detect_queue.qsize())]
-    await asyncio.gather(*tasks, return_exceptions=False)
+    """Detect all queued devices concurrently."""
+    queue = _get_detect_queue()
+    await detect_chips([queue.get_nowait() for _ in range(queue.qsize())])
 
 
-def detect_chip_worker() -> None:
+async def detect_worker() -> None:
+    """Consume the detect queue, several workers detect new coming devices concurrently."""
+    queue = _get_detect_queue()
     while True:
-        device = detect_queue.get()
-        asyncio.run(detect_chip(device))
-        display_serial_ports()
+        device = await queue.get()
+        try:
+            await detect_chip(device)
+        finally:
+            queue.task_done()
+        request_redraw()
 
 
 def _port_identity(port) -> Optional[str]:  # type: ignore
@@ -201,7 +225,7 @@ def refresh_serial_ports(initial: bool = True) -> bool:
                     device.sys_device = port.device
                     device.location = location
                     device.description = port.description
-                    detect_queue.put(device)
+                    _get_detect_queue().put_nowait(device)
                     if not initial:
                         recent_devices.append(device)
 
@@ -221,7 +245,7 @@ def refresh_serial_ports(initial: bool = True) -> bool:
                     chip=Chip(target='Detecting...'),
                 )
                 devices[iface_path] = device
-                detect_queue.put(device)
+                _get_detect_queue().put_nowait(device)
                 if not initial:
                     recent_devices.append(device)
                 changed = True
@@ -246,16 +270,30 @@ def refresh_serial_ports(initial: bool = True) -> bool:
     return changed
 
 
-def device_event_handler(action, device):  # type: ignore  # pylint: disable=unused-argument
+def device_event_handler(action, device, loop):  # type: ignore  # pylint: disable=unused-argument
+    """pyudev observer thread callback, the refresh runs in the monitor event loop."""
     if device.subsystem != 'tty':
         return
-    if refresh_serial_ports(False):
-        display_serial_ports()
+    loop.call_soon_threadsafe(_schedule_refresh, loop)
+
+
+def _schedule_refresh(loop: asyncio.AbstractEventLoop) -> None:
+    global _refresh_scheduled  # pylint: disable=global-statement
+    if _refresh_scheduled:
+        return
+    _refresh_scheduled = True
+    loop.call_later(UDEV_EVENT_DELAY, _scheduled_refresh)
+
+
+def _scheduled_refresh() -> None:
+    global _refresh_scheduled  # pylint: disable=global-statement
+    _refresh_scheduled = False
+    check_new_devices_status()
 
 
 def check_new_devices_status() -> None:
     if refresh_serial_ports(False):
-        display_serial_ports()
+        request_redraw()
 
 
 def _add_debug_logs_row() -> None:
@@ -285,6 +323,10 @@ def display_serial_ports() -> None:
     table.add_column('Flash', justify='left')
     table.add_column('Description', justify='left')
 
+    # status glyphs are shared by all rows
+    connected_status = Text('●', style='green')
+    disconnected_status = Text('○', style='dim')
+
     with devices_lock:
         sorted_devices = sorted(devices.values(), key=lambda d: d.location)
         current_time = time.time()
@@ -293,49 +335,42 @@ def display_serial_ports() -> None:
             is_new_device = (current_time - device.first_seen) <= 10
 
             if device.connected:
-                status = '●'
                 style = 'green' if is_new_device else ''
-                status_text = Text(status, style='green')
+                status_text = connected_status
             else:
-                status = '○'
                 style = 'dim'
-                status_text = Text(status, style=style)
-
-            location_text = Text(device.location, style=style)
-            name_text = Text(device.name, style=style)
-            target = Text(device.chip.target, style=style)
-            rev = Text(device.chip.revision, style=style)
-            xtal = Text(device.chip.xtal, style=style)
-            mac = Text(device.chip.mac, style=style)
-            flash = Text(device.chip.flash, style=style)
-            description = Text(device.chip.description, style=style)
+                status_text = disconnected_status
 
+            # plain str cells are styled by the row style, the free-form description
+            # is kept as Text so it is not parsed as console markup
             table.add_row(
-                location_text,
-                name_text,
+                device.location,
+                device.name,
                 status_text,
-                target,
-                rev,
-                xtal,
-                mac,
-                flash,
-                description,
+                device.chip.target,
+                device.chip.revision,
+                device.chip.xtal,
+                device.chip.mac,
+                device.chip.flash,
+                Text(device.chip.description),
+                style=style,
                 end_section=(i == len(sorted_devices) - 1),
             )
 
         if recent_devices:
             for device in recent_devices[::-1]:
                 if (current_time - device.first_seen) <= 1800:
-                    location_text = Text(device.location)
-                    name_text = Text(device.name)
-                    status_text = Text('●', style='green')
-                    target = Text(device.chip.target)
-                    rev = Text(device.chip.revision)
-                    xtal = Text(device.chip.xtal)
-                    mac = Text(device.chip.mac)
-                    flash = Text(device.chip.flash)
-                    description = Text(device.chip.description)
-                    table.add_row(location_text, name_text, status_text, target, rev, xtal, mac, flash, description)
+                    table.add_row(
+                        device.location,
+                        device.name,
+                        connected_status,
+                        device.chip.target,
+                        device.chip.revision,
+                        device.chip.xtal,
+                        device.chip.mac,
+                        device.chip.flash,
+                        Text(device.chip.description),
+                    )
 
     console.clear()
     console.print(table)
@@ -343,50 +378,79 @@ def display_serial_ports() -> None:
     console.print('Press Ctrl+C to exit')
 
 
-def _bootstrap_monitoring() -> None:
-    """Initial scan, detect existing ports, and start the detect worker."""
-    refresh_serial_ports()
-    display_serial_ports()
+def request_redraw() -> None:
+    """Ask the display worker to redraw the table, requests in a burst result in one redraw."""
+    _redraw_pending.set()
 
-    # detecting all ports first
-    asyncio.run(detect_all_chips())
+
+def _redraw_if_requested() -> bool:
+    if not _redraw_pending.is_set():
+        return False
+    _redraw_pending.clear()
     display_serial_ports()
+    return True
 
-    # start a detect worker for new coming device
-    detect_thread = threading.Thread(target=detect_chip_worker, daemon=True)
-    detect_thread.start()
 
+async def display_worker() -> None:
+    """Render at most once per REDRAW_INTERVAL, e.g. plugging a usb hub results in one redraw."""
+    while True:
+        await asyncio.sleep(REDRAW_INTERVAL)
+        _redraw_if_requested()
 
-def start_monitoring_linux() -> None:
-    """Linux monitor: pyudev netlink for hotplug + 1s polling fallback."""
-    import pyudev  # Linux-only; must not be imported at module top level
 
-    _bootstrap_monitoring()
+def _start_udev_observer(loop: asyncio.AbstractEventLoop):  # type: ignore
+    import pyudev  # Linux-only; must not be imported at module top level
 
     context = pyudev.Context()
     monitor = pyudev.Monitor.from_netlink(context)
     monitor.filter_by(subsystem='tty')
 
-    observer = pyudev.MonitorObserver(monitor, device_event_handler)
+    observer = pyudev.MonitorObserver(monitor, partial(device_event_handler, loop=loop))
     observer.daemon = True
     observer.start()
+    return observer
+
+
+async def monitor_serial_ports(use_udev: bool) -> None:
+    """Detect existing ports, then watch for new ones, all in one event loop."""
+    global detect_queue  # pylint: disable=global-statement
+    detect_queue = asyncio.Queue()
+
+    refresh_serial_ports()
+    display_serial_ports()
+
+    # detecting all ports first
+    await detect_all_chips()
+    display_serial_ports()
 
+    # workers for new coming devices and the debounced display
+    tasks = [asyncio.ensure_future(detect_worker()) for _ in range(DETECT_WORKER_NUM)]
+    tasks.append(asyncio.ensure_future(display_worker()))
+    observer = _start_udev_observer(asyncio.get_running_loop()) if use_udev else None
     try:
+        # polling is kept as fallback when udev is used
         while True:
             check_new_devices_status()
-            time.sleep(1)
+            await asyncio.sleep(POLL_INTERVAL)
+    finally:
+        if observer:
+            observer.stop()
+        for task in tasks:
+            task.cancel()
+
+
+def start_monitoring_linux() -> None:
+    """Linux monitor: pyudev netlink for hotplug + 1s polling fallback."""
+    try:
+        asyncio.run(monitor_serial_ports(use_udev=True))
     except KeyboardInterrupt:
-        observer.stop()
+        pass
 
 
 def start_monitoring_win() -> None:
     """Windows monitor: poll serial ports periodically (no pyudev)."""
-    _bootstrap_monitoring()
-
     try:
-        while True:
-            check_new_devices_status()
-            time.sleep(1)
+        asyncio.run(monitor_serial_ports(use_udev=False))
     except KeyboardInterrupt:
         pass
 
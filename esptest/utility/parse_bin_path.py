@@ -1,18 +1,31 @@
+import atexit
+import csv
+import getpass
+import hashlib
+import importlib.util
 import json
 import logging
 import os
+import re
+import shutil
 import subprocess
+import sys
 import tempfile
+import threading
 import time
 import zipfile
+from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
+from stat import S_ISDIR
+from types import ModuleType
 from urllib.parse import urlparse
 
 import esptest.common.compat_typing as t
 
 # pylint 在将 utility 视为顶层时判定“相对导入越级”，故禁用此检查
-from ..tools.http_download import download_file  # pylint: disable=relative-beyond-top-level
+from ..tools.http_download import download_file, download_fileobj  # pylint: disable=relative-beyond-top-level
+from . import gen_esp32part as bundled_gen_esp32part  # pylint: disable=relative-beyond-top-level
 from .merged_bin import (  # pylint: disable=relative-beyond-top-level
     MergedBinMeta,
     PartitionInfo,
@@ -25,11 +38,153 @@ from .merged_bin import (  # pylint: disable=relative-beyond-top-level
 IDF_PATH = os.getenv('IDF_PATH', '')
 logger = logging.getLogger('parse_bin_path')
 DEFAULT_GEN_PART_TOOL = os.path.join(os.path.dirname(__file__), 'gen_esp32part.py')
+ERASE_BIN_CHUNK_SIZE = 64 * 1024
+# guards the module global ``quiet`` of gen_esp32part, see _gen_partition_csv_in_process()
+_GEN_ESP32PART_LOCK = threading.Lock()
+
+
+# cache entries (downloaded/extracted bins) not used for this long are removed
+CACHE_MAX_AGE = 7 * 24 * 3600
+# timeout of the HEAD request used to revalidate cached urls
+URL_HEAD_TIMEOUT = 10
+
+
+def _is_private_dir(path: str) -> bool:
+    """Whether *path* is a real directory (not a symlink) only accessible by the current user."""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    if not S_ISDIR(st.st_mode):
+        return False
+    if sys.platform == 'win32':
+        # the temp dir on windows is already per user
+        return True
+    return st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+
+def _evict_cache(cache_dir: str, max_age: float) -> None:
+    """Remove cache entries which are not used for *max_age* seconds."""
+    expire_time = time.time() - max_age
+    for entry in os.scandir(cache_dir):
+        try:
+            if entry.is_dir(follow_symlinks=False) and entry.stat(follow_symlinks=False).st_mtime < expire_time:
+                logger.debug(f'Removing expired cache {entry.path}')
+                shutil.rmtree(entry.path, ignore_errors=True)
+        except OSError:
+            continue
+
+
+def _touch_cache_entry(path: str) -> None:
+    # the mtime of the entry dir is the last used time, see _evict_cache()
+    try:
+        os.utime(os.path.dirname(path))
+    except OSError:
+        pass
 
 
 @lru_cache()
 def _tmp_dir() -> str:
-    return tempfile.mkdtemp()
+    """Per-user cache dir, downloaded/extracted bins are reused by later runs."""
+    user = os.getuid() if hasattr(os, 'getuid') else getpass.getuser()
+    cache_dir = os.path.join(tempfile.gettempdir(), f'esptest-{user}')
+    try:
+        os.mkdir(cache_dir, 0o700)
+    except FileExistsError:
+        pass
+    if not _is_private_dir(cache_dir):
+        # maybe created by another user, never flash bins from it
+        logger.warning(f'{cache_dir} is not a private directory of current user, bins are not cached')
+        cache_dir = tempfile.mkdtemp(prefix='esptest-')
+        atexit.register(shutil.rmtree, cache_dir, ignore_errors=True)
+    _evict_cache(cache_dir, CACHE_MAX_AGE)
+    return cache_dir
+
+
+def _url_validators(url: str) -> str:
+    """ETag, Last-Modified and Content-Length of *url* from a HEAD request, empty string if not available."""
+    import urllib.request  # lazy import, urllib.request is slow to import
+
+    try:
+        request = urllib.request.Request(url, method='HEAD')
+        with urllib.request.urlopen(request, timeout=URL_HEAD_TIMEOUT) as response:
+            validators = [response.getheader(name) or '' for name in ('ETag', 'Last-Modified', 'Content-Length')]
+    except OSError as e:
+        logger.debug(f'Failed to get headers of {url}: {str(e)}')
+        return ''
+    return '|'.join(validators) if any(validators) else ''
+
+
+def _bin_path_hash(bin_path: str) -> str:
+    """Stable cache key of *bin_path*.
+
+    Local files also key on size and mtime, urls on the ETag/Last-Modified/Content-Length headers,
+    so a re-published url is downloaded again. Urls without these headers are not reused by later runs.
+    """
+    key = bin_path
+    if bin_path.startswith('http://') or bin_path.startswith('https://'):
+        validators = _url_validators(bin_path)
+        key += f'|{validators}' if validators else f'|{os.getpid()}|{time.time_ns()}'
+    elif os.path.isfile(bin_path):
+        stat = os.stat(bin_path)
+        key += f'|{stat.st_size}|{stat.st_mtime_ns}'
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _download_once(url: str, local_filename: str) -> None:
+    """Download *url* unless a previous run already did, partial files are never left behind."""
+    if os.path.isfile(local_filename):
+        logger.info(f'Using cached download {local_filename}')
+        _touch_cache_entry(local_filename)
+        return
+    tmp_filename = f'{local_filename}.{os.getpid()}.part'
+    try:
+        download_file(url, tmp_filename)
+        os.replace(tmp_filename, local_filename)
+    finally:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+
+
+def _zip_dir_name(zip_name: str) -> str:
+    if zip_name.lower().endswith('.zip'):
+        return zip_name[:-4]
+    return zip_name
+
+
+def _extract_zip_once(zip_path: str, target_dir: str) -> None:
+    """Extract *zip_path* (local path or http(s) URL) to *target_dir* unless a previous run already did."""
+    if os.path.isdir(target_dir):
+        logger.info(f'Using cached extraction {target_dir}')
+        _touch_cache_entry(target_dir)
+        return
+    if zip_path.startswith('http://') or zip_path.startswith('https://'):
+        # spool the response in memory (disk if large) and extract from it, no .zip copy is kept
+        with tempfile.SpooledTemporaryFile(max_size=64 << 20) as fp:
+            download_fileobj(zip_path, fp)
+            fp.seek(0)
+            _extract_zip_aside(fp, target_dir)
+        return
+    _extract_zip_aside(zip_path, target_dir)
+
+
+def _extract_zip_aside(zip_file: t.Union[str, t.IO[bytes]], target_dir: str) -> None:
+    parent_dir = os.path.dirname(target_dir)
+    os.makedirs(parent_dir, exist_ok=True)
+    # extract aside then rename, so an existing target_dir is always complete
+    tmp_dir = tempfile.mkdtemp(dir=parent_dir)
+    try:
+        with zipfile.ZipFile(zip_file, 'r') as zip_ref:
+            zip_ref.extractall(tmp_dir)
+        try:
+            os.rename(tmp_dir, target_dir)
+        except OSError:
+            # extracted by another process at the same time
+            if not os.path.isdir(target_dir):
+                raise
+    finally:
+        if os.path.isdir(tmp_dir):
+            shutil.rmtree(tmp_dir, ignore_errors=True)
 
 
 def _path_basename(bin_path: str) -> str:
@@ -64,13 +219,16 @@ def bin_path_to_dir_or_bin(
         Absolute path to a directory, or to a merged ``.bin`` file when
         ``allow_merged`` is enabled.
     """
-    bin_hash = hash(bin_path)
     bin_base_name = _path_basename(bin_path)
 
-    if bin_path.startswith('http://') or bin_path.startswith('https://'):
-        new_bin_path = os.path.join(_tmp_dir(), f'{bin_hash}', bin_base_name)
+    if _is_zip_ref(bin_path) and (bin_path.startswith('http://') or bin_path.startswith('https://')):
+        new_bin_path = os.path.join(_tmp_dir(), _bin_path_hash(bin_path), _zip_dir_name(bin_base_name))
+        _extract_zip_once(bin_path, new_bin_path)
+        bin_path = new_bin_path
+    elif bin_path.startswith('http://') or bin_path.startswith('https://'):
+        new_bin_path = os.path.join(_tmp_dir(), _bin_path_hash(bin_path), bin_base_name)
         os.makedirs(os.path.dirname(new_bin_path), exist_ok=True)
-        download_file(bin_path, new_bin_path)
+        _download_once(bin_path, new_bin_path)
         bin_path = new_bin_path
 
     if _is_bin_ref(bin_path) and os.path.isfile(bin_path):
@@ -83,16 +241,9 @@ def bin_path_to_dir_or_bin(
 
     if _is_zip_ref(bin_path):
         logger.info(f'bin path {bin_path} is not a directory, trying to convert to directory')
-        local_base = os.path.basename(bin_path)
-        if hasattr(local_base, 'removesuffix'):
-            _bin_name = local_base.removesuffix('.zip')
-        else:
-            # python < 3.9 does not support removesuffix
-            _bin_name = local_base[:-4] if local_base.lower().endswith('.zip') else local_base
-        new_bin_path = os.path.join(_tmp_dir(), f'{bin_hash}', _bin_name)
-        os.makedirs(new_bin_path, exist_ok=True)
-        with zipfile.ZipFile(bin_path, 'r') as zip_ref:
-            zip_ref.extractall(new_bin_path)
+        _bin_name = _zip_dir_name(os.path.basename(bin_path))
+        new_bin_path = os.path.join(_tmp_dir(), _bin_path_hash(bin_path), _bin_name)
+        _extract_zip_once(bin_path, new_bin_path)
         bin_path = new_bin_path
 
     if not os.path.isdir(bin_path):
@@ -143,12 +294,50 @@ def get_baud_from_bin_path(bin_path: t.Union[str, Path]) -> int:
         return 0
 
 
+@lru_cache(maxsize=8)
+def load_gen_esp32part(parttool_path: str) -> ModuleType:
+    """Load gen_esp32part.py as a module once, the bundled copy is already imported by merged_bin.
+
+    The module may be shared, do not change its globals (eg: ``quiet``) without restoring them.
+    """
+    if os.path.realpath(parttool_path) == os.path.realpath(DEFAULT_GEN_PART_TOOL):
+        return bundled_gen_esp32part
+    # load by file path, do not add IDF partition_table dir to sys.path
+    spec = importlib.util.spec_from_file_location('_idf_gen_esp32part', parttool_path)
+    assert spec and spec.loader, f'Can not load {parttool_path}'
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _gen_partition_csv_in_process(parttool_path: str, part_bin: str, part_csv: str) -> None:
+    gen_esp32part = load_gen_esp32part(parttool_path)
+    # silence the status messages for this call only, restore the module global for other users
+    with _GEN_ESP32PART_LOCK:
+        quiet = getattr(gen_esp32part, 'quiet', False)
+        setattr(gen_esp32part, 'quiet', True)
+        try:
+            table = gen_esp32part.PartitionTable.from_binary(Path(part_bin).read_bytes())
+        finally:
+            setattr(gen_esp32part, 'quiet', quiet)
+    Path(part_csv).write_text(table.to_csv(), encoding='utf-8')
+
+
 def _parse_partition_table_to_csv(parttool_path: str, part_bin: str, part_csv: str) -> str:
     logger.debug(f'Generating partition-table.csv to {part_csv}')
+    if os.path.basename(parttool_path) == 'gen_esp32part.py':
+        # use the PartitionTable API of gen_esp32part.py, no interpreter spawned,
+        # other part tools only promise the command line interface
+        try:
+            _gen_partition_csv_in_process(parttool_path, part_bin, part_csv)
+            return part_csv
+        except Exception as e:  # noqa: BLE001  # pylint: disable=broad-exception-caught
+            logger.debug(f'Failed to gen {part_csv} in process, run {parttool_path} as a script: {str(e)}')
     try:
-        _cmd = ['python', parttool_path, str(part_bin), str(part_csv)]
-        output = subprocess.check_output(_cmd, stderr=subprocess.STDOUT, shell=False)
-        logger.debug(f'parse partition-table.csv output: {output.decode("utf-8")}')
+        # current interpreter, not whatever "python" is first in PATH
+        _cmd = [sys.executable, parttool_path, str(part_bin), str(part_csv)]
+        ret = subprocess.run(_cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, check=True)
+        logger.debug(f'parse partition-table.csv output: {ret.stdout.decode("utf-8", errors="replace")}')
         # make sure partition-table.csv is generated
         for _ in range(20):
             if Path(part_csv).is_file():
@@ -162,9 +351,127 @@ def _parse_partition_table_to_csv(parttool_path: str, part_bin: str, part_csv: s
     return part_csv
 
 
+@lru_cache()
+def _erase_bin_dir() -> str:
+    """Per-process dir of the generated erase bins, removed at exit"""
+    erase_dir = tempfile.mkdtemp(prefix='esptest_erase_')
+    atexit.register(shutil.rmtree, erase_dir, ignore_errors=True)
+    return erase_dir
+
+
+def _gen_erase_bin(erase_bin: str, size: int) -> None:
+    """Generate a 0xff filled bin of ``size`` bytes"""
+    # write aside then rename, concurrent downloads may generate the same bin
+    tmp_bin = f'{erase_bin}.{threading.get_ident()}.tmp'
+    # write chunk by chunk, do not allocate the whole (up to MBs) partition in memory
+    chunk = b'\xff' * ERASE_BIN_CHUNK_SIZE
+    full_chunks, remainder = divmod(size, ERASE_BIN_CHUNK_SIZE)
+    with open(tmp_bin, 'wb') as f:
+        for _ in range(full_chunks):
+            f.write(chunk)
+        f.write(chunk[:remainder])
+    os.replace(tmp_bin, erase_bin)
+
+
+def _get_erase_bin(size: int) -> str:
+    """Reuse the erase bin generated for the same size, the content only depends on the size"""
+    erase_bin = os.path.join(_erase_bin_dir(), f'erase_{size}.bin')
+    if not os.path.isfile(erase_bin) or os.path.getsize(erase_bin) != size:
+        # not generated yet, or removed from the tmp dir
+        _gen_erase_bin(erase_bin, size)
+    return erase_bin
+
+
+# CONFIG_<NAME>=<value> or "# CONFIG_<NAME> is not set", one match per line of the whole file
+SDKCONFIG_LINE_PATTERN = re.compile(
+    r'^(?:CONFIG_(\w+)[ \t]*=[ \t]*(.*?)|# CONFIG_(\w+) is not set)[ \t\r]*$', re.MULTILINE
+)
+SDKCONFIG_BOOL_VALUES = {'y': True, 'n': False}
+
+
+def _decode_sdkconfig_value(value: str) -> t.Any:
+    if value in SDKCONFIG_BOOL_VALUES:
+        return SDKCONFIG_BOOL_VALUES[value]
+    if value.isdigit():
+        return int(value)
+    if value[:1] == '"':
+        return value[1:-1]
+    return value
+
+
+def _parse_sdkconfig_file(sdkconfig_file: Path) -> t.Dict[str, t.Any]:
+    sdkconfig: t.Dict[str, t.Any] = {}
+    with sdkconfig_file.open('r', encoding='utf-8') as f:
+        # keys are interned: the same config names are shared by all parsed sdkconfigs
+        if sdkconfig_file.suffix == '.json':
+            sdkconfig.update((sys.intern(name), value) for name, value in json.load(f).items())
+            return sdkconfig
+        # text sdkconfig, scan the whole content in one regex pass
+        text = f.read()
+    sdkconfig.update(
+        (sys.intern(name), _decode_sdkconfig_value(value)) if name else (sys.intern(not_set_name), False)
+        for name, value, not_set_name in SDKCONFIG_LINE_PATTERN.findall(text)
+    )
+    return sdkconfig
+
+
+@lru_cache(maxsize=128)
+def _load_sdkconfig_cached(path: str, mtime_ns: int, size: int) -> t.Dict[str, t.Any]:  # pylint: disable=unused-argument
+    """mtime_ns and size are only part of the cache key, a changed file is parsed again"""
+    return _parse_sdkconfig_file(Path(path))
+
+
+PARTITION_SIZE_UNITS = {'K': 1024, 'M': 1024 * 1024}
+
+
+def _parse_partition_size(size: str) -> int:
+    """Partition size like 24K, 2M, 0x1000 or 4096"""
+    unit = PARTITION_SIZE_UNITS.get(size[-1:])
+    if unit:
+        return int(size[:-1]) * unit
+    return int(size, 0)
+
+
+def _parse_partition_table_csv_file(partition_table_file: Path) -> t.List[PartitionInfo]:
+    # # Name, Type, SubType, Offset, Size, Flags
+    # nvs,data,nvs,0x9000,24K,
+    # phy_init,data,phy,0xf000,4K,
+    # factory,app,factory,0x10000,2M,
+    partitions: t.List[PartitionInfo] = []
+    try:
+        with open(str(partition_table_file), 'r', encoding='utf-8', newline='') as f:
+            for row in csv.reader(f, skipinitialspace=True):
+                if len(row) < 6 or row[0].startswith('#'):
+                    continue
+                partitions.append(
+                    PartitionInfo(
+                        row[0],
+                        row[1],
+                        row[2],
+                        row[3],
+                        _parse_partition_size(row[4]),
+                        # a stray comma in the flags field stays in the flags
+                        ','.join(row[5:]),
+                    )
+                )
+    except FileNotFoundError:
+        pass
+    return partitions
+
+
+@lru_cache(maxsize=64)
+def _load_partition_table_csv_cached(  # pylint: disable=unused-argument
+    path: str, mtime_ns: int, size: int
+) -> t.Tuple[PartitionInfo, ...]:
+    """mtime_ns and size are only part of the cache key, a changed file is parsed again"""
+    return tuple(_parse_partition_table_csv_file(Path(path)))
+
+
 class SDKConfig(t.Dict[str, t.Any]):
     """A class to represent SDK configuration"""
 
+    __slots__ = ()
+
     CONSOLE_BAUD_KEYS = [
         'ESP_CONSOLE_UART_BAUDRATE',
         'CONSOLE_UART_BAUDRATE',
@@ -173,47 +480,11 @@ class SDKConfig(t.Dict[str, t.Any]):
 
     @classmethod
     def from_file(cls, sdkconfig_file: t.Union[str, Path]) -> 'SDKConfig':
-        """Load SDK config from a file"""
-        sdkconfig = cls()
+        """Load SDK config from a file, the parse result is cached until the file changes"""
         sdkconfig_file = Path(sdkconfig_file)
-        with sdkconfig_file.open('r', encoding='utf-8') as f:
-            if sdkconfig_file.suffix == '.json':
-                sdkconfig.update(json.load(f))
-            else:
-                # text sdkconfig
-                for line in f.readlines():
-                    if line.startswith('CONFIG_') and '=' in line:
-                        key, value = line.split('=', 1)
-                        key = key.strip()
-                        if hasattr(key, 'removeprefix'):
-                            key = key.removeprefix('CONFIG_')
-                        else:
-                            # python < 3.9 does not support removeprefix
-                            if key.startswith('CONFIG_'):
-                                key = key[7:]
-                        value = value.strip()
-                        sdkconfig[key] = (
-                            True
-                            if value == 'y'
-                            else False
-                            if value == 'n'
-                            else int(value)
-                            if value.isdigit()
-                            else value[1:-1]
-                            if value[0] == '"'
-                            else value
-                        )
-                    elif line.startswith('# CONFIG_') and line.strip().endswith(' is not set'):
-                        config_name = line.strip()
-                        if hasattr(config_name, 'removeprefix'):
-                            config_name = config_name.removeprefix('# CONFIG_').removesuffix(' is not set')
-                        else:
-                            # python < 3.9 does not support removeprefix
-                            config_name = config_name[9:] if config_name.startswith('# CONFIG_') else config_name
-                            config_name = config_name[:-11] if config_name.endswith(' is not set') else config_name
-                        sdkconfig[config_name] = False
-                        continue
-        return sdkconfig
+        stat = sdkconfig_file.stat()
+        # a new dict for every call, the cached one is never handed out
+        return cls(_load_sdkconfig_cached(str(sdkconfig_file.resolve()), stat.st_mtime_ns, stat.st_size))
 
     @property
     def console_baud(self) -> int:
@@ -242,6 +513,26 @@ class SDKConfig(t.Dict[str, t.Any]):
         return bool(self.get('SECURE_BOOT', False))
 
 
+@dataclass(frozen=True)
+class _FlashMeta:
+    """esptool args of flasher_args.json, read out of the nested dicts once"""
+
+    before: str
+    after: str
+    write_flash_args: t.Tuple[str, ...]
+    flash_files: t.Tuple[t.Tuple[str, str], ...]  # (offset, bin file relative to bin dir)
+
+    @classmethod
+    def from_flasher_args(cls, flasher_args: t.Dict[str, t.Any]) -> '_FlashMeta':
+        extra = flasher_args['extra_esptool_args']
+        return cls(
+            before=extra['before'],
+            after=extra['after'],
+            write_flash_args=tuple(flasher_args['write_flash_args']),
+            flash_files=tuple(flasher_args['flash_files'].items()),
+        )
+
+
 class ParseBinPath:
     """Flash args for esptool.py"""
 
@@ -253,7 +544,11 @@ class ParseBinPath:
         parttool: str = '',
     ):
         self._parttool = parttool
-        self._flasher_args: t.Dict[str, t.Any] = {}
+        self._parttool_path: t.Optional[str] = None  # resolved once, see parttool_path
+        self._flasher_args: t.Optional[t.Dict[str, t.Any]] = None  # None: not loaded yet
+        self._chip: t.Optional[str] = None
+        self._stub: t.Optional[bool] = None
+        self._flash_meta: t.Optional[_FlashMeta] = None
         self._sdkconfig: SDKConfig = SDKConfig()
         self._partition_table_csv_path: str = ''  # set when partition_table dir is read-only
         self._mode = 'standard'
@@ -268,10 +563,10 @@ class ParseBinPath:
             self._mode = 'merged'
             self._merged_bin_path = str(resolved_path.resolve())
             self._merged_meta = probe_merged_bin(resolved_path)
-            self.bin_path = str(resolved_path.parent.resolve())
+            self._set_bin_dir(resolved_path.parent.resolve())
             return
 
-        self.bin_path = str(resolved_path.resolve())
+        self._set_bin_dir(resolved_path.resolve())
         if is_standard_bin_dir(resolved_path):
             self._mode = 'standard'
             return
@@ -282,6 +577,16 @@ class ParseBinPath:
         self._merged_bin_path = str(merged.resolve())
         self._merged_meta = probe_merged_bin(merged)
 
+    def _set_bin_dir(self, bin_dir: Path) -> None:
+        # paths inside the bin dir are joined once here, not on every call
+        self.bin_path = str(bin_dir)
+        self._bin_dir = bin_dir
+        self._part_csv = bin_dir / 'partition_table' / 'partition-table.csv'
+        self._part_bin = bin_dir / 'partition_table' / 'partition-table.bin'
+        self._flasher_args_file = bin_dir / self.FLASHER_ARGS_FILE
+        self._sdkconfig_json = bin_dir / 'config' / 'sdkconfig.json'
+        self._sdkconfig_file = bin_dir / 'sdkconfig'
+
     @property
     def sdkconfig(self) -> SDKConfig:
         """
@@ -289,15 +594,15 @@ class ParseBinPath:
             sdkconfig object
         """
         if not self._sdkconfig:
-            sdkconfig_file = Path(self.bin_path) / 'config' / 'sdkconfig.json'
-            if sdkconfig_file.is_file():
-                self._sdkconfig = SDKConfig.from_file(sdkconfig_file)
-            else:
-                sdkconfig_file = Path(self.bin_path) / 'sdkconfig'
-                if sdkconfig_file.is_file():
+            # from_file stats the file anyway, no separate is_file() check
+            for sdkconfig_file in (self._sdkconfig_json, self._sdkconfig_file):
+                try:
                     self._sdkconfig = SDKConfig.from_file(sdkconfig_file)
-                else:
-                    raise FileNotFoundError("'sdkconfig.json' or 'sdkconfig' not found in bin path")
+                    break
+                except FileNotFoundError:
+                    continue
+            else:
+                raise FileNotFoundError("'sdkconfig.json' or 'sdkconfig' not found in bin path")
         return self._sdkconfig
 
     @property
@@ -306,6 +611,11 @@ class ParseBinPath:
         Returns:
             Partition tool (gen_esp32part.py) path
         """
+        if self._parttool_path is None:
+            self._parttool_path = self._find_parttool()
+        return self._parttool_path
+
+    def _find_parttool(self) -> str:
         if self._parttool:
             return os.path.realpath(self._parttool)
         if IDF_PATH:
@@ -327,9 +637,9 @@ class ParseBinPath:
 
     @property
     def flasher_args(self) -> t.Dict[str, t.Any]:
-        """Parse flash args from flasher_args.json"""
-        if not self._flasher_args:
-            flasher_args_file = Path(self.bin_path) / self.FLASHER_ARGS_FILE
+        """Parse flash args from flasher_args.json, only once even if it is missing or invalid"""
+        if self._flasher_args is None:
+            flasher_args_file = self._flasher_args_file
             # Bare merged bins live under an arbitrary parent (e.g. /tmp); missing
             # flasher_args.json is expected — use synthetic args without warning.
             if flasher_args_file.is_file():
@@ -349,12 +659,22 @@ class ParseBinPath:
     @property
     def chip(self) -> str:
         """Check the current chip"""
-        return str(self.flasher_args['extra_esptool_args'].get('chip', 'auto'))
+        if self._chip is None:
+            self._chip = str(self.flasher_args['extra_esptool_args'].get('chip', 'auto'))
+        return self._chip
 
     @property
     def stub(self) -> bool:
         """Check if esptool stub is used"""
-        return bool(self.flasher_args['extra_esptool_args'].get('stub', False))
+        if self._stub is None:
+            self._stub = bool(self.flasher_args['extra_esptool_args'].get('stub', False))
+        return self._stub
+
+    def _get_flash_meta(self) -> _FlashMeta:
+        """before/after/write_flash_args/flash_files of flasher_args, used for every esptool args build"""
+        if self._flash_meta is None:
+            self._flash_meta = _FlashMeta.from_flasher_args(self.flasher_args)
+        return self._flash_meta
 
     def _rev_range_from_bootloader(self, chip_name: str) -> t.Tuple[int, int]:
         """Read (min_rev_full, max_rev_full) from package bootloader.bin.
@@ -453,12 +773,14 @@ class ParseBinPath:
         """Get partition-table.csv path"""
         if self._partition_table_csv_path:
             return Path(self._partition_table_csv_path)
-        return Path(self.bin_path) / 'partition_table' / 'partition-table.csv'
+        return self._part_csv
 
-    @lru_cache()
-    def _gen_partition_table(self, part_csv: t.Optional[Path] = None) -> None:
-        part_csv = Path(self.bin_path) / 'partition_table' / 'partition-table.csv'
-        part_bin = Path(self.bin_path) / 'partition_table' / 'partition-table.bin'
+    def _gen_partition_table(self) -> None:
+        if self._partition_table_csv_path:
+            # already generated to tmp dir
+            return
+        part_csv = self._part_csv
+        part_bin = self._part_bin
         if part_csv.is_file():
             # already exists
             return
@@ -472,47 +794,21 @@ class ParseBinPath:
         logger.debug(f'Generating partition-table.csv to {part_csv}')
         _parse_partition_table_to_csv(self.parttool_path, str(part_bin), str(part_csv))
 
-    def _parse_partition_table_csv(self, partition_table_file: Path) -> t.List[PartitionInfo]:
-        # # Name, Type, SubType, Offset, Size, Flags
-        # nvs,data,nvs,0x9000,24K,
-        # phy_init,data,phy,0xf000,4K,
-        # factory,app,factory,0x10000,2M,
-        partitions: t.List[PartitionInfo] = []
+    @staticmethod
+    def _parse_partition_table_csv(partition_table_file: Path) -> t.List[PartitionInfo]:
+        """Parse partition-table.csv, shared by all instances until the file changes"""
         try:
-            with open(str(partition_table_file), 'r', encoding='utf-8') as f:
-                for line in f.readlines():
-                    sections = line.strip().split(',')
-                    if line.startswith('#') or len(sections) != 6:
-                        continue
-                    _size_str = sections[4]
-                    _size = 0
-                    if _size_str.endswith('K'):
-                        _size = int(_size_str[:-1]) * 1024
-                    elif _size_str.endswith('M'):
-                        _size = int(_size_str[:-1]) * 1024 * 1024
-                    elif _size_str.startswith('0x'):
-                        _size = int(_size_str, 16)
-                    else:
-                        _size = int(_size_str)
-                    partitions.append(
-                        PartitionInfo(
-                            sections[0],
-                            sections[1],
-                            sections[2],
-                            sections[3],
-                            _size,
-                            sections[5],
-                        )
-                    )
-        except (FileNotFoundError, json.JSONDecodeError):
-            pass
-        return partitions
+            stat = partition_table_file.stat()
+        except FileNotFoundError:
+            return []
+        return list(
+            _load_partition_table_csv_cached(str(partition_table_file.resolve()), stat.st_mtime_ns, stat.st_size)
+        )
 
     def parse_partitions(self) -> t.List[PartitionInfo]:
-        """Parse partitions from partition-table.csv"""
+        """Parse partitions from partition-table.csv, parsed again only when the file changes on disk"""
         partition_table_file = self.partition_table_csv_path
-        partition_table_bin = Path(self.bin_path) / 'partition_table' / 'partition-table.bin'
-        if partition_table_file.is_file() or partition_table_bin.is_file():
+        if partition_table_file.is_file() or self._part_bin.is_file():
             self._gen_partition_table()
             partition_table_file = self.partition_table_csv_path
             if not partition_table_file.is_file():
@@ -522,19 +818,20 @@ class ParseBinPath:
             return list(self._merged_meta.partitions)
         raise ValueError('Can not parse partition table')
 
+    def _esptool_common_args(self, baudrate: int, after: str) -> t.List[str]:
+        """-b/--chip/--before/--after/--no-stub args shared by esptool commands"""
+        args = ['-b', str(baudrate)] if baudrate else []
+        args.extend(('--chip', self.chip, '--before', self._get_flash_meta().before, '--after', after))
+        if not self.stub:
+            args.append('--no-stub')
+        return args
+
     def _write_flash_args_common(self, baudrate: int = 0) -> t.List[str]:
-        args = []
-        if baudrate:
-            args += ['-b', str(baudrate)]
-        args += ['--chip', self.chip]
-        args += ['--before', self.flasher_args['extra_esptool_args']['before']]
         # idf build will force `--after=no_rest` for secure boot or flash encryption
         # but this was not a expected for testing
-        args += ['--after', 'hard_reset']
-        if not self.stub:
-            args += ['--no-stub']
-        args += ['write_flash']
-        args += self.flasher_args['write_flash_args']
+        args = self._esptool_common_args(baudrate, 'hard_reset')
+        args.append('write_flash')
+        args.extend(self._get_flash_meta().write_flash_args)
         return args
 
     def _gen_erase_nvs_bin(self) -> t.Tuple[str, str]:
@@ -544,21 +841,11 @@ class ParseBinPath:
             t.Tuple[str, str]: <offset>, <nvs_bin_path>
         """
         nvs_partition_info = self.get_partition_info('nvs')
-        nvs_bin = tempfile.mktemp()
-        with open(nvs_bin, 'wb+') as f:
-            f.write(b'\xff' * nvs_partition_info.size)
-        return nvs_partition_info.offset, nvs_bin
+        return nvs_partition_info.offset, _get_erase_bin(nvs_partition_info.size)
 
     def erase_flash_args(self, baudrate: int = 0) -> t.List[str]:
-        args = []
-        if baudrate:
-            args += ['-b', str(baudrate)]
-        args += ['--chip', self.chip]
-        args += ['--before', self.flasher_args['extra_esptool_args']['before']]
-        args += ['--after', self.flasher_args['extra_esptool_args']['after']]
-        if not self.stub:
-            args += ['--no-stub']
-        args += ['erase_flash']
+        args = self._esptool_common_args(baudrate, self._get_flash_meta().after)
+        args.append('erase_flash')
         return args
 
     def _check_secure_boot_match(self, secure_boot: bool) -> None:
@@ -572,8 +859,7 @@ class ParseBinPath:
             raise RuntimeError(msg)
 
     def _has_sdkconfig(self) -> bool:
-        root = Path(self.bin_path)
-        return (root / 'config' / 'sdkconfig.json').is_file() or (root / 'sdkconfig').is_file()
+        return self._sdkconfig_json.is_file() or self._sdkconfig_file.is_file()
 
     def flash_bin_args(
         self,
@@ -592,24 +878,25 @@ class ParseBinPath:
         """
         args = self._write_flash_args_common(baudrate)
         if encrypted:
-            args += ['--encrypt']
+            args.append('--encrypt')
         if secure_boot:
             # Secure Boot blocks writes to protected regions without --force
             # Can't use idf.py flash, can use python -m esptool command in build_log
-            args += ['--force']
+            args.append('--force')
         # always check secure boot match because efuse will be auto-flashed before idf v6.1 if secure boot is enabled
         if self._has_sdkconfig():
             self._check_secure_boot_match(secure_boot)
         else:
             logger.debug('skip secure boot sdkconfig check: no sdkconfig in %s', self.bin_path)
         if self._mode == 'merged':
-            args += ['0x0', self._merged_bin_path]
+            args.extend(('0x0', self._merged_bin_path))
         else:
-            for offset, bin_file in self.flasher_args['flash_files'].items():
-                args += [offset, str(Path(self.bin_path) / bin_file)]
+            bin_dir = str(self._bin_dir)
+            for offset, bin_file in self._get_flash_meta().flash_files:
+                args.extend((offset, os.path.join(bin_dir, bin_file)))
         if erase_nvs:
             try:
-                args += list(self._gen_erase_nvs_bin())
+                args.extend(self._gen_erase_nvs_bin())
             except ValueError:
                 if self._mode != 'merged':
                     raise
@@ -626,16 +913,7 @@ class ParseBinPath:
         return args + list(self._gen_erase_nvs_bin())
 
     def dump_nvs_args(self, filename: str) -> t.List[str]:
-        args = [
-            '--chip',
-            self.chip,
-            '--before',
-            self.flasher_args['extra_esptool_args']['before'],
-            '--after',
-            'hard_reset',
-        ]
-        if not self.stub:
-            args += ['--no-stub']
+        args = self._esptool_common_args(0, 'hard_reset')
         nvs_partition_info = self.get_partition_info('nvs')
         args += ['read_flash', nvs_partition_info.offset, str(nvs_partition_info.size), str(filename)]
         return args
@@ -6,6 +6,8 @@ import time
 from esptest.all import DutConfig, dut_wrapper
 from esptest.all import EspDut as Dut
 
+IPV4_ADDRESS_PATTERN = re.compile(r'IPv4 address: ([\.\d]+)[^\.\d]')
+
 
 class JapDut(Dut):
     # customer methods
@@ -13,7 +15,7 @@ class JapDut(Dut):
         # self.write_line('wifi_mode sta')
         # self.expect('OK')
         self.write_line(f'sta_connect {ssid} {password}')
-        match = self.expect(re.compile(r'IPv4 address: ([\.\d]+)[^\.\d]'))
+        match = self.expect(IPV4_ADDRESS_PATTERN)
         return match.group(1)
 
 
@@ -7,6 +7,8 @@ from serial import Serial
 
 from esptest.all import dut_wrapper
 
+BOOT_OFFSET_PATTERN = re.compile(r'Loaded app from partition at offset (0x\w+)[^\w]')
+
 
 def test_restart() -> None:
     ser = Serial('/dev/ttyUSB0', 115200, timeout=0.01)
@@ -14,7 +16,7 @@ def test_restart() -> None:
         try:
             test_dut.flush_data()
             test_dut.write('restart\r\n')
-            match = test_dut.expect(re.compile(r'Loaded app from partition at offset (0x\w+)[^\w]'), timeout=5)
+            match = test_dut.expect(BOOT_OFFSET_PATTERN, timeout=5)
             test_dut.expect('main_task: Returned from app_main', timeout=5)
             logging.critical(f'BOOT Offset: {match.group(1)}')
             time.sleep(0.1)
@@ -2,11 +2,12 @@ import io
 import logging
 import os
 import re
+import select
 import sys
-import tempfile
 import time
 import types
 import unittest
+from pathlib import Path
 from typing import Optional
 
 if sys.platform != 'win32':
@@ -245,65 +246,91 @@ def test_dut_base_write_raises_without_proxy() -> None:
 
 @pytest.mark.skipif(sys.platform == 'win32', reason='Windows does not support pty')
 class TestSerialDut(unittest.TestCase):
-    def setUp(self) -> None:
-        self.master, self.slave = pty.openpty()
-        self.serial_port = os.ttyname(self.slave)
-        logging.debug(f'openpty master:{self.master} slave:{self.slave} serial_port:{self.serial_port}')
-        self.dut_obj = None
-
-    def tearDown(self) -> None:
+    # one pty pair for all cases, each case opens its own serial port / dut on the slave side
+    master: int
+    slave: int
+    serial_port: str
+    fw_master: io.BufferedIOBase
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.master, cls.slave = pty.openpty()
+        cls.serial_port = os.ttyname(cls.slave)
+        logging.debug(f'openpty master:{cls.master} slave:{cls.slave} serial_port:{cls.serial_port}')
+        cls.fw_master = os.fdopen(cls.master, 'wb')
+
+    @classmethod
+    def tearDownClass(cls) -> None:
         try:
-            os.close(self.master)
+            # also closes cls.master
+            cls.fw_master.close()
         except OSError:
-            # file descriptor may be closed by `with os.fdopen()` or _close_file_io()
             pass
         try:
-            os.close(self.slave)
+            os.close(cls.slave)
         except OSError:
-            # file descriptor may be closed by `serial.close()`
             pass
 
+    @pytest.fixture(autouse=True)
+    def _set_tmp_path(self, tmp_path: Path) -> None:
+        # unittest cases can not request pytest fixtures as arguments
+        self.tmp_path = tmp_path
+
+    def setUp(self) -> None:
+        # drop data written by the previous case, the slave input is flushed when serial port is opened
+        while select.select([self.master], [], [], 0)[0]:
+            if not os.read(self.master, 65536):
+                break
+
     @staticmethod
-    def _close_file_io(file_io: io.BufferedIOBase) -> None:
-        try:
-            file_io.close()
-        except OSError:
-            pass
+    def _wait_until(predicate: t.Callable[[], t.Any], timeout: float = 1.0, interval: float = 1e-4) -> t.Any:
+        """Poll predicate until it returns a true value or timeout, return the last value."""
+        deadline = time.monotonic() + timeout
+        while True:
+            value = predicate()
+            if value or time.monotonic() >= deadline:
+                return value
+            time.sleep(interval)
+
+    @staticmethod
+    def _read_file(file_path: str) -> bytes:
+        # if we open the log file in 'r' mode, we may get \n rather than \r\n
+        with open(file_path, 'rb') as fr:
+            return fr.read()
 
     def test_serial_port_class(self) -> None:
         ser = SerialExt(self.serial_port, 115200, timeout=0.001)
-        assert isinstance(ser, RawPort)
+        try:
+            assert isinstance(ser, RawPort)
+        finally:
+            # the pty is shared by the other cases
+            ser.close()
 
     def test_set_serial_after_init(self) -> None:
         dut = SerialDut(None, name='MyDut')
         try:
             dut.serial = serial.Serial(self.serial_port, 115200, timeout=0.001)
-            fd_master = os.fdopen(self.master, 'rb')
             # Test write data to serial
             dut.write('aaa')
-            _data = fd_master.read1(5)
+            _data = os.read(self.master, 5)
             assert _data == b'aaa'
         finally:
             dut.close()
-            self._close_file_io(fd_master)
 
     def test_serial_dut_write(self) -> None:
         ser = serial.Serial(self.serial_port, 115200, timeout=0.001)
         dut = SerialDut(ser, 'MyDut')
-        fd_master = os.fdopen(self.master, 'rb')
         try:
             assert isinstance(dut, BasePort)
             # Test write data to serial
             dut.write('aaa')
-            _data = fd_master.read1(5)
+            _data = os.read(self.master, 5)
             assert _data == b'aaa'
         finally:
-            dut.close()
             # NOTE:
-            # should close dut first, otherwise pyserial will report:
+            # the master side is kept open for the whole class, otherwise pyserial will report:
             #   device reports readiness to read but returned no data
-            # Must close master io at the end of the case, otherwise the next case will fail.
-            self._close_file_io(fd_master)
+            dut.close()
 
     def test_serial_dut_with_statement(self) -> None:
         check_thread = None
@@ -311,11 +338,10 @@ class TestSerialDut(unittest.TestCase):
         with SerialDut(ser, 'MyDut') as dut:
             assert dut._pexpect_spawn  # pylint: disable=protected-access
             check_thread = dut._pexpect_spawn._read_thread  # pylint: disable=protected-access
-            with os.fdopen(self.master, 'rb') as fd_master:
-                # Test write data to serial
-                dut.write('aaa')
-                _data = fd_master.read1(5)
-                assert _data == b'aaa'
+            # Test write data to serial
+            dut.write('aaa')
+            _data = os.read(self.master, 5)
+            assert _data == b'aaa'
         if check_thread:
             assert not check_thread.is_alive()
 
@@ -327,51 +353,66 @@ class TestSerialDut(unittest.TestCase):
             with pytest.raises(ExpectTimeout):
                 dut.expect('bbb', timeout=1)
 
-    def test_serial_dut_expect(self) -> None:
-        t0 = time.perf_counter()
+    def _serial_dut(self) -> SerialDut:
         ser = serial.Serial(self.serial_port, 115200, timeout=0.001)
-        dut = SerialDut(ser, 'MyDut')
-        fd_master = os.fdopen(self.master, 'wb')
-        try:
+        return SerialDut(ser, 'MyDut')
+
+    def _write_master(self, data: bytes) -> None:
+        self.fw_master.write(data)
+        self.fw_master.flush()
+
+    def test_serial_dut_expect_timeout(self) -> None:
+        with self._serial_dut() as dut:
             # Test expect string failure
             with pytest.raises(Exception):
                 dut.expect('bbb', timeout=1)
+
+    def test_serial_dut_expect_str_and_bytes(self) -> None:
+        with self._serial_dut() as dut:
+            t0 = time.perf_counter()
             # Test expect string success
-            fd_master.write(b'bbb')
-            fd_master.flush()
-            # os.write(self.master, b'bbb')
+            self._write_master(b'bbb')
             dut.expect('bbb', timeout=1)
             # Test expect bytes success
-            fd_master.write(b'ccc')
-            fd_master.flush()
+            self._write_master(b'ccc')
             dut.expect(b'ccc', timeout=1)
-            # Test expect regex
-            fd_master.write(b'START,regex_value,END')
-            fd_master.flush()
+            # a successful expect returns at once, it does not wait out the timeout
+            assert time.perf_counter() - t0 < 1
+
+    def test_serial_dut_expect_regex(self) -> None:
+        with self._serial_dut() as dut:
+            t0 = time.perf_counter()
+            self._write_master(b'START,regex_value,END')
             match1 = dut.expect(re.compile(r'START,(\w+),END'), timeout=1)
             assert match1
             assert match1.group(1) == 'regex_value'
             # Test expect regex with bytes
-            fd_master.write(b'START,regex_value2,END')
-            fd_master.flush()
+            self._write_master(b'START,regex_value2,END')
             match2 = dut.expect(re.compile(rb'START,(\w+),END'), timeout=1)
             assert match2
             assert match2.group(1) == b'regex_value2'
-            # Test expect read all output dat
-            # Test regex flags
-            fd_master.write(b'data1 data1 data1 \r\n')
-            fd_master.flush()
+            # a successful expect returns at once, it does not wait out the timeout
+            assert time.perf_counter() - t0 < 1
+
+    def test_serial_dut_expect_read_all(self) -> None:
+        with self._serial_dut() as dut:
+            t0 = time.perf_counter()
+            # Test expect read all output data with regex flags
+            self._write_master(b'data1 data1 data1 \r\n')
             time.sleep(0.1)
-            fd_master.write(b'data2 data2 data2')
-            fd_master.flush()
+            self._write_master(b'data2 data2 data2')
             time.sleep(0.1)
             match3 = dut.expect(re.compile(r'.+', re.DOTALL), timeout=0)
             assert match3
             assert match3.group(0) == 'data1 data1 data1 \r\ndata2 data2 data2'
-            # Test expect more than one match
-            # Hop to got match twice
-            fd_master.write(b'match1, match2\n')
-            fd_master.flush()
+            # a successful expect returns at once, it does not wait out the timeout
+            assert time.perf_counter() - t0 < 1
+
+    def test_serial_dut_expect_multi_match(self) -> None:
+        with self._serial_dut() as dut:
+            t0 = time.perf_counter()
+            # Hope to get match twice
+            self._write_master(b'match1, match2\n')
             time.sleep(0.1)
             match4 = dut.expect(re.compile(r'(match1|match2)', re.DOTALL), timeout=0)
             assert match4
@@ -379,11 +420,8 @@ class TestSerialDut(unittest.TestCase):
             match5 = dut.expect(re.compile(r'(match1|match2)', re.DOTALL), timeout=0)
             assert match5
             assert match5.group(0) == 'match2'
-        finally:
-            dut.close()
-            self._close_file_io(fd_master)
-        # Check Total time, All expect should block no more than one seconds other than the failure one
-        assert time.perf_counter() - t0 < 2
+            # a successful expect returns at once, it does not wait out the timeout
+            assert time.perf_counter() - t0 < 1
 
     def test_serial_dut_expect_maxread(self) -> None:
         t0 = time.perf_counter()
@@ -391,7 +429,7 @@ class TestSerialDut(unittest.TestCase):
         dut = SerialDut(ser, 'MyDut', maxread=1024)
         assert dut.spawn is not None
         assert dut.spawn.maxread == 1024
-        fd_master = os.fdopen(self.master, 'wb')
+        fd_master = self.fw_master
         try:
             # Test expect string success
             fd_master.write(b'a' * 1024 + b'b' * 1024)
@@ -443,7 +481,6 @@ class TestSerialDut(unittest.TestCase):
             assert match3.group(0) == 'a' * 1024 + 'b' * 1024 + 'ccc'
         finally:
             dut.close()
-            self._close_file_io(fd_master)
         # Check Total time, All expect should block no more than one seconds other than the failure one
         assert time.perf_counter() - t0 < 2
 
@@ -455,7 +492,7 @@ class TestSerialDut(unittest.TestCase):
         ser_read_timeout = 0.003
         ser = serial.Serial(self.serial_port, 115200, timeout=ser_read_timeout)
         dut = SerialDut(ser, 'MyDut', maxread=1024)
-        fd_master = os.fdopen(self.master, 'wb')
+        fd_master = self.fw_master
         original_limit = g.DATA_CACHE_SIZE_LIMIT
         try:
             # Shrink the cache limit so we can trigger the trim path deterministically.
@@ -513,21 +550,20 @@ class TestSerialDut(unittest.TestCase):
         finally:
             g.DATA_CACHE_SIZE_LIMIT = original_limit
             dut.close()
-            self._close_file_io(fd_master)
 
     def test_serial_dut_data_cache(self) -> None:
         ser_read_timeout = 0.003
         ser = serial.Serial(self.serial_port, 115200, timeout=ser_read_timeout)
         dut = SerialDut(ser, 'MyDut')
-        fd_master = os.fdopen(self.master, 'wb')
+        fd_master = self.fw_master
         try:
             data_cache = dut.data_cache
             assert data_cache == ''
             # port data
             fd_master.write(b'bbb')
             fd_master.flush()
-            time.sleep(ser_read_timeout * 2)
             # get data cache does not clear port buffer
+            assert self._wait_until(lambda: dut.data_cache == 'bbb')
             data_cache = dut.data_cache
             assert data_cache == 'bbb'
             data_cache = dut.data_cache
@@ -541,7 +577,7 @@ class TestSerialDut(unittest.TestCase):
             # Test expect bytes success
             fd_master.write(b'ccc')
             fd_master.flush()
-            time.sleep(ser_read_timeout * 2)
+            assert self._wait_until(lambda: dut.read_all_bytes(flush=False) == b'ccc')
             bytes_cache = dut.read_all_bytes(flush=False)
             assert bytes_cache == b'ccc'
             bytes_cache = dut.read_all_bytes(flush=True)
@@ -549,7 +585,7 @@ class TestSerialDut(unittest.TestCase):
             # Test read all bytes very long data
             fd_master.write(b'a' * 1000 * 1000)
             fd_master.flush()
-            time.sleep(ser_read_timeout * 2)
+            assert self._wait_until(lambda: len(dut.read_all_bytes(flush=False)) == 1000 * 1000, interval=1e-3)
             bytes_cache = dut.read_all_bytes(flush=False)
             assert len(bytes_cache) == 1000 * 1000
             bytes_cache = dut.read_all_bytes(flush=True)
@@ -558,53 +594,38 @@ class TestSerialDut(unittest.TestCase):
             assert bytes_cache == b''
         finally:
             dut.close()
-            self._close_file_io(fd_master)
 
     def test_serial_dut_log(self) -> None:
         ser_read_timeout = 0.01
         ser = serial.Serial(self.serial_port, 115200, timeout=ser_read_timeout)
-        log_file = tempfile.mktemp()
+        log_file = str(self.tmp_path / 'serial.log')
         dut = SerialDut(ser, 'MyDut', log_file=log_file)
-        fd_master = os.fdopen(self.master, 'wb')
+        fd_master = self.fw_master
         try:
             assert os.path.isfile(log_file)
             # test one line
             fd_master.write(b'one line \r\n')
             fd_master.flush()
-            time.sleep(ser_read_timeout * 2)
-            with open(log_file, 'rb') as fr:
-                # if we open the log file in 'r' mode, we may get \n rather than \r\n
-                data = fr.read()
-                assert b'one line \r\n' in data
+            assert self._wait_until(lambda: b'one line \r\n' in self._read_file(log_file))
             # test one line without \n
             fd_master.write(b'line without endl')
             fd_master.flush()
+            # the only fixed wait: line cache must not be flushed right away
             time.sleep(ser_read_timeout * 2)
-            with open(log_file, 'rb') as fr:
-                data = fr.read()
-                assert b'line without endl' not in data
-            # default timeout of writting non-endl line is serial.timeout * 3
-            time.sleep(ser_read_timeout * 5)
-            with open(log_file, 'rb') as fr:
-                data = fr.read()
-                assert b'line without endl' in data
+            assert b'line without endl' not in self._read_file(log_file)
+            # default timeout of writting non-endl line is serial.timeout * 5
+            assert self._wait_until(lambda: b'line without endl' in self._read_file(log_file))
             # test line cache, write two times for one line within very short delay
             fd_master.write(b'aaa')
             fd_master.flush()
             time.sleep(ser_read_timeout)
             fd_master.write(b'bbb\r\n')
             fd_master.flush()
-            time.sleep(ser_read_timeout * 2)
-            with open(log_file, 'rb') as fr:
-                data = fr.read()
-                assert b'aaabbb\r\n' in data
+            assert self._wait_until(lambda: b'aaabbb\r\n' in self._read_file(log_file))
             # test line cache, multiple lines at one time
             fd_master.write(b'aaa\r\nbbb\r\nccc')
             fd_master.flush()
-            time.sleep(ser_read_timeout * 2)
-            with open(log_file, 'rb') as fr:
-                data = fr.read()
-                assert b'aaabbb\r\n' in data
+            assert self._wait_until(lambda: b'aaa\r\nbbb\r\n' in self._read_file(log_file))
         except AssertionError:
             try:
                 # show data in log file
@@ -616,17 +637,12 @@ class TestSerialDut(unittest.TestCase):
             raise
         finally:
             dut.close()
-            self._close_file_io(fd_master)
-            try:
-                os.remove(log_file)
-            except OSError:
-                pass
 
     def test_expect_timeout_data_in_buffer(self) -> None:
         ser_read_timeout = 0.001
         ser = serial.Serial(self.serial_port, 115200, timeout=ser_read_timeout)
         dut = SerialDut(ser, 'MyDut')
-        fd_master = os.fdopen(self.master, 'wb')
+        fd_master = self.fw_master
         try:
             # port data
             fd_master.write(b'aaabbb')
@@ -641,7 +657,6 @@ class TestSerialDut(unittest.TestCase):
             assert e.value.data_in_buffer == b'aaabbb\xff'
         finally:
             dut.close()
-            self._close_file_io(fd_master)
 
 
 @pytest.mark.skipif(sys.platform != 'win32', reason='Windows only test')
@@ -1,9 +1,11 @@
+import re
 import threading
 import time
+from pathlib import Path
 
 import pytest
 
-from esptest.adapter.port.base_port import BasePort, RawPort
+from esptest.adapter.port.base_port import BasePort, RawPort, _to_bytes_pattern
 from esptest.common.data_monitor import DataMonitor
 from esptest.config.global_config import g
 
@@ -197,6 +199,56 @@ def test_base_port_expect_exact_succeeds_when_pattern_matches() -> None:
         port.close()
 
 
+def test_base_port_expect_str_pattern_reuses_bytes_pattern() -> None:
+    raw_port = MockRawPort()
+    port = BasePort(raw_port, name='expect_str_pattern')
+    pattern = re.compile(r'IPv4 address: ([\.\d]+)[^\.\d]')
+    try:
+        raw_port.feed_data(b'got ip, IPv4 address: 192.168.4.2\n')
+        match = port.expect(pattern, timeout=2)
+        assert match.group(1) == '192.168.4.2'
+        hits = _to_bytes_pattern.cache_info().hits
+        raw_port.feed_data(b'IPv4 address: 10.0.0.1\n')
+        assert port.expect(pattern, timeout=2).group(1) == '10.0.0.1'
+        assert _to_bytes_pattern.cache_info().hits == hits + 1
+    finally:
+        port.close()
+
+
+def _wait_file_contains(file: Path, data: bytes, timeout: float = 2) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if file.is_file() and data in file.read_bytes():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_base_port_log_file_kept_open_between_writes(tmp_path: Path) -> None:
+    log_file = tmp_path / 'port1.log'
+    raw_port = MockRawPort()
+    port = BasePort(raw_port, name='log_file_port', log_file=str(log_file))
+    try:
+        raw_port.feed_data(b'line1\n')
+        assert _wait_file_contains(log_file, b'line1\n')
+        assert port.spawn is not None
+        log_f = port.spawn._log_f
+        assert log_f is not None
+        raw_port.feed_data(b'line2\n')
+        assert _wait_file_contains(log_file, b'line2\n')
+        assert port.spawn._log_f is log_f
+        # changed log file is reopened by the read thread
+        new_log_file = tmp_path / 'port2.log'
+        port.log_file = str(new_log_file)
+        raw_port.feed_data(b'line3\n')
+        assert _wait_file_contains(new_log_file, b'line3\n')
+        assert log_f.closed
+        assert b'line3' not in log_file.read_bytes()
+    finally:
+        port.close()
+    assert port.spawn is None or port.spawn._log_f is None
+
+
 def test_base_port_disable_redirect_thread_restores_after_exception() -> None:
     """Flash/download failures must not leave redirect thread permanently stopped."""
     raw_port = MockRawPort()
@@ -5,22 +5,29 @@ import sys
 import time
 from pathlib import Path
 
+import psutil
 import pytest
 
 from esptest.adapter.port.shell_port import PexpectPort, ShellPort, ShellRaw
 from esptest.common.data_monitor import DataMonitor
 
 
+def _pid_with_cmd(token: str) -> bool:
+    """Check if any running process has the token in its command line, without spawning ps and grep."""
+    for proc in psutil.process_iter(['cmdline']):
+        if token in ' '.join(proc.info['cmdline'] or []):
+            return True
+    return False
+
+
 @pytest.mark.skipif(sys.platform == 'win32', reason='windows does not support ps')
 def test_shell_raw_open_close() -> None:
     ran_int = random.randint(12345678, 87654321)
     raw_port = ShellRaw(cmd=f'sleep {ran_int}')
     assert raw_port.proc is not None
-    output = subprocess.check_output(f'ps -ef | grep {ran_int}', shell=True).decode('utf-8')
-    assert f'sleep {ran_int}' in output
+    assert _pid_with_cmd(f'sleep {ran_int}')
     raw_port.close()
-    output = subprocess.check_output(f'ps -ef | grep {ran_int}', shell=True).decode('utf-8')
-    assert f'sleep {ran_int}' not in output
+    assert not _pid_with_cmd(f'sleep {ran_int}')
 
 
 @pytest.mark.skipif(sys.platform != 'win32', reason='Windows test')
@@ -42,18 +49,14 @@ def test_shell_port_open_close() -> None:
     # close by close method
     port = ShellPort(cmd=f'sleep {ran_int}')
     assert isinstance(port.raw_port, ShellRaw)
-    output = subprocess.check_output(f'ps -ef | grep {ran_int}', shell=True).decode('utf-8')
-    assert f'sleep {ran_int}' in output
+    assert _pid_with_cmd(f'sleep {ran_int}')
     port.close()
-    output = subprocess.check_output(f'ps -ef | grep {ran_int}', shell=True).decode('utf-8')
-    assert f'sleep {ran_int}' not in output
+    assert not _pid_with_cmd(f'sleep {ran_int}')
     # close by with statement
     with ShellPort(cmd=f'sleep {ran_int}') as port:
         assert isinstance(port.raw_port, ShellRaw)
-        output = subprocess.check_output(f'ps -ef | grep {ran_int}', shell=True).decode('utf-8')
-        assert f'sleep {ran_int}' in output
-    output = subprocess.check_output(f'ps -ef | grep {ran_int}', shell=True).decode('utf-8')
-    assert f'sleep {ran_int}' not in output
+        assert _pid_with_cmd(f'sleep {ran_int}')
+    assert not _pid_with_cmd(f'sleep {ran_int}')
 
 
 def test_shell_port_read_write() -> None:
@@ -3,100 +3,116 @@ import sys
 import threading
 import time
 from contextlib import redirect_stdout
+from typing import List
 
 import pytest
 
+import esptest.common.decorators as decorators_module
 from esptest.common.decorators import retry, suppress_stdout, timeit
 
 
-def test_retry_on_result() -> None:
-    test_var = 0
+class FakeClock:
+    """Stands for the time module in esptest.common.decorators, sleeping only advances now."""
 
-    @retry(3, on_result=[0, 1, 4])
-    def test_func1() -> int:
-        nonlocal test_var
-        test_var += 1
-        return test_var
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: List[float] = []
 
-    # Test retry and succeeded
-    t0 = time.time()
-    ret = test_func1()
-    assert time.time() - t0 < 0.1
-    assert ret == 2
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
 
-    @retry(3, on_result=[0, 1, 2, 3, 4])
-    def test_func2() -> int:
-        nonlocal test_var
-        test_var += 1
-        return test_var
+    def monotonic(self) -> float:
+        return self.now
 
-    # Test retry max exceeded
-    test_var = 0
-    t0 = time.time()
-    ret = test_func2()
-    assert time.time() - t0 < 0.1
-    assert ret == 3
+    def perf_counter(self) -> float:
+        return self.now
 
-    @retry(3, on_result=[0, 1, 2, 4], delay=0.1)
-    def test_func3() -> int:
-        nonlocal test_var
-        test_var += 1
-        return test_var
 
-    # Test retry with delay
-    test_var = 0
-    t0 = time.time()
-    ret = test_func3()
-    assert 0.1 < time.time() - t0 < 0.3
-    assert ret == 3
+@pytest.fixture
+def fake_clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(decorators_module, 'time', clock)
+    return clock
 
 
-def test_retry_if_except() -> None:
-    test_var: int = 0
+@pytest.mark.parametrize(
+    'on_result, delay, expected_ret, expected_sleeps',
+    [
+        ([0, 1, 4], 0, 2, []),  # retry and succeeded
+        ([0, 1, 2, 3, 4], 0, 3, []),  # retry max exceeded
+        ([0, 1, 2, 4], 0.1, 3, [0.1, 0.1]),  # retry with delay
+    ],
+)
+def test_retry_on_result(
+    fake_clock: FakeClock, on_result: list, delay: float, expected_ret: int, expected_sleeps: list
+) -> None:
+    test_var = 0
 
-    @retry(5, on_exception=(ValueError,), delay=0.1)
-    def test_func1() -> int:
+    @retry(3, on_result=on_result, delay=delay)
+    def test_func() -> int:
         nonlocal test_var
         test_var += 1
-        if test_var < 3:
-            raise ValueError()
         return test_var
 
-    # Test retry and succeeded
-    t0 = time.time()
-    ret = test_func1()
-    assert 0.1 < time.time() - t0 < 0.3
-    assert ret == 3
+    assert test_func() == expected_ret
+    assert fake_clock.sleeps == expected_sleeps
+
+
+@pytest.mark.parametrize(
+    'max_retry, on_exception, delay, fail_until, expected_calls, expected_sleeps',
+    [
+        (5, (ValueError,), 0.1, 3, 3, [0.1, 0.1]),  # retry and succeeded
+        (3, (ValueError,), 0, 5, 3, []),  # max retry, raises
+        (5, (UserWarning,), 0, 3, 1, []),  # exception not match, raises
+    ],
+)
+def test_retry_if_except(
+    fake_clock: FakeClock,
+    max_retry: int,
+    on_exception: tuple,
+    delay: float,
+    fail_until: int,
+    expected_calls: int,
+    expected_sleeps: list,
+) -> None:
+    test_var = 0
 
-    @retry(3, on_exception=(ValueError,))
-    def test_func2() -> int:
+    @retry(max_retry, on_exception=on_exception, delay=delay)
+    def test_func() -> int:
         nonlocal test_var
         test_var += 1
-        if test_var < 5:
+        if test_var < fail_until:
             raise ValueError()
         return test_var
 
-    # Test max retry
-    test_var = 0
-    t0 = time.time()
-    with pytest.raises(ValueError):
-        _ = test_func2()
-    assert time.time() - t0 < 0.1
+    if expected_calls < fail_until:
+        with pytest.raises(ValueError):
+            _ = test_func()
+    else:
+        assert test_func() == expected_calls
+    assert test_var == expected_calls
+    assert fake_clock.sleeps == expected_sleeps
 
-    @retry(5, on_exception=(UserWarning,))
-    def test_func3() -> int:
-        nonlocal test_var
-        test_var += 1
-        if test_var < 3:
-            raise ValueError()
-        return test_var
 
-    # Test exception not match
-    test_var = 0
-    t0 = time.time()
-    with pytest.raises(ValueError):
-        _ = test_func3()
-    assert time.time() - t0 < 0.1
+def test_retry_backoff_jitter(fake_clock: FakeClock) -> None:
+    @retry(5, on_result=[0], delay=0.01, backoff=2.0, jitter=0.25)
+    def test_func1() -> int:
+        return 0
+
+    assert test_func1() == 0
+    # 4 delays: 0.01, 0.02, 0.04, 0.08, each scaled by [0.75, 1.25]
+    assert len(fake_clock.sleeps) == 4
+    for sleep_for, expected in zip(fake_clock.sleeps, [0.01, 0.02, 0.04, 0.08]):
+        assert expected * 0.75 <= sleep_for <= expected * 1.25
+
+    @retry(4, on_result=[0], delay=0.01, backoff=10.0, max_delay=0.02)
+    def test_func2() -> int:
+        return 0
+
+    fake_clock.sleeps.clear()
+    assert test_func2() == 0
+    assert fake_clock.sleeps == pytest.approx([0.01, 0.02, 0.02])
 
 
 def test_timeit() -> None:
@@ -1,6 +1,9 @@
+import gc
+import ipaddress
 import socket
 import sys
-from typing import TYPE_CHECKING
+import weakref
+from typing import TYPE_CHECKING, Iterator, List, Union
 from unittest import mock
 
 import psutil
@@ -33,9 +36,9 @@ else:
                 ptp: str | None
 
 
-from esptest.network import netif
-from esptest.network.mac import mac_offset
-from esptest.network.nic import Nic
+from esptest.network import netif, nic
+from esptest.network.mac import format_mac_to_h3c, mac_offset, normalize_mac
+from esptest.network.nic import Nic, WiFiNic
 
 if sys.platform != 'win32':
     AF_MAC_FAMILY = socket.AF_PACKET
@@ -59,6 +62,12 @@ MOCK_NETIF_ADDRS = {
 }
 
 
+@pytest.fixture(autouse=True)
+def clear_if_addrs_cache() -> None:
+    # mocked psutil results should not be shadowed by cached ones
+    netif.invalidate_if_addrs_cache()
+
+
 def test_psutils_net_if_addrs() -> None:
     if_addrs = psutil.net_if_addrs()
     assert isinstance(if_addrs, dict)
@@ -79,6 +88,16 @@ def test_get_local_ip_by_interface(patch_psutil_addrs: mock.Mock) -> None:
     assert patch_psutil_addrs.call_count > 0
 
 
+@pytest.mark.parametrize(
+    'address',
+    ['127.0.0.1', '169.254.1.1', '10.0.0.1', '::1', 'fe80::2%if1', 'FEBF::1', 'fec0::1', '2001::1', 'fe8::1'],
+)
+def test_is_loopback_or_link_local(address: str) -> None:
+    family = socket.AF_INET6 if ':' in address else socket.AF_INET
+    _ip = ipaddress.ip_address(address.split('%', 1)[0])
+    assert netif._is_loopback_or_link_local(address, family) == (_ip.is_loopback or _ip.is_link_local)
+
+
 @mock.patch('psutil.net_if_addrs')
 def test_guess_ipv6(patch_psutil_addrs: mock.Mock) -> None:
     patch_psutil_addrs.return_value = MOCK_NETIF_ADDRS
@@ -87,6 +106,31 @@ def test_guess_ipv6(patch_psutil_addrs: mock.Mock) -> None:
     assert ip == r'fe80::2%if1'
 
 
+@mock.patch('psutil.net_if_addrs')
+def test_guess_global_ipv6(patch_psutil_addrs: mock.Mock) -> None:
+    patch_psutil_addrs.return_value = {
+        'if2': [snicaddr(socket.AF_INET6, '2001:4860::2', 'ffff:ffff:ffff:ffff::', None, None)],
+    }
+    # target in the same network and both global, yield only once
+    assert list(netif.guess_local_ip6('2001:4860::1')) == ['2001:4860::2']
+    assert list(netif.guess_local_ip6('2400:3200::1')) == ['2001:4860::2']
+
+
+@mock.patch('psutil.net_if_addrs')
+def test_get_all_ips_order(patch_psutil_addrs: mock.Mock) -> None:
+    patch_psutil_addrs.return_value = {
+        'if3': [
+            snicaddr(socket.AF_INET, '169.254.0.3', '255.255.0.0', None, None),
+            snicaddr(socket.AF_INET, '10.0.0.3', '255.255.255.0', None, None),
+            snicaddr(socket.AF_INET, '192.168.1.3', '255.255.255.0', None, None),
+            snicaddr(socket.AF_INET, '127.0.0.3', '255.0.0.0', None, None),
+        ],
+    }
+    # global addresses in reverse enumeration order, then loopback/link-local ones in enumeration order
+    assert netif.get_all_ips_from_interface('if3') == ['192.168.1.3', '10.0.0.3', '169.254.0.3', '127.0.0.3']
+    assert netif.get_ip4_from_interface('if3') == '192.168.1.3'
+
+
 @mock.patch('psutil.net_if_addrs')
 def test_netif_vs_mac(patch_psutil_addrs: mock.Mock) -> None:
     patch_psutil_addrs.return_value = MOCK_NETIF_ADDRS
@@ -96,11 +140,70 @@ def test_netif_vs_mac(patch_psutil_addrs: mock.Mock) -> None:
     assert mac == '11:22:33:44:55:66'
 
 
+@mock.patch('psutil.net_if_addrs')
+def test_netif_vs_mac_many_interfaces(patch_psutil_addrs: mock.Mock) -> None:
+    if_addrs = {
+        f'if{i}': [snicaddr(AF_MAC_FAMILY, mac_offset('02:00:00:00:00:00', i), None, None, None)] for i in range(500)
+    }
+    if_addrs['tun0'] = [snicaddr(AF_MAC_FAMILY, '00:00:00:00:00:00:00:00', None, None, None)]
+    patch_psutil_addrs.return_value = if_addrs
+    with mock.patch.object(netif, 'normalize_mac', wraps=normalize_mac) as mock_normalize:
+        for i in range(0, 500, 50):
+            assert netif.get_mac_by_interface(f'if{i}') == mac_offset('02:00:00:00:00:00', i)
+            assert netif.get_interface_by_mac(mac_offset('02:00:00:00:00:00', i).replace(':', '-').upper()) == f'if{i}'
+    # the maps are built once for the snapshot, each query normalizes only its input
+    assert mock_normalize.call_count == len(if_addrs) + 10
+    with pytest.raises(ValueError):
+        netif.get_mac_by_interface('tun0')
+    with pytest.raises(ValueError):
+        netif.get_interface_by_mac('02:00:00:00:ff:ff')
+    with pytest.raises(KeyError):
+        netif.get_mac_by_interface('not_exist')
+
+
+@mock.patch('psutil.net_if_addrs')
+def test_netif_vs_mac_first_wins(patch_psutil_addrs: mock.Mock) -> None:
+    patch_psutil_addrs.return_value = {
+        'if1': [
+            snicaddr(AF_MAC_FAMILY, '02:00:00:00:00:01', None, None, None),
+            snicaddr(AF_MAC_FAMILY, '02:00:00:00:00:02', None, None, None),
+        ],
+        'if2': [snicaddr(AF_MAC_FAMILY, '02:00:00:00:00:02', None, None, None)],
+    }
+    assert netif.get_mac_by_interface('if1') == '02:00:00:00:00:01'
+    assert netif.get_interface_by_mac('02:00:00:00:00:02') == 'if1'
+    assert netif.get_mac_by_interface('if2') == '02:00:00:00:00:02'
+
+
+@mock.patch('psutil.net_if_addrs')
+def test_if_addrs_cache(patch_psutil_addrs: mock.Mock) -> None:
+    patch_psutil_addrs.return_value = MOCK_NETIF_ADDRS
+    netif.get_ip4_from_interface('if1')
+    netif.get_mac_by_interface('if1')
+    assert netif.get_interfaces() == ['lo', 'if1']
+    assert patch_psutil_addrs.call_count == 1
+    netif.invalidate_if_addrs_cache()
+    netif.get_interfaces()
+    assert patch_psutil_addrs.call_count == 2
+
+
 def test_mac_offset() -> None:
     mac = '00:01:ff:ff:ff:fe'
     assert mac_offset(mac, 1) == '00:01:ff:ff:ff:ff'
     assert mac_offset(mac, 2) == '00:02:00:00:00:00'
     assert mac_offset(mac, -1) == '00:01:ff:ff:ff:fd'
+    assert mac_offset('ff:ff:ff:ff:ff:ff', 1) == '00:00:00:00:00:00'
+    assert mac_offset('00:00:00:00:00:00', -1) == 'ff:ff:ff:ff:ff:ff'
+    assert mac_offset('00-01-FF-FF-FF-FE', 2) == '00:02:00:00:00:00'
+
+
+def test_normalize_mac() -> None:
+    assert normalize_mac('aa:bb:cc:dd:ee:ff') == 'AA:BB:CC:DD:EE:FF'
+    assert normalize_mac('AA-BB-CC-DD-EE-FF') == 'AA:BB:CC:DD:EE:FF'
+    assert normalize_mac('aabb.ccdd.eeff') == 'AA:BB:CC:DD:EE:FF'
+    assert format_mac_to_h3c('AA:BB:CC:DD:EE:FF') == 'aabb-ccdd-eeff'
+    with pytest.raises(ValueError):
+        normalize_mac('aa:bb:cc:dd:ee')
 
 
 def test_nic_lo_init() -> None:
@@ -108,6 +211,129 @@ def test_nic_lo_init() -> None:
     assert lo.iface == 'lo'
 
 
+MOCK_IW_DEV = """phy#1
+\tInterface wlan1
+\t\ttype managed
+phy#0
+\tInterface wlan0
+\t\ttype managed
+"""
+
+MOCK_PHY0_INFO = """Wiphy phy0
+\tSupported interface modes:
+\t\t * managed
+\t\t * AP
+\t\t * monitor
+\tBand 1:
+\t\tFrequencies:
+\t\t\t* 2412 MHz [1] (22.0 dBm)
+\t\t\t* 2467 MHz [12] (22.0 dBm) (no IR)
+\t\t\t* 2484 MHz [14] (disabled)
+\tBand 2:
+\t\tFrequencies:
+\t\t\t* 5260 MHz [52] (20.0 dBm) (no IR, radar detection)
+"""
+
+MOCK_PHY1_INFO = """Wiphy phy1
+\tSupported interface modes:
+\t\t * managed
+\t\t * monitor
+\tBand 1:
+\t\tFrequencies:
+\t\t\t* 2412 MHz [1] (22.0 dBm)
+\t\t\t* 2467 MHz [12] (22.0 dBm)
+\t\tHE Iftypes: managed
+\t\t\tHE MAC Capabilities (0x000000000000):
+\t\t\t\tHTC HE Supported
+"""
+
+
+def _mock_iw_cmd(cmd: Union[str, List[str]]) -> str:
+    if isinstance(cmd, list):
+        # sudo iw reg set <country>
+        return ''
+    return {'iw dev': MOCK_IW_DEV, 'iw phy#0 info': MOCK_PHY0_INFO, 'iw phy#1 info': MOCK_PHY1_INFO}[cmd]
+
+
+@pytest.fixture
+def mock_iw() -> Iterator[mock.Mock]:
+    WiFiNic.iw_dev.cache_clear()
+    WiFiNic.clear_cache()
+    with mock.patch.object(nic, 'run_cmd', side_effect=_mock_iw_cmd) as mock_run_cmd:
+        yield mock_run_cmd
+    WiFiNic.iw_dev.cache_clear()
+    WiFiNic.clear_cache()
+
+
+def test_wifi_nic_parse_phy_info(mock_iw: mock.Mock) -> None:
+    wnic = WiFiNic('wlan0')
+    assert wnic.phy == 'phy#0'
+    assert wnic.supported_modes == ['managed', 'AP', 'monitor']
+    assert wnic.is_ap_supported()
+    assert not wnic.is_he_supported()
+    assert wnic.channels['all'] == {1, 12, 14, 52}
+    assert wnic.channels['no IR'] == {12, 52}
+    assert wnic.channels['radar detection'] == {52}
+    assert wnic.channels['disabled'] == {14}
+    assert sorted(wnic.send_channels) == [1]
+    assert sorted(wnic.capture_channels) == [1, 12, 52]
+    assert wnic.send_channels is wnic.send_channels
+    assert WiFiNic('wlan1').is_he_supported()
+
+
+def test_wifi_nic_parsed_phy_info_not_pinned(mock_iw: mock.Mock) -> None:
+    wnic = WiFiNic('wlan0')
+    assert wnic.supported_modes is wnic.supported_modes
+    assert wnic.send_channels is wnic.send_channels
+    assert wnic.capture_channels is wnic.capture_channels
+    wnic_ref = weakref.ref(wnic)
+    del wnic
+    gc.collect()
+    # the parsed phy info and channel sets are cached on the instance, not in a cache that keeps the instance alive
+    assert wnic_ref() is None
+
+
+def test_wifi_nic_select_interfaces(mock_iw: mock.Mock) -> None:
+    assert WiFiNic.get_tx_and_rx_iface_pair(1) == ('wlan1', 'wlan0')
+    assert WiFiNic.get_tx_and_rx_iface_pair(12) == ('wlan1', 'wlan0')
+    with pytest.raises(ValueError):
+        WiFiNic.get_tx_and_rx_iface_pair(52)
+    assert WiFiNic.get_first_interface('ap', 1) == 'wlan0'
+    assert WiFiNic.get_first_interface('he') == 'wlan1'
+    assert WiFiNic.get_first_interface('send', 12) == 'wlan1'
+    assert WiFiNic.get_first_interface('capture', 52) == 'wlan0'
+    # iw info is called only once per phy
+    assert mock_iw.call_count == 3
+    with pytest.raises(ValueError):
+        WiFiNic.get_first_interface('ap', 12)
+
+
+def test_wifi_nic_country_code_clears_cache(mock_iw: mock.Mock) -> None:
+    assert WiFiNic.get_first_interface('send', 1) == 'wlan1'
+    assert mock_iw.call_count == 3
+    assert WiFiNic.get_first_interface('send', 1, country='CN') == 'wlan1'
+    # iw reg set, then iw info of both phys again
+    assert mock_iw.call_count == 6
+    mock_iw.assert_any_call(['sudo', 'iw', 'reg', 'set', 'CN'])
+
+
+@mock.patch.object(WiFiNic, '_get_phy', return_value='phy#0')
+@mock.patch.object(nic, 'run_cmd')
+def test_wifi_nic_monitor_ready_in_one_shell(mock_run_cmd: mock.Mock, _mock_phy: mock.Mock) -> None:
+    wnic = WiFiNic('wlan0')
+    with mock.patch.object(nic, '_which', return_value=''):
+        wnic.monitor_ready(6, 'HT20')
+    mock_run_cmd.assert_called_once_with(
+        [
+            'sudo',
+            'sh',
+            '-c',
+            '(killall wpa_supplicant || true) && ip link set wlan0 down && iw dev wlan0 set type monitor'
+            ' && ip link set wlan0 up && iw dev wlan0 set channel 6 HT20',
+        ]
+    )
+
+
 if __name__ == '__main__':
     # Breakpoints do not work with coverage, disable coverage for debugging
     pytest.main([__file__, '--no-cov', '--log-cli-level=DEBUG'])
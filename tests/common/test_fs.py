@@ -1,9 +1,9 @@
 import urllib.error
+import urllib.request
 from pathlib import Path
 
 import pytest
 
-import esptest.common.fs as fs
 from esptest.common.fs import get_file_bytes, get_file_text
 
 
@@ -56,7 +56,7 @@ def test_get_file_bytes_http_success(monkeypatch: pytest.MonkeyPatch) -> None:
         assert url == 'https://example.com/a.bin'
         return FakeResponse()
 
-    monkeypatch.setattr(fs.urllib.request, 'urlopen', fake_urlopen)
+    monkeypatch.setattr(urllib.request, 'urlopen', fake_urlopen)
     assert get_file_bytes('https://example.com/a.bin') == payload
 
 
@@ -72,7 +72,7 @@ def test_get_file_text_http_success(monkeypatch: pytest.MonkeyPatch) -> None:
             return None
 
     monkeypatch.setattr(
-        fs.urllib.request,
+        urllib.request,
         'urlopen',
         lambda url, timeout=None: FakeResponse(),
     )
@@ -83,7 +83,7 @@ def test_get_file_bytes_http_error(monkeypatch: pytest.MonkeyPatch) -> None:
     def fake_urlopen(url: str, timeout: object = None) -> None:
         raise urllib.error.URLError('network down')
 
-    monkeypatch.setattr(fs.urllib.request, 'urlopen', fake_urlopen)
+    monkeypatch.setattr(urllib.request, 'urlopen', fake_urlopen)
     with pytest.raises(urllib.error.URLError):
         get_file_bytes('https://example.com/missing')
 
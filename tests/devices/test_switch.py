@@ -1,6 +1,7 @@
 import json
 import os
 from pathlib import Path
+from typing import Iterator
 
 import pytest
 
@@ -9,6 +10,25 @@ from esptest.devices.switch import ArpInfo, H3CSwitch, InterfaceInfo, PoolInfo,
 H3C_SWITCH_CONFIG = os.environ.get('H3C_SWITCH_CONFIG', '')
 
 
+@pytest.fixture(scope='session')
+def h3c_config() -> SwitchConfig:
+    return SwitchConfig(**json.loads(H3C_SWITCH_CONFIG))
+
+
+@pytest.fixture(scope='module')
+def h3c_session(h3c_config: SwitchConfig) -> Iterator[H3CSwitch]:
+    """Login once for all switch tests of the module."""
+    with H3CSwitch(h3c_config) as h3c:
+        yield h3c
+
+
+@pytest.fixture
+def h3c(h3c_session: H3CSwitch) -> H3CSwitch:
+    # info lists cached by previous tests may be outdated
+    h3c_session.reset_cache()
+    return h3c_session
+
+
 def test_vlan_info_parser() -> None:
     """Test VLAN info parser."""
     line_data = 'Vlan111              DOWN DOWN     10.0.0.1      test 111'
@@ -68,6 +88,26 @@ def test_pool_info_parser() -> None:
     assert pool_info.gateway == '10.0.0.1'
 
 
+def test_pool_info_parser_large_output() -> None:
+    """Each field takes its first occurrence, in a large output with many static bindings."""
+    bindings = ''.join(
+        f'    ip-address 10.0.{i // 250}.{i % 250} mask 255.255.0.0\n    hardware-address 0000-0000-{i:04x} ethernet\n'
+        for i in range(20000)
+    )
+    pool_data = (
+        'Pool name: big\ndns-list 8.8.8.8\ngateway-list 10.0.0.1\nstatic bindings:\n'
+        + bindings
+        + 'Pool name: other\ngateway-list 10.1.0.1\n'
+    )
+    assert len(pool_data) > 1024 * 1024
+    pool_info = PoolInfo.parse_pool_info(pool_data)
+    assert pool_info.name == 'big'
+    assert pool_info.gateway == '10.0.0.1'
+    assert pool_info.ip == '10.0.0.1'
+    assert pool_info.mask == '255.255.0.0'
+    assert pool_info.dns_list == '8.8.8.8'
+
+
 def test_interface_info_parser() -> None:
     """Test interface info parser."""
     line_data = 'XGE1/0/1            UP   10G     F(a)   A    111  Ten-GigabitEthernet1/0/1 (access) (vlan111)'
@@ -114,102 +154,93 @@ def test_static_bind_info_mac() -> None:
 
 
 @pytest.mark.skipif(not H3C_SWITCH_CONFIG, reason='H3C_SWITCH_CONFIG is not set')
-def test_h3c_switch_login_out(tmp_path: Path) -> None:
+def test_h3c_switch_login_out(h3c_config: SwitchConfig, tmp_path: Path) -> None:
     """Test login and logout of H3C switch."""
-    config = SwitchConfig(**json.loads(H3C_SWITCH_CONFIG))
-    switch = H3CSwitch(config, log_file=str(tmp_path / 'h3c_switch.log'))
+    switch = H3CSwitch(h3c_config, log_file=str(tmp_path / 'h3c_switch.log'))
     switch.connect()
     switch.disconnect()
 
 
 @pytest.mark.skipif(not H3C_SWITCH_CONFIG, reason='H3C_SWITCH_CONFIG is not set')
-def test_h3c_switch_execute_command() -> None:
+def test_h3c_switch_execute_command(h3c: H3CSwitch) -> None:
     """Test execute command of H3C switch."""
-    config = SwitchConfig(**json.loads(H3C_SWITCH_CONFIG))
-    with H3CSwitch(config) as h3c:
-        result = h3c.execute_command('display version')
-        assert 'H3C' in result
+    result = h3c.execute_command('display version')
+    assert 'H3C' in result
 
 
 @pytest.mark.skipif(not H3C_SWITCH_CONFIG, reason='H3C_SWITCH_CONFIG is not set')
-def test_h3c_system_view() -> None:
+def test_h3c_system_view(h3c: H3CSwitch) -> None:
     """Test system view of H3C switch."""
-    config = SwitchConfig(**json.loads(H3C_SWITCH_CONFIG))
-    with H3CSwitch(config) as h3c:
-        # default system view, quit to user view
-        h3c.execute_command('qu')
-        # enter system view
-        h3c.system_view()
-        # check system view
-        assert h3c.session
-        h3c.session.flush_data()
-        h3c.session.write_line('')
-        h3c.session.expect(f'[{h3c.sysname}]')
-        # enter system view
-        h3c.system_view()
-        # check system view
-        h3c.session.write_line('')
-        h3c.session.expect(f'[{h3c.sysname}]')
-        # Enter vlan 1
-        h3c.execute_command('vlan 1')
-        # check vlan 1
-        h3c.session.write_line('')
-        h3c.session.expect('-vlan1]')
-        h3c.system_view()
-        # check system view
-        h3c.session.write_line('')
-        h3c.session.expect(f'[{h3c.sysname}]')
+    # default system view, quit to user view
+    h3c.execute_command('qu')
+    # enter system view
+    h3c.system_view()
+    # check system view
+    assert h3c.session
+    h3c.session.flush_data()
+    h3c.session.write_line('')
+    h3c.session.expect(f'[{h3c.sysname}]')
+    # enter system view
+    h3c.system_view()
+    # check system view
+    h3c.session.write_line('')
+    h3c.session.expect(f'[{h3c.sysname}]')
+    # Enter vlan 1
+    h3c.execute_command('vlan 1')
+    # check vlan 1
+    h3c.session.write_line('')
+    h3c.session.expect('-vlan1]')
+    h3c.system_view()
+    # check system view
+    h3c.session.write_line('')
+    h3c.session.expect(f'[{h3c.sysname}]')
 
 
 @pytest.mark.skipif(not H3C_SWITCH_CONFIG, reason='H3C_SWITCH_CONFIG is not set')
-def test_h3c_get_methods() -> None:
+def test_h3c_get_methods(h3c: H3CSwitch) -> None:
     """Test system view of H3C switch."""
-    config = SwitchConfig(**json.loads(H3C_SWITCH_CONFIG))
-    with H3CSwitch(config) as h3c:
-        # get vlan list
-        vlan_list = h3c.get_vlan_info()
-        assert vlan_list
-        vlan_0 = vlan_list[0]
-        assert vlan_0.id != 0
-        assert vlan_0.ip != ''
-        assert vlan_0.mask != ''
-        # get pool list
-        pool_list = h3c.get_pool_info()
-        assert pool_list
-        pool_0 = pool_list[0]
-        assert pool_0.name != ''
-        assert pool_0.ip != ''
-        assert pool_0.mask != ''
-        assert pool_0.gateway != ''
-        assert pool_0.dns_list != ''
-        assert pool_0.vlan_id != 0
-        # get interface list
-        interface_list = h3c.get_interface_info()
-        assert interface_list
-        interface_names = [interface_info.name for interface_info in interface_list]
-        assert '1/0/1' in ' '.join(interface_names)
-        # get arp list
-        arp_list = h3c.get_arp_info()
-        assert arp_list
-        # get static bind list
-        static_bind_list = h3c.get_static_bind_info()
-        assert static_bind_list
+    # get vlan list
+    vlan_list = h3c.get_vlan_info()
+    assert vlan_list
+    vlan_0 = vlan_list[0]
+    assert vlan_0.id != 0
+    assert vlan_0.ip != ''
+    assert vlan_0.mask != ''
+    # get pool list
+    pool_list = h3c.get_pool_info()
+    assert pool_list
+    pool_0 = pool_list[0]
+    assert pool_0.name != ''
+    assert pool_0.ip != ''
+    assert pool_0.mask != ''
+    assert pool_0.gateway != ''
+    assert pool_0.dns_list != ''
+    assert pool_0.vlan_id != 0
+    # get interface list
+    interface_list = h3c.get_interface_info()
+    assert interface_list
+    interface_names = [interface_info.name for interface_info in interface_list]
+    assert '1/0/1' in ' '.join(interface_names)
+    # get arp list
+    arp_list = h3c.get_arp_info()
+    assert arp_list
+    # get static bind list
+    static_bind_list = h3c.get_static_bind_info()
+    assert static_bind_list
 
 
 @pytest.mark.skipif(not H3C_SWITCH_CONFIG, reason='H3C_SWITCH_CONFIG is not set')
-def test_h3c_add_static_bind() -> None:
+def test_h3c_add_static_bind(h3c: H3CSwitch) -> None:
     """Test system view of H3C switch."""
     test_bind_ip = os.getenv('H3C_SWITCH_TEST_BIND_IP', '192.168.254.2')
-    config = SwitchConfig(**json.loads(H3C_SWITCH_CONFIG))
-    with H3CSwitch(config) as h3c:
-        res = h3c.add_one_static_bind(test_bind_ip, '11:22:33:44:AA:BB', mask='255.255.255.0')
-        assert res
-        bind_list = h3c.get_static_bind_info()
-        assert bind_list
-        assert test_bind_ip in [bind_info.ip for bind_info in bind_list]
-        bind_info = [bind_info for bind_info in bind_list if bind_info.ip == test_bind_ip][0]
-        assert bind_info.mac == '11:22:33:44:AA:BB'
-        assert h3c.need_save is True
+    res = h3c.add_one_static_bind(test_bind_ip, '11:22:33:44:AA:BB', mask='255.255.255.0')
+    assert res
+    bind_list = h3c.get_static_bind_info()
+    assert bind_list
+    assert test_bind_ip in [bind_info.ip for bind_info in bind_list]
+    bind_info = [bind_info for bind_info in bind_list if bind_info.ip == test_bind_ip][0]
+    assert bind_info.mac == '11:22:33:44:AA:BB'
+    assert h3c.need_save is True
 
 
 if __name__ == '__main__':
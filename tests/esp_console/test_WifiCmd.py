@@ -3,6 +3,7 @@ import logging
 import os
 import pathlib
 import re
+import select
 import sys
 import threading
 import time
@@ -49,8 +50,8 @@ def test_wifi_cmd_get_version_dut() -> None:
     ser = serial.Serial(SERIAL_PORT, 115200, timeout=0.001)
     with dut_wrapper(ser) as dut:
         dut.write(b'help\r\n')
-        time.sleep(2)
-        _match = dut.expect(re.compile('.+', re.DOTALL), timeout=0)
+        # esp_console prints the commands sorted, "scan" comes before "sta_scan"
+        _match = dut.expect(re.compile(r'.*\nsta_scan [^\n]*\n', re.DOTALL), timeout=3)
         assert _match
         help_log = _match.group(0)
         logging.debug(f'help_log: {help_log}')
@@ -70,7 +71,8 @@ def test_wifi_cmd_sta_connect_dut() -> None:
         dut.write(b'\r\n')
         time.sleep(0.1)
         dut.write(b'sta_disconnect\r\n')
-        time.sleep(0.2)
+        # wait for the console echo instead of a fixed sleep
+        dut.expect('sta_disconnect', timeout=1)
         conn_cmd = WifiCmd.gen_connect_cmd(test_ssid, test_passwd)
         info = WifiCmd.connect_to_ap(
             dut,
@@ -83,68 +85,69 @@ def test_wifi_cmd_sta_connect_dut() -> None:
 
 @pytest.mark.skipif(sys.platform == 'win32', reason='Windows does not support pty')
 class TestWifiCmd(unittest.TestCase):
-    def setUp(self) -> None:
-        self.master, self.slave = pty.openpty()
-        self.serial_port = os.ttyname(self.slave)
-        logging.debug(f'openpty master:{self.master} slave:{self.slave} serial_port:{self.serial_port}')
-        self.dut_obj = None
-
-    def tearDown(self) -> None:
+    # one pty pair for all cases, each case opens its own serial port on the slave side
+    master: int
+    slave: int
+    serial_port: str
+    fw_master: io.BufferedIOBase
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.master, cls.slave = pty.openpty()
+        cls.serial_port = os.ttyname(cls.slave)
+        logging.debug(f'openpty master:{cls.master} slave:{cls.slave} serial_port:{cls.serial_port}')
+        cls.fw_master = os.fdopen(cls.master, 'wb')
+
+    @classmethod
+    def tearDownClass(cls) -> None:
         try:
-            os.close(self.master)
+            # also closes cls.master
+            cls.fw_master.close()
         except OSError:
-            # file descriptor may be closed by `with os.fdopen()` or _close_file_io()
             pass
         try:
-            os.close(self.slave)
+            os.close(cls.slave)
         except OSError:
-            # file descriptor may be closed by `serial.close()`
             pass
 
-    @staticmethod
-    def _close_file_io(file_io: io.BufferedIOBase) -> None:
-        try:
-            file_io.close()
-        except OSError:
-            pass
+    def setUp(self) -> None:
+        # drop commands written by the previous case, the slave input is flushed when serial port is opened
+        while select.select([self.master], [], [], 0)[0]:
+            if not os.read(self.master, 65536):
+                break
+        self.dut_obj = None
 
     @staticmethod
     def _serial_append_log(fw_master: io.BufferedIOBase, log_file: str) -> None:
         with open(str(TEST_FILES_PATH / log_file), 'rb') as f:
             data = f.read()
+        view = memoryview(data)
         try:
-            while len(data) > 2048:
-                fw_master.write(data[:2048])
-                data = data[2048:]
+            # a blocking pty write waits for the reader, no need to sleep between chunks
+            for offset in range(0, len(view), 2048):
+                fw_master.write(view[offset : offset + 2048])
                 fw_master.flush()
-                time.sleep(0.01)
-            fw_master.write(data)
-            fw_master.flush()
         except IOError:
             pass
 
     def _test_wifi_cmd_sta_connect_suc(self, log_file: str) -> ConnectedInfo:
         ser = serial.Serial(self.serial_port, 115200, timeout=0.001)
-        fw_master = os.fdopen(self.master, 'wb')
-        try:
-            with dut_wrapper(ser, 'MyDut') as dut:
-                kwargs = {'fw_master': fw_master, 'log_file': log_file}
-                timer = threading.Timer(0.5, self._serial_append_log, kwargs=kwargs)
-                timer.start()
-
-                conn_cmd = WifiCmd.gen_connect_cmd('testap-11', password='00000000')
-                info = WifiCmd.connect_to_ap(
-                    dut,
-                    conn_cmd,
-                    timeout=5,
-                )
-                assert info.ssid == 'testap-11'
-                assert info.channel == 11
-                timer.cancel()
-                timer.join()
-                return info
-        finally:
-            self._close_file_io(fw_master)
+        with dut_wrapper(ser, 'MyDut') as dut:
+            kwargs = {'fw_master': self.fw_master, 'log_file': log_file}
+            # the read thread is running once wrapped, logs written before expect() are buffered
+            writer = threading.Thread(target=self._serial_append_log, kwargs=kwargs, daemon=True)
+            writer.start()
+
+            conn_cmd = WifiCmd.gen_connect_cmd('testap-11', password='00000000')
+            info = WifiCmd.connect_to_ap(
+                dut,
+                conn_cmd,
+                timeout=5,
+            )
+            assert info.ssid == 'testap-11'
+            assert info.channel == 11
+            writer.join()
+            return info
 
     def test_wifi_cmd_sta_connect_v1(self) -> None:
         info = self._test_wifi_cmd_sta_connect_suc('wifi_cmd_connected_1.log')
@@ -170,19 +173,18 @@ class TestWifiCmdWin32(unittest.TestCase):
     def _serial_append_log(ser: serial.SerialBase, log_file: str) -> None:
         with open(str(TEST_FILES_PATH / log_file), 'rb') as f:
             data = f.read()
-        while len(data) > 2048:
-            ser.write(data[:2048])
-            data = data[2048:]
-            time.sleep(0.01)
-        ser.write(data)
+        view = memoryview(data)
+        for offset in range(0, len(view), 2048):
+            ser.write(view[offset : offset + 2048])
 
     def _test_wifi_cmd_sta_connect_suc(self, log_file: str) -> ConnectedInfo:
         ser = serial.serial_for_url('loop://', 115200, timeout=0.001)
 
         with dut_wrapper(ser, 'MyDut') as dut:
             kwargs = {'ser': ser, 'log_file': log_file}
-            timer = threading.Timer(0.5, self._serial_append_log, kwargs=kwargs)
-            timer.start()
+            # the read thread is running once wrapped, logs written before expect() are buffered
+            writer = threading.Thread(target=self._serial_append_log, kwargs=kwargs, daemon=True)
+            writer.start()
 
             conn_cmd = WifiCmd.gen_connect_cmd('testap-11', password='00000000')
             info = WifiCmd.connect_to_ap(
@@ -192,8 +194,7 @@ class TestWifiCmdWin32(unittest.TestCase):
             )
             assert info.ssid == 'testap-11'
             assert info.channel == 11
-            timer.cancel()
-            timer.join()
+            writer.join()
             return info
 
     def test_wifi_cmd_sta_connect_v1(self) -> None:
@@ -1,16 +1,33 @@
+import base64
+import importlib.util
 import logging
+import struct
 from pathlib import Path
 
 import pytest
 
 from esptest.iperf_utility import line_chart
 
-try:
-    import pyecharts  # noqa: F401
+# only probe, do not import pyecharts during test collection
+PYECHARTS_INSTALLED = importlib.util.find_spec('pyecharts') is not None
 
-    PYECHARTS_INSTALLED = True
-except ImportError:
-    PYECHARTS_INSTALLED = False
+
+def test_max_min_legend() -> None:
+    assert line_chart._max_min_legend([1, None, 3, 2]) == ' (max: 3, min: 1)'
+    assert line_chart._max_min_legend([None, None]) == ''
+    assert line_chart._max_min_legend([1, 'a']) == ''  # type: ignore
+
+
+def test_pack_float32_base64() -> None:
+    packed = base64.b64decode(line_chart._pack_float32_base64([[0, 1.5], [-2, 0]]))
+    assert struct.unpack('<4f', packed) == (0, 1.5, -2, 0)
+    # 4 bytes per value before base64, much smaller than a json array literal
+    assert len(line_chart._pack_float32_base64([[0.5] * 10_000, [-1.25] * 10_000])) == 106668
+
+
+def test_series_columns() -> None:
+    y_data = [{'a': 1, 'b': None}, {'a': None, 'b': 2.5}]
+    assert line_chart._series_columns(y_data, ['a', 'b']) == [[1, None], [None, 2.5]]
 
 
 @pytest.mark.skipif(PYECHARTS_INSTALLED, reason='Only run this case if pyecharts is not installed.')
@@ -96,6 +113,16 @@ def test_draw_line_enhance_charts(tmp_path: Path) -> None:
     logging.info(f'test_draw_line_charts path: {str(tmp_path)}')
 
 
+@pytest.mark.skipif(not PYECHARTS_INSTALLED, reason='Only run this case if pyecharts is installed.')
+def test_draw_line_charts_large(tmp_path: Path) -> None:
+    file_name = str(tmp_path / 'charts_large.html')
+    y_data = [{'a': i % 100 or None, 'b': float(i)} for i in range(10_000)]
+    line_chart.draw_line_chart_basic(file_name, 'title', y_data, show_diff_tooltip=True)
+    content = Path(file_name).read_text()
+    assert 'var alldiffs' in content
+    assert 'k * 10000, (k + 1) * 10000' in content
+
+
 if __name__ == '__main__':
     # Breakpoints do not work with coverage, disable coverage for debugging
     pytest.main([__file__, '--no-cov', '--log-cli-level=DEBUG'])
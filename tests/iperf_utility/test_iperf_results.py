@@ -1,3 +1,4 @@
+import importlib.util
 import os
 from pathlib import Path
 
@@ -5,12 +6,8 @@ import pytest
 
 from esptest.iperf_utility.iperf_results import FixRateReportOptions, IperfResult, IperfResultsRecord
 
-try:
-    import pyecharts  # noqa: F401
-
-    has_pyecharts = True
-except ImportError:
-    has_pyecharts = False
+# only probe, do not import pyecharts during test collection
+has_pyecharts = importlib.util.find_spec('pyecharts') is not None
 
 
 def test_iperf_result_to_dict() -> None:
@@ -24,23 +21,22 @@ def test_iperf_result_to_dict() -> None:
 @pytest.mark.skipif(not has_pyecharts, reason='pyecharts not installed')
 def test_iperf_record(tmp_path: Path) -> None:
     record = IperfResultsRecord()
-    # results data
-    _res = IperfResult(avg=100, att=30, rssi=-10, ap_name='ap1')
-    record.append_result(_res)
-    _res = IperfResult(avg=90, att=30, rssi=-10, ap_name='ap2')
-    record.append_result(_res)
-    _res = IperfResult(avg=99, att=32, rssi=-11, ap_name='ap1')
-    record.append_result(_res)
-    _res = IperfResult(avg=89, att=32, rssi=-12, ap_name='ap2')
-    record.append_result(_res)
-    _res = IperfResult(avg=98, att=34, rssi=-13, ap_name='ap1')
-    record.append_result(_res)
-    _res = IperfResult(avg=87, att=34, rssi=-14, ap_name='ap2')
-    record.append_result(_res)
-    _res = IperfResult(avg=80, att=35, rssi=-14.2, ap_name='ap1')
-    record.append_result(_res)
-    _res = IperfResult(avg=81, att=35, rssi=-14.2, ap_name='ap2')
-    record.append_result(_res)
+    # results data: avg, att, rssi, ap_name
+    data = [
+        (100, 30, -10, 'ap1'),
+        (90, 30, -10, 'ap2'),
+        (99, 32, -11, 'ap1'),
+        (89, 32, -12, 'ap2'),
+        (98, 34, -13, 'ap1'),
+        (87, 34, -14, 'ap2'),
+        (80, 35, -14.2, 'ap1'),
+        (81, 35, -14.2, 'ap2'),
+    ]
+    record.extend_results(IperfResult(avg=avg, att=att, rssi=rssi, ap_name=ap) for avg, att, rssi, ap in data)
+    results_by_ap = record.dict_by_ap()
+    assert sorted(results_by_ap) == ['ap1', 'ap2']
+    assert sum(len(results) for results in results_by_ap.values()) == 8
+    assert [r.avg for r in record.dict_by_att()[35]] == [80, 81]
     # test draw
     _file = str(tmp_path / 'chart1.html')
     record.draw_rssi_vs_att_chart(_file)
@@ -54,6 +54,13 @@ def test_parse_iperf_data_dut() -> None:
     assert parser.throughput_list[1] == 13.04
 
 
+def test_parse_iperf_data_invalid() -> None:
+    with pytest.raises(ValueError):
+        IperfDataParser('iperf log without any report\n' * 1000)
+    with pytest.raises(ValueError):
+        IperfDataParser('[  3]  0.0- 1.0 sec  bits/sec\n')
+
+
 if __name__ == '__main__':
     # Breakpoints do not work with coverage, disable coverage for debugging
     pytest.main([__file__, '--no-cov', '--log-cli-level=DEBUG'])
@@ -1,5 +1,7 @@
 from unittest import mock
 
+import pytest
+
 from esptest.scripts import downbin
 
 
@@ -47,3 +49,9 @@ def test_main_merged_resolves_bin_path_with_allow_merged() -> None:
         check_no_stub=False,
         baud=0,
     )
+
+
+def test_parse_port_range() -> None:
+    assert downbin._parse_port_range('0-2') == ['ttyUSB0', 'ttyUSB1', 'ttyUSB2']
+    with pytest.raises(ValueError):
+        downbin._parse_port_range('0-10abc')
@@ -3,9 +3,12 @@ import os
 from contextlib import contextmanager
 from pathlib import Path
 from typing import Dict, Generator
+from unittest import mock
 
 import pytest
+import yaml
 
+import esptest.config.env_config as env_config_module
 from esptest.config import EnvConfig
 
 DEF_TEST_CONFIG = """
@@ -17,24 +20,40 @@ wifi_ap:
 """
 
 
+# shell env variables read by EnvConfig, unset unless given to reload_envconfig
+ENV_CONFIG_VARS = [
+    'TEST_ENV_CONFIG_FILE',
+    'PROJECT_ROOT_DIR',
+    'CI_PROJECT_DIR',
+    'CI',
+    'RUNNER_WIFI_SSID',
+    'RUNNER_AP_SSID',
+]
+
+
 @contextmanager
-def reload_envconfig(env: Dict[str, str]) -> Generator[None, None, None]:
-    saved_env = os.environ.copy()
-    os.environ = env  # type: ignore
-    EnvConfig._reload()  # pylint: disable=protected-access
-    yield
-    os.environ = saved_env  # type: ignore
-    EnvConfig._reload()  # pylint: disable=protected-access
+def reload_envconfig(monkeypatch: pytest.MonkeyPatch, env: Dict[str, str]) -> Generator[pytest.MonkeyPatch, None, None]:
+    with monkeypatch.context() as mp:
+        for name in ENV_CONFIG_VARS:
+            mp.delenv(name, raising=False)
+        for name, value in env.items():
+            mp.setenv(name, value)
+        EnvConfig._reload()  # pylint: disable=protected-access
+        try:
+            yield mp
+        finally:
+            mp.undo()
+            EnvConfig._reload()  # pylint: disable=protected-access
 
 
-def test_env_config_paths(tmp_path: Path) -> None:
+def test_env_config_paths(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
     prev_env_config_file = EnvConfig.TEST_ENV_CONFIG_FILE
     original_config_file_name = EnvConfig.ENV_CONFIG_FILE_BASE_NAME
     EnvConfig.ENV_CONFIG_FILE_BASE_NAME = 'not_exist_env_config_file.yml'
     try:
         assert not os.path.exists(EnvConfig.ENV_CONFIG_FILE_BASE_NAME)
         env = {'CI': '1'}
-        with reload_envconfig(env):
+        with reload_envconfig(monkeypatch, env):
             assert EnvConfig.ALLOW_INPUT is False
             with pytest.raises(OSError):
                 _ = EnvConfig()
@@ -42,19 +61,19 @@ def test_env_config_paths(tmp_path: Path) -> None:
         EnvConfig.ENV_CONFIG_FILE_BASE_NAME = original_config_file_name
     # Test environment `TEST_ENV_CONFIG_FILE`
     env = {'TEST_ENV_CONFIG_FILE': str(tmp_path / 'my_config.yml')}
-    with reload_envconfig(env):
+    with reload_envconfig(monkeypatch, env):
         assert EnvConfig.TEST_ENV_CONFIG_FILE == str(tmp_path / 'my_config.yml')
         assert EnvConfig.ALLOW_INPUT is True
     # also test reload_envconfig
     assert EnvConfig.TEST_ENV_CONFIG_FILE == prev_env_config_file
 
 
-def test_env_config_get_var(tmp_path: Path) -> None:
+def test_env_config_get_var(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
     config_file = tmp_path / 'my_config.yml'
     with open(config_file, 'w') as f:
         f.write(DEF_TEST_CONFIG)
     env = {'TEST_ENV_CONFIG_FILE': str(config_file), 'CI': '1'}
-    with reload_envconfig(env):
+    with reload_envconfig(monkeypatch, env):
         env_config = EnvConfig()
         assert env_config.get_variable('dut_port') == '/dev/ttyUSB0'
         with pytest.raises(ValueError):
@@ -65,37 +84,46 @@ def test_env_config_get_var(tmp_path: Path) -> None:
             env_config.get_variable('dut_port')
 
 
-def test_env_config_from_shell_env(tmp_path: Path) -> None:
+def test_env_config_from_shell_env(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
     # Test Get variable from console
     config_file = tmp_path / 'not_exist_config.yml'
     env = {
         'TEST_ENV_CONFIG_FILE': str(config_file),
     }
-    with reload_envconfig(env):
-        try:
-            os.environ.pop('RUNNER_WIFI_SSID')
-        except KeyError:
-            pass
-        try:
-            os.environ.pop('RUNNER_AP_SSID')
-        except KeyError:
-            pass
+    with reload_envconfig(monkeypatch, env) as mp:
         env_config = EnvConfig()
         env_config.ALLOW_INPUT = False
         with pytest.raises(ValueError):
             var = env_config.get_variable('ap_ssid')
-        os.environ['RUNNER_AP_SSID'] = 'ssid_from_env'
+        mp.setenv('RUNNER_AP_SSID', 'ssid_from_env')
         var = env_config.get_variable('ap_ssid')
         assert var == 'ssid_from_env'
 
 
+def test_env_config_file_parsed_once(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    config_file = tmp_path / 'my_config.yml'
+    config_file.write_text(DEF_TEST_CONFIG)
+    with mock.patch.object(env_config_module.yaml, 'load', wraps=yaml.load) as mock_load:
+        with reload_envconfig(monkeypatch, {'TEST_ENV_CONFIG_FILE': str(config_file), 'CI': '1'}):
+            assert EnvConfig().get_variable('dut_port') == '/dev/ttyUSB0'
+            assert EnvConfig('wifi_ap').get_variable('ap_ssid') == 'wifi_ap_ssid'
+            assert mock_load.call_count == 1
+            # cached data is not shared between instances
+            EnvConfig().config_data['dut_port'] = 'changed'
+            assert EnvConfig().get_variable('dut_port') == '/dev/ttyUSB0'
+            # a changed file is parsed again
+            config_file.write_text(DEF_TEST_CONFIG.replace('ttyUSB0', 'ttyUSB10'))
+            assert EnvConfig().get_variable('dut_port') == '/dev/ttyUSB10'
+            assert mock_load.call_count == 2
+
+
 def test_env_config_from_console(tmp_path, monkeypatch):  # type: ignore
     # Test Get variable from console
     config_file = tmp_path / 'not_exist_config.yml'
     env = {
         'TEST_ENV_CONFIG_FILE': str(config_file),
     }
-    with reload_envconfig(env):
+    with reload_envconfig(monkeypatch, env):
         env_config = EnvConfig()
         monkeypatch.setattr('sys.stdin', io.StringIO('value2'))
         var = env_config.get_variable('not_exist_key')
@@ -1,14 +1,19 @@
 import inspect
+import subprocess
 import sys
 
 
 def test_import_from_all() -> None:
-    if 'esptest' in sys.modules:
-        del sys.modules['esptest']
-
     # exported methods / classes
     from esptest.all import DutBase, DutConfig, EspDut, SerialPort, dut_wrapper, get_logger, run_cmd, to_bytes, to_str
 
     # pass ruff format
     assert all(callable(fn) for fn in [dut_wrapper, to_bytes, to_str, run_cmd, get_logger])
     assert all(inspect.isclass(cls) for cls in [DutBase, DutConfig, EspDut, SerialPort])
+
+
+def test_import_all_does_not_load_urllib_request() -> None:
+    # run in a new interpreter, other tests may have imported it already
+    code = "import sys, esptest.all; print('urllib.request' in sys.modules)"
+    output = subprocess.check_output([sys.executable, '-c', code], text=True)
+    assert output.strip() == 'False'
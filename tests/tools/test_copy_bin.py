@@ -1,10 +1,15 @@
+import shutil
 import zipfile
 from pathlib import Path
 
 import pytest
 
 import esptest.tools.copy_bin as copy_bin_module
+import esptest.utility.parse_bin_path as parse_bin_path_module
 from esptest.tools.copy_bin import copy_bin_to_new_path
+from esptest.utility.parse_bin_path import DEFAULT_GEN_PART_TOOL
+
+TEST_BIN_ZIP = Path(__file__).parent.parent / 'utility' / '_files' / 'test-bin.zip'
 
 
 def _write_text(path: Path, content: str = 'x') -> None:
@@ -94,3 +99,80 @@ def test_copy_bin_to_new_path_supports_extra_files(tmp_path: Path, monkeypatch:
     assert (to_dir / 'app.bin').is_file()
     assert (to_dir / 'custom' / 'report.log').is_file()
     assert (to_dir / 'custom' / 'meta' / 'manifest.txt').is_file()
+
+
+def test_copy_bin_to_new_path_overlapping_patterns(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(copy_bin_module, 'IDF_PATH', '')
+    default_patterns = copy_bin_module.BuildFilesPatterns.BIN_FILES[:]
+
+    from_dir = tmp_path / 'build'
+    _write_text(from_dir / 'app.bin')
+    _write_text(from_dir / 'bootloader' / 'bootloader.bin')
+
+    to_dir = tmp_path / 'out-overlap'
+    copied = []
+    monkeypatch.setattr(copy_bin_module.shutil, 'copy', lambda src, dst: copied.append(Path(dst)))
+    copy_bin_to_new_path(str(from_dir), str(to_dir), copy_elf=False, extra_files=['*.bin', 'bootloader/*'])
+
+    assert sorted(copied) == [to_dir / 'app.bin', to_dir / 'bootloader' / 'bootloader.bin']
+    assert (to_dir / 'bootloader').is_dir()
+    assert copy_bin_module.BuildFilesPatterns.BIN_FILES == default_patterns
+
+
+def test_copy_bin_to_new_path_gen_partition_csv_in_process(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    idf_path = tmp_path / 'idf'
+    (idf_path / 'components' / 'partition_table').mkdir(parents=True)
+    shutil.copy(DEFAULT_GEN_PART_TOOL, str(idf_path / 'components' / 'partition_table' / 'gen_esp32part.py'))
+    monkeypatch.setattr(copy_bin_module, 'IDF_PATH', str(idf_path))
+
+    def _no_subprocess(*args, **kwargs):  # type: ignore
+        raise AssertionError('gen_esp32part.py should not be run as a subprocess')
+
+    monkeypatch.setattr(parse_bin_path_module.subprocess, 'run', _no_subprocess)
+    monkeypatch.setattr(copy_bin_module.subprocess, 'check_call', _no_subprocess)
+
+    from_dir = tmp_path / 'build'
+    with zipfile.ZipFile(TEST_BIN_ZIP) as zf:
+        part_bin = zf.read('partition_table/partition-table.bin')
+    (from_dir / 'partition_table').mkdir(parents=True)
+    (from_dir / 'partition_table' / 'partition-table.bin').write_bytes(part_bin)
+
+    to_dir = tmp_path / 'out'
+    copy_bin_to_new_path(str(from_dir), str(to_dir), copy_elf=False)
+    part_csv = to_dir / 'partition_table' / 'partition-table.csv'
+    assert part_csv.is_file()
+    assert 'nvs' in part_csv.read_text(encoding='utf-8')
+
+
+def test_copy_bin_to_new_path_gen_partition_csv_failed(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    idf_path = tmp_path / 'idf'
+    (idf_path / 'components' / 'partition_table').mkdir(parents=True)
+    (idf_path / 'components' / 'partition_table' / 'gen_esp32part.py').write_text(
+        "import sys\nif __name__ == '__main__':\n    sys.exit(2)\n"
+    )
+    monkeypatch.setattr(copy_bin_module, 'IDF_PATH', str(idf_path))
+
+    from_dir = tmp_path / 'build'
+    _write_text(from_dir / 'partition_table' / 'partition-table.bin')
+    to_dir = tmp_path / 'out'
+    # the error is logged, the bin files are still copied
+    copy_bin_to_new_path(str(from_dir), str(to_dir), copy_elf=False)
+    assert (to_dir / 'partition_table' / 'partition-table.bin').is_file()
+    assert not (to_dir / 'partition_table' / 'partition-table.csv').exists()
+
+
+def test_collect_build_files_single_walk(tmp_path: Path) -> None:
+    from_dir = tmp_path / 'build'
+    _write_text(from_dir / 'app.bin')
+    _write_text(from_dir / 'bootloader' / 'bootloader.bin')
+    _write_text(from_dir / 'esp-idf' / 'main' / 'main.bin')
+    _write_text(from_dir / 'custom' / 'a' / 'b' / 'deep.txt')
+    (from_dir / 'dir.bin').mkdir()
+
+    files = copy_bin_module._collect_build_files(from_dir, ['*.bin', 'bootloader/*.bin', 'custom/**/*.txt'])
+
+    assert files == {
+        Path('app.bin'): from_dir / 'app.bin',
+        Path('bootloader/bootloader.bin'): from_dir / 'bootloader' / 'bootloader.bin',
+        Path('custom/a/b/deep.txt'): from_dir / 'custom' / 'a' / 'b' / 'deep.txt',
+    }
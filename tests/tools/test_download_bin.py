@@ -1,6 +1,7 @@
-import subprocess
+import asyncio
+import sys
 from pathlib import Path
-from typing import Tuple
+from typing import List, Tuple
 from unittest import mock
 
 import pytest
@@ -10,6 +11,11 @@ from esptest.tools.download_bin import BinConfig, DownBinTool, download_bin_to_p
 from esptest.utility.parse_bin_path import bin_path_to_dir as bin_path_to_dir_canonical
 
 
+async def _noop_async(*_args: object, **_kwargs: object) -> None:
+    # 3.7-compatible replacement for an async mock (mock.AsyncMock needs 3.8+)
+    return None
+
+
 # 使用 patch.object(module, ...) 而非 patch('esptest.tools...')，避免 Py 3.7 下 esptest.tools 未加载时的 AttributeError
 # @mock.patch('esptest.tools.download_bin.DownBinTool')
 @mock.patch.object(download_bin_module, 'DownBinTool')
@@ -17,6 +23,7 @@ def test_download_bin_to_ports_calls_down_tool_per_port(
     mock_down_bin_tool: mock.MagicMock,
 ) -> None:
     """download_bin_to_ports 应对每个 port 用同一 bin_path 创建 DownBinTool 并调用 download。"""
+    mock_down_bin_tool.return_value.download_async.side_effect = _noop_async
     bin_path = '/path/to/bin'
     ports = ['/dev/ttyUSB0', '/dev/ttyUSB1']
     download_bin_to_ports(bin_path, ports, erase_nvs=True, max_workers=2)
@@ -29,6 +36,7 @@ def test_download_bin_to_ports_calls_down_tool_per_port(
         esptool='',
         force_no_stub=False,
         check_no_stub=False,
+        check_encryption=True,
     )
     mock_down_bin_tool.assert_any_call(
         bin_path,
@@ -38,8 +46,9 @@ def test_download_bin_to_ports_calls_down_tool_per_port(
         esptool='',
         force_no_stub=False,
         check_no_stub=False,
+        check_encryption=True,
     )
-    assert mock_down_bin_tool.return_value.download.call_count == 2
+    assert mock_down_bin_tool.return_value.download_async.call_count == 2
 
 
 @mock.patch.object(download_bin_module, 'DownBinTool')
@@ -47,6 +56,7 @@ def test_download_bins_calls_down_tool_per_config(
     mock_down_bin_tool: mock.MagicMock,
 ) -> None:
     """download_bins 应对每个 BinConfig 创建 DownBinTool 并调用 download。"""
+    mock_down_bin_tool.return_value.download_async.side_effect = _noop_async
     configs = [
         BinConfig(bin_path='/path/to/bin1', port='/dev/ttyUSB0'),
         BinConfig(bin_path='/path/to/bin2', port='/dev/ttyUSB1', erase_nvs=False),
@@ -71,12 +81,26 @@ def test_download_bins_calls_down_tool_per_config(
         force_no_stub=False,
         check_no_stub=False,
     )
-    assert mock_down_bin_tool.return_value.download.call_count == 2
+    assert mock_down_bin_tool.return_value.download_async.call_count == 2
+
+
+@mock.patch.object(download_bin_module, 'DownBinTool')
+def test_download_bin_to_ports_uses_per_call_executor(mock_down_bin_tool: mock.MagicMock) -> None:
+    """每次调用使用独立的线程池，下载结束后关闭，不修改 loop 的默认 executor。"""
+    mock_down_bin_tool.return_value.download_async.side_effect = _noop_async
+    download_bin_to_ports('/path/to/bin', ['/dev/ttyUSB0', '/dev/ttyUSB1'], max_workers=1)
+    executors = {c.args[0] for c in mock_down_bin_tool.return_value.download_async.call_args_list}
+    assert len(executors) == 1
+    executor = executors.pop()
+    assert executor._max_workers == 1
+    with pytest.raises(RuntimeError):
+        executor.submit(print)
 
 
 @mock.patch.object(download_bin_module, 'DownBinTool')
 def test_download_bins_empty_list(mock_down_bin_tool: mock.MagicMock) -> None:
     """空配置列表时不应创建 DownBinTool，不抛错。"""
+    mock_down_bin_tool.return_value.download_async.side_effect = _noop_async
     download_bins([], max_workers=1)
     mock_down_bin_tool.assert_not_called()
 
@@ -84,6 +108,7 @@ def test_download_bins_empty_list(mock_down_bin_tool: mock.MagicMock) -> None:
 @mock.patch.object(download_bin_module, 'DownBinTool')
 def test_download_bins_default_max_workers(mock_down_bin_tool: mock.MagicMock) -> None:
     """单配置时创建一次 DownBinTool 并调用 download。"""
+    mock_down_bin_tool.return_value.download_async.side_effect = _noop_async
     configs = [BinConfig(bin_path='/bin/path', port='/dev/ttyUSB0')]
     download_bins(configs)
     mock_down_bin_tool.assert_called_once_with(
@@ -95,12 +120,13 @@ def test_download_bins_default_max_workers(mock_down_bin_tool: mock.MagicMock) -
         force_no_stub=False,
         check_no_stub=False,
     )
-    mock_down_bin_tool.return_value.download.assert_called_once()
+    mock_down_bin_tool.return_value.download_async.assert_called_once()
 
 
 @mock.patch.object(download_bin_module, 'DownBinTool')
 def test_download_bins_bin_config_options(mock_down_bin_tool: mock.MagicMock) -> None:
     """BinConfig 的 erase_nvs/force_no_stub/check_no_stub 应传入 DownBinTool。"""
+    mock_down_bin_tool.return_value.download_async.side_effect = _noop_async
     configs = [
         BinConfig(
             bin_path='/path/bin',
@@ -120,12 +146,13 @@ def test_download_bins_bin_config_options(mock_down_bin_tool: mock.MagicMock) ->
         force_no_stub=True,
         check_no_stub=True,
     )
-    mock_down_bin_tool.return_value.download.assert_called_once()
+    mock_down_bin_tool.return_value.download_async.assert_called_once()
 
 
 @mock.patch.object(download_bin_module, 'DownBinTool')
 def test_download_bin_to_ports_passes_baud_to_down_tool(mock_down_bin_tool: mock.MagicMock) -> None:
     """download_bin_to_ports 的 baud 参数应透传给 DownBinTool。"""
+    mock_down_bin_tool.return_value.download_async.side_effect = _noop_async
     download_bin_to_ports('/path/to/bin', ['/dev/ttyUSB0'], baud=[460800, 115200], max_workers=1)
     mock_down_bin_tool.assert_called_once_with(
         '/path/to/bin',
@@ -135,12 +162,14 @@ def test_download_bin_to_ports_passes_baud_to_down_tool(mock_down_bin_tool: mock
         esptool='',
         force_no_stub=False,
         check_no_stub=False,
+        check_encryption=True,
     )
 
 
 @mock.patch.object(download_bin_module, 'DownBinTool')
 def test_download_bins_bin_config_baud_is_forwarded(mock_down_bin_tool: mock.MagicMock) -> None:
     """download_bins 应将 BinConfig.baud 透传到 DownBinTool。"""
+    mock_down_bin_tool.return_value.download_async.side_effect = _noop_async
     configs = [BinConfig(bin_path='/path/bin', port='/dev/ttyUSB0', baud=921600)]
     download_bins(configs, max_workers=1)
     mock_down_bin_tool.assert_called_once_with(
@@ -304,10 +333,10 @@ def test_download_partition_all_bauds_fail_raises(
     assert mock_run.call_count == 2
 
 
-@mock.patch.object(download_bin_module.subprocess, 'check_output')
-def test_get_efuse_summary_calls_espefuse_and_strips(mock_check_output: mock.MagicMock) -> None:
+@mock.patch.object(download_bin_module.subprocess, 'run')
+def test_get_efuse_summary_calls_espefuse_and_strips(mock_run: mock.MagicMock) -> None:
     """_get_efuse_summary 应调用 espefuse summary，并返回 strip 后的文本。"""
-    mock_check_output.return_value = '  FLASH_CRYPT_CNT (0b1)  \n'
+    mock_run.return_value = mock.MagicMock(returncode=0, stdout='  FLASH_CRYPT_CNT (0b1)  \n', stderr='')
     download_bin_module._get_efuse_summary.cache_clear()
     try:
         summary = download_bin_module._get_efuse_summary('/dev/ttyUSB0', 'python -m espefuse')
@@ -315,17 +344,18 @@ def test_get_efuse_summary_calls_espefuse_and_strips(mock_check_output: mock.Mag
         download_bin_module._get_efuse_summary.cache_clear()
 
     assert summary == 'FLASH_CRYPT_CNT (0b1)'
-    mock_check_output.assert_called_once_with(
+    mock_run.assert_called_once_with(
         ['python', '-m', 'espefuse', '--port', '/dev/ttyUSB0', 'summary'],
-        stderr=subprocess.STDOUT,
+        capture_output=True,
         text=True,
+        check=False,
     )
 
 
-@mock.patch.object(download_bin_module.subprocess, 'check_output')
-def test_get_efuse_summary_is_cached_per_port_and_tool(mock_check_output: mock.MagicMock) -> None:
+@mock.patch.object(download_bin_module.subprocess, 'run')
+def test_get_efuse_summary_is_cached_per_port_and_tool(mock_run: mock.MagicMock) -> None:
     """相同 port/espefuse 应命中 lru_cache，仅调用一次 subprocess。"""
-    mock_check_output.return_value = 'summary'
+    mock_run.return_value = mock.MagicMock(returncode=0, stdout='summary', stderr='')
     download_bin_module._get_efuse_summary.cache_clear()
     try:
         first = download_bin_module._get_efuse_summary('/dev/ttyUSB0', 'python -m espefuse')
@@ -336,15 +366,13 @@ def test_get_efuse_summary_is_cached_per_port_and_tool(mock_check_output: mock.M
 
     assert first == second == 'summary'
     assert other == 'summary'
-    assert mock_check_output.call_count == 2
+    assert mock_run.call_count == 2
 
 
-@mock.patch.object(download_bin_module.subprocess, 'check_output')
-def test_get_efuse_summary_raises_runtime_error_on_failure(mock_check_output: mock.MagicMock) -> None:
+@mock.patch.object(download_bin_module.subprocess, 'run')
+def test_get_efuse_summary_raises_runtime_error_on_failure(mock_run: mock.MagicMock) -> None:
     """espefuse 失败时应抛出 RuntimeError，并包含 port/espefuse 信息。"""
-    mock_check_output.side_effect = subprocess.CalledProcessError(
-        1, ['python', '-m', 'espefuse'], output='efuse failed\n'
-    )
+    mock_run.return_value = mock.MagicMock(returncode=1, stdout='efuse failed\n', stderr='')
     download_bin_module._get_efuse_summary.cache_clear()
     try:
         with pytest.raises(RuntimeError, match='Failed to get efuse information from /dev/ttyUSB0'):
@@ -353,6 +381,253 @@ def test_get_efuse_summary_raises_runtime_error_on_failure(mock_check_output: mo
         download_bin_module._get_efuse_summary.cache_clear()
 
 
+@pytest.mark.skipif(sys.platform == 'win32', reason='posix quoting')
+@mock.patch.object(download_bin_module, 'compute_serial_port', return_value='/dev/ttyUSB0')
+def test_down_bin_tool_splits_esptool_cmd_once(_mock_port: mock.MagicMock, tmp_path: Path) -> None:
+    """esptool 命令行在初始化时按 shell 规则拆分一次，支持带空格的路径。"""
+    bin_dir, _ = _partition_bin_fixture(tmp_path)
+    download_bin_module._get_bin_parser.cache_clear()
+    try:
+        tool = DownBinTool(str(bin_dir), '/dev/ttyUSB0', esptool="'/opt/my tools/python' -m esptool")
+    finally:
+        download_bin_module._get_bin_parser.cache_clear()
+
+    assert tool._espefuse_argv == ['/opt/my tools/python', '-m', 'espefuse']
+    assert tool._base_esptool_args == ['/opt/my tools/python', '-m', 'esptool', '-p', '/dev/ttyUSB0']
+    # args are built on a copy
+    assert tool._base_esptool_args == ['/opt/my tools/python', '-m', 'esptool', '-p', '/dev/ttyUSB0']
+
+
+@mock.patch.object(download_bin_module, 'compute_serial_port', return_value='/dev/ttyUSB0')
+def test_down_bin_tool_shares_bin_parser_for_same_build(
+    _mock_port: mock.MagicMock, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """同一个编译目录的不同相对路径共用一个 ParseBinPath 缓存。"""
+    bin_dir, _ = _partition_bin_fixture(tmp_path)
+    monkeypatch.chdir(bin_dir.parent)
+    download_bin_module._get_bin_parser.cache_clear()
+    try:
+        tool_abs = DownBinTool(str(bin_dir), '/dev/ttyUSB0')
+        tool_rel = DownBinTool(f'./{bin_dir.name}/', '/dev/ttyUSB0')
+        assert tool_rel.bin_parser is tool_abs.bin_parser
+        assert download_bin_module._get_bin_parser.cache_info().maxsize == 32
+    finally:
+        download_bin_module._get_bin_parser.cache_clear()
+
+
+@mock.patch.object(download_bin_module, 'compute_serial_port', side_effect=['/dev/ttyUSB0', '/dev/ttyUSB1'])
+def test_resolve_port_is_cached(mock_port: mock.MagicMock, monkeypatch: pytest.MonkeyPatch) -> None:
+    """相同 port 字符串只解析一次，设备节点消失（重新插拔）后重新解析。"""
+    monkeypatch.setattr(download_bin_module, '_resolved_ports', {})
+    with mock.patch.object(download_bin_module.os.path, 'exists', return_value=True):
+        assert download_bin_module._resolve_port('1-1.2') == '/dev/ttyUSB0'
+        assert download_bin_module._resolve_port('1-1.2') == '/dev/ttyUSB0'
+    mock_port.assert_called_once_with('1-1.2', strict=True)
+    with mock.patch.object(download_bin_module.os.path, 'exists', return_value=False):
+        assert download_bin_module._resolve_port('1-1.2') == '/dev/ttyUSB1'
+    assert mock_port.call_count == 2
+
+
+@pytest.mark.parametrize(
+    'summary, encrypted',
+    [
+        ('FLASH_CRYPT_CNT (BLOCK0)    Flash encryption is enabled if this field has an o = 0 R/W (0b0000000)', False),
+        ('FLASH_CRYPT_CNT (BLOCK0)    Flash encryption is enabled if this field has an o = 1 R/W (0b0000001)', True),
+        (
+            'SPI_BOOT_CRYPT_CNT (BLOCK0) Enables flash encryption when 1 or 3 bits are set  = Enable R/W (0b001)\n'
+            '                            and disables otherwise',
+            True,
+        ),
+        ('SPI_BOOT_CRYPT_CNT (BLOCK0) Enables flash encryption when 1 or 3 bits are set  = Disable R/W (0b011)', False),
+        # the value must be on the same line as the efuse name
+        ('SPI_BOOT_CRYPT_CNT (BLOCK0) Enables flash encryption\nOTHER_EFUSE = 1 R/W (0b1)', False),
+        ('KEY_PURPOSE_0 (BLOCK0) = XTS_AES_128_KEY R/W (0x4)', False),
+    ],
+)
+def test_check_flash_encrypted(summary: str, encrypted: bool) -> None:
+    """FLASH_CRYPT_CNT/SPI_BOOT_CRYPT_CNT 中置位数为奇数时表示已加密。"""
+    assert download_bin_module.check_flash_encrypted(summary) is encrypted
+
+
+def _esptool_succeed(*_args: object, **_kwargs: object) -> Tuple[int, str]:
+    return 0, 'Hash of data verified.\n'
+
+
+@mock.patch.object(download_bin_module, '_get_efuse_summary')
+@mock.patch.object(download_bin_module, 'compute_serial_port', return_value='/dev/ttyUSB0')
+@mock.patch.object(download_bin_module, '_run_esptool', side_effect=_esptool_succeed)
+def test_download_skips_efuse_summary_without_check_encryption(
+    mock_run: mock.MagicMock, _mock_port: mock.MagicMock, mock_summary: mock.MagicMock, tmp_path: Path
+) -> None:
+    """check_encryption=False 时不应读取 efuse。"""
+    bin_dir, _ = _partition_bin_fixture(tmp_path)
+
+    download_bin_module._get_bin_parser.cache_clear()
+    try:
+        tool = DownBinTool(
+            str(bin_dir), '/dev/ttyUSB0', baud=115200, esptool='python -m esptool', check_encryption=False
+        )
+        tool.download()
+    finally:
+        download_bin_module._get_bin_parser.cache_clear()
+
+    mock_summary.assert_not_called()
+    mock_run.assert_called_once()
+
+
+@mock.patch.object(download_bin_module, 'compute_serial_port', return_value='/dev/ttyUSB0')
+@mock.patch.object(download_bin_module, '_run_esptool', side_effect=_esptool_succeed)
+def test_download_in_running_event_loop(mock_run: mock.MagicMock, _mock_port: mock.MagicMock, tmp_path: Path) -> None:
+    """download() 不依赖 asyncio，在已运行的事件循环中调用也可以。"""
+    bin_dir, _ = _partition_bin_fixture(tmp_path)
+
+    async def _download_in_loop() -> None:
+        tool = DownBinTool(str(bin_dir), '/dev/ttyUSB0', baud=115200, check_encryption=False)
+        tool.download()
+
+    download_bin_module._get_bin_parser.cache_clear()
+    try:
+        asyncio.run(_download_in_loop())
+    finally:
+        download_bin_module._get_bin_parser.cache_clear()
+    mock_run.assert_called_once()
+
+
+@mock.patch.object(download_bin_module, '_async_subprocess_supported', return_value=False)
+@mock.patch.object(download_bin_module, 'DownBinTool')
+def test_download_bin_to_ports_without_async_subprocess(
+    mock_down_bin_tool: mock.MagicMock, _mock_supported: mock.MagicMock
+) -> None:
+    """不支持 asyncio 子进程时（Python 3.7 Windows/非主线程）回退到在线程池中调用 download()。"""
+    download_bin_to_ports('/path/to/bin', ['/dev/ttyUSB0', '/dev/ttyUSB1'])
+    assert mock_down_bin_tool.return_value.download.call_count == 2
+    mock_down_bin_tool.return_value.download_async.assert_not_called()
+
+
+@mock.patch.object(download_bin_module, 'compute_serial_port', return_value='/dev/ttyUSB0')
+@mock.patch.object(download_bin_module, '_run_esptool')
+def test_download_builds_flash_args_once_for_baud_retries(
+    mock_run: mock.MagicMock, _mock_port: mock.MagicMock, tmp_path: Path
+) -> None:
+    """重试不同波特率时只生成一次烧录参数（stub 检查、nvs 擦除 bin）。"""
+    bin_dir, _ = _partition_bin_fixture(tmp_path)
+
+    def _fail_then_succeed(args):  # type: ignore
+        return (0 if '115200' in args else 2), ''
+
+    mock_run.side_effect = _fail_then_succeed
+    download_bin_module._get_bin_parser.cache_clear()
+    try:
+        tool = DownBinTool(str(bin_dir), '/dev/ttyUSB0', baud=[921600, 115200], check_encryption=False)
+        with mock.patch.object(tool.bin_parser, 'flash_bin_args', return_value=['write_flash']) as mock_args:
+            tool.download()
+    finally:
+        download_bin_module._get_bin_parser.cache_clear()
+
+    mock_args.assert_called_once()
+    assert [call[0][0][-3:] for call in mock_run.call_args_list] == [
+        ['-b', '921600', 'write_flash'],
+        ['-b', '115200', 'write_flash'],
+    ]
+
+
+@pytest.mark.parametrize('use_async', [False, True])
+@mock.patch.object(download_bin_module, 'compute_serial_port', return_value='/dev/ttyUSB0')
+def test_download_all_bauds_failed(_mock_port: mock.MagicMock, use_async: bool, tmp_path: Path) -> None:
+    """download() 与 download_async() 按相同顺序尝试所有波特率，全部失败时抛出 RuntimeError。"""
+    bin_dir, _ = _partition_bin_fixture(tmp_path)
+    bauds: List[str] = []
+
+    def _record_failure(args: List[str]) -> Tuple[int, str]:
+        bauds.append(args[args.index('-b') + 1])
+        return 2, 'A fatal error occurred\n'
+
+    async def _record_failure_async(args: List[str]) -> Tuple[int, str]:
+        return _record_failure(args)
+
+    download_bin_module._get_bin_parser.cache_clear()
+    try:
+        tool = DownBinTool(str(bin_dir), '/dev/ttyUSB0', baud=[921600, 115200], check_encryption=False)
+        # fmt: off
+        with mock.patch.object(download_bin_module, '_run_esptool', side_effect=_record_failure), \
+            mock.patch.object(download_bin_module, '_run_esptool_async', side_effect=_record_failure_async), \
+            pytest.raises(RuntimeError, match='Failed to download Bin to /dev/ttyUSB0'):
+            if use_async:
+                asyncio.run(tool.download_async())
+            else:
+                tool.download()
+        # fmt: on
+    finally:
+        download_bin_module._get_bin_parser.cache_clear()
+    assert bauds == ['921600', '115200']
+
+
 def test_download_bin_reexports_bin_path_to_dir() -> None:
     """download_bin 模块应继续暴露 bin_path_to_dir，且与 parse_bin_path 中实现为同一对象。"""
     assert download_bin_module.bin_path_to_dir is bin_path_to_dir_canonical
+
+
+def test_filter_esptool_log_keeps_last_writing_line() -> None:
+    """连续的 "Writing at" 进度行只保留最后一行。"""
+    log = (
+        'Compressed 1000 bytes\n'
+        'Writing at 0x00010000... (50 %)\n'
+        'Writing at 0x00010400... (100 %)\n'
+        'Wrote 1000 bytes\n'
+        'Writing at 0x00020000... (100 %)\n'
+        'Hash of data verified.\n'
+    )
+    assert download_bin_module._filter_esptool_log(log) == (
+        'Compressed 1000 bytes\n'
+        'Writing at 0x00010400... (100 %)\n'
+        'Wrote 1000 bytes\n'
+        'Writing at 0x00020000... (100 %)\n'
+        'Hash of data verified.\n'
+    )
+
+
+def test_filter_esptool_log_large_output() -> None:
+    """多 MB 的失败日志也应在线性时间内完成过滤。"""
+    progress = ''.join(f'Writing at 0x{0x10000 + i * 0x400:08x}... ({i * 100 // 99999} %)\n' for i in range(100000))
+    log = 'Compressed 1000 bytes\n' + progress + 'A fatal error occurred: Packet content transfer stopped'
+    assert len(log) > 3 * 1024 * 1024
+    assert download_bin_module._filter_esptool_log(log) == (
+        'Compressed 1000 bytes\n'
+        'Writing at 0x061b7c00... (100 %)\n'
+        'A fatal error occurred: Packet content transfer stopped'
+    )
+
+
+def _run_esptool_sync_or_async(use_async: bool, args: List[str]) -> Tuple[int, str]:
+    if use_async:
+        return asyncio.run(download_bin_module._run_esptool_async(args))
+    return download_bin_module._run_esptool(args)
+
+
+@pytest.mark.parametrize('use_async', [False, True])
+def test_run_esptool_returns_code_and_output(use_async: bool) -> None:
+    """_run_esptool(_async) 应返回退出码以及按输出顺序合并的 stdout 和 stderr。"""
+    args = [sys.executable, '-c', 'import sys; print("out", flush=True); sys.stderr.write("err\\n"); sys.exit(3)']
+    returncode, output = _run_esptool_sync_or_async(use_async, args)
+    assert returncode == 3
+    assert output.splitlines() == ['out', 'err']
+
+
+@pytest.mark.parametrize('use_async', [False, True])
+def test_run_esptool_drops_writing_progress_while_reading(use_async: bool) -> None:
+    """读取 esptool 输出时即丢弃连续 "Writing at" 行，只保留最后一行。"""
+    script = (
+        'print("Compressed 1000 bytes")\n'
+        'for i in range(1000):\n'
+        '    print(f"Writing at 0x{i:08x}... ({i // 10} %)")\n'
+        'print("Wrote 1000 bytes")\n'
+        'print("Writing at 0x00020000... (100 %)", end="")\n'
+    )
+    returncode, output = _run_esptool_sync_or_async(use_async, [sys.executable, '-c', script])
+    assert returncode == 0
+    assert output.splitlines() == [
+        'Compressed 1000 bytes',
+        'Writing at 0x000003e7... (99 %)',
+        'Wrote 1000 bytes',
+        'Writing at 0x00020000... (100 %)',
+    ]
@@ -1,23 +1,101 @@
+import functools
 import io
 import os
 import socket
+import threading
 from contextlib import redirect_stdout
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from typing import Iterator, Tuple
 
 import pytest
 
-from esptest.tools.http_download import download_file
+from esptest.tools.http_download import _download_block_size, _progress, download_file
 
 TEST_DOWNLOAD_FILE_URL = os.getenv('TEST_DOWNLOAD_FILE_URL', 'https://ci.espressif.cn:42348/cache/qa-test/pytest/1.txt')
 TEST_DOWNLOAD_FILE_NAME = os.getenv('TEST_DOWNLOAD_FILE_NAME', '1.txt')
 TEST_DOWNLOAD_FILE_SIZE = os.getenv('TEST_DOWNLOAD_FILE_SIZE', '57')
 
 
+@pytest.fixture
+def local_http_dir(tmp_path: Path) -> Iterator[Tuple[Path, str]]:
+    """Serve a tmp dir over http on localhost, yields the served dir and its url."""
+    served_dir = tmp_path / 'served'
+    served_dir.mkdir()
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=str(served_dir))
+    handler.log_message = lambda *args: None  # type: ignore
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield served_dir, f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+def test_download_file_local_server(tmp_path: Path, local_http_dir: Tuple[Path, str]) -> None:
+    served_dir, url = local_http_dir
+    # larger than one block, not a multiple of it
+    data = os.urandom(300 * 1024 + 7)
+    (served_dir / 'big.bin').write_bytes(data)
+    file_name = tmp_path / 'big.bin'
+    with redirect_stdout(io.StringIO()) as stdout:
+        download_file(f'{url}/big.bin', str(file_name), progress=True)
+    assert file_name.read_bytes() == data
+    assert '100.0%' in stdout.getvalue()
+
+
+def test_download_block_size() -> None:
+    assert _download_block_size(0) == 128 * 1024  # unknown length
+    assert _download_block_size(57) == 8 * 1024
+    assert _download_block_size(64 * 1024 * 1024) == 256 * 1024
+    assert _download_block_size(1024 * 1024 * 1024) == 1024 * 1024
+
+
+def test_progress_bar() -> None:
+    with redirect_stdout(io.StringIO()) as stdout:
+        _progress(0, 100)
+        _progress(50, 100)
+        _progress(120, 100)  # more than Content-Length
+        _progress(10, 0)
+    lines = stdout.getvalue().split('\r')[1:]
+    assert lines[0] == '[' + '-' * 50 + ']    0.0%'
+    assert lines[1] == '[' + '█' * 25 + '-' * 25 + ']   50.0%'
+    assert lines[2] == '[' + '█' * 50 + ']  100.0%'
+    assert lines[3] == 'Downloaded 10 bytes'
+
+
 def fake_create_connection(*args, **kwargs):  # type: ignore
     raise socket.timeout('timed out')
 
 
-def test_download_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+def test_download_file_local_server_small(tmp_path: Path, local_http_dir: Tuple[Path, str]) -> None:
+    served_dir, url = local_http_dir
+    (served_dir / '1.txt').write_bytes(b'1' * 57)
+    file_name = tmp_path / '1.txt'
+    download_file(f'{url}/1.txt', str(file_name), progress=False)
+    assert file_name.stat().st_size == 57
+    file_name.unlink()
+    with redirect_stdout(io.StringIO()) as stdout:
+        download_file(f'{url}/1.txt', str(file_name), progress=True)
+    assert '100.0%' in stdout.getvalue()
+    assert file_name.stat().st_size == 57
+
+
+def test_download_file_errors(
+    tmp_path: Path, local_http_dir: Tuple[Path, str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _, url = local_http_dir
+    # not found
+    with pytest.raises(OSError):  # urllib.error.HTTPError
+        download_file(f'{url}/not-exist.bin', str(tmp_path / 'not-exist.bin'), progress=True)
+    # downlad with timeout
+    monkeypatch.setattr(socket, 'create_connection', fake_create_connection)
+    with pytest.raises(OSError):  # urllib.error.URLError
+        download_file('http://example.com/fake.bin', str(tmp_path / 'fake.bin'), timeout=0.01, progress=True)
+
+
+@pytest.mark.skipif(not os.getenv('TEST_NETWORK'), reason='Only run this case if TEST_NETWORK is set.')
+def test_download_file(tmp_path: Path) -> None:
     file_name = tmp_path / TEST_DOWNLOAD_FILE_NAME
     download_file(TEST_DOWNLOAD_FILE_URL, str(file_name), progress=False)
     assert file_name.is_file()
@@ -30,15 +108,10 @@ def test_download_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
     assert file_name.is_file()
     assert file_name.stat().st_size == int(TEST_DOWNLOAD_FILE_SIZE)
 
-    # invalid url
+
+@pytest.mark.skipif(not os.getenv('TEST_NETWORK'), reason='Only run this case if TEST_NETWORK is set.')
+def test_download_file_invalid_url(tmp_path: Path) -> None:
     invalid_download_url = 'https://invalid-url.invalid/invalid-file'
     invalid_file_name = tmp_path / 'invalid-file'
     with pytest.raises(OSError):
         download_file(invalid_download_url, str(invalid_file_name), progress=True)
-
-    # downlad with timeout
-    monkeypatch.setattr(socket, 'create_connection', fake_create_connection)
-    fake_url = 'http://example.com/fake.bin'
-    fake_file_name = tmp_path / 'fake.bin'
-    with pytest.raises(OSError):  # urllib.error.URLError
-        download_file(fake_url, str(fake_file_name), timeout=0.01, progress=True)
@@ -19,11 +19,7 @@ else:
     new_callable = mock.PropertyMock
 
 
-def test_simple_check_requirements(
-    tmp_path: Path,
-    caplog: pytest.LogCaptureFixture,
-    monkeypatch: pytest.MonkeyPatch,
-) -> None:
+def test_simple_check_requirements(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
     reqs_content = """
 # Comment line
 pytest>=7.0.0
@@ -44,52 +40,65 @@ packaging>=23.0
             mock_version.side_effect = lambda pkg: {'pytest': '7.4.3', 'packaging': '23.2'}[pkg]
             assert pip_check.simple_check_requirements(reqs_file) is True
 
-    # Test invalid version
-    reqs_content = 'pytest>=8.0.0'
-    reqs_file.write_text(reqs_content)
+
+def test_simple_check_requirements_recursive(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    main_reqs = tmp_path / 'main-requirements.txt'
+    sub_reqs = tmp_path / 'sub-requirements.txt'
+
+    main_reqs.write_text(f'-r {sub_reqs}')
+    sub_reqs.write_text('pytest>=7.0.0')
 
     with mock.patch(patch_target, new_callable=new_callable) as mock_version:
         mock_version.return_value = '7.4.3'
-        assert pip_check.simple_check_requirements(str(reqs_file)) is False
-        assert 'pytest>=8.0.0' in caplog.text
+        assert pip_check.simple_check_requirements(main_reqs) is True
+
+        # only check the logs of the failed run
+        caplog.clear()
+        mock_version.return_value = '6.4.3'
+        assert pip_check.simple_check_requirements(str(main_reqs)) is False
+        assert 'pytest>=7.0.0' in caplog.text
 
-    # Test missing package
-    reqs_content = 'non-existent-package>=1.0.0'
+
+@pytest.mark.parametrize(
+    'reqs_content, installed_version, expected',
+    [
+        ('pytest>=8.0.0', '7.4.3', False),  # invalid version
+        ('non-existent-package>=1.0.0', PackageNotFoundError(), False),  # missing package
+        ('invalid=requirement=format', None, False),  # invalid requirement format
+        ('', None, True),  # empty file
+    ],
+)
+def test_simple_check_requirements_single_file(
+    tmp_path: Path,
+    caplog: pytest.LogCaptureFixture,
+    reqs_content: str,
+    installed_version: object,
+    expected: bool,
+) -> None:
+    reqs_file = tmp_path / 'requirements.txt'
     reqs_file.write_text(reqs_content)
 
     with mock.patch(patch_target, new_callable=new_callable) as mock_version:
-        mock_version.side_effect = PackageNotFoundError()
-        assert pip_check.simple_check_requirements(str(reqs_file)) is False
+        if isinstance(installed_version, Exception):
+            mock_version.side_effect = installed_version
+        else:
+            mock_version.return_value = installed_version
+        assert pip_check.simple_check_requirements(str(reqs_file)) is expected
+    if not expected:
         assert reqs_content in caplog.text
 
-    # Test invalid requirement format
-    reqs_content = 'invalid=requirement=format'
-    reqs_file.write_text(reqs_content)
-    assert pip_check.simple_check_requirements(str(reqs_file)) is False
-    assert reqs_content in caplog.text
-
-    # Test empty file
-    reqs_file.write_text('')
-    assert pip_check.simple_check_requirements(str(reqs_file)) is True
 
-    # Test recursive requirements
+def test_simple_check_requirements_looks_up_each_package_once(tmp_path: Path) -> None:
     main_reqs = tmp_path / 'main-requirements.txt'
     sub_reqs = tmp_path / 'sub-requirements.txt'
-
-    main_reqs.write_text(f'-r {sub_reqs}')
-    sub_reqs.write_text('pytest>=7.0.0')
+    main_reqs.write_text(f'pytest>=7.0.0\n-r {sub_reqs}\nPyTest<9\n')
+    sub_reqs.write_text('pytest>=7.0.0\n')
 
     with mock.patch(patch_target, new_callable=new_callable) as mock_version:
         mock_version.return_value = '7.4.3'
         assert pip_check.simple_check_requirements(main_reqs) is True
-
-    main_reqs.write_text(f'-r {sub_reqs}')
-    sub_reqs.write_text('pytest>=7.0.0')
-
-    with mock.patch(patch_target, new_callable=new_callable) as mock_version:
-        mock_version.return_value = '6.4.3'
-        assert pip_check.simple_check_requirements(str(main_reqs)) is False
-        assert 'pytest>=7.0.0' in caplog.text
+    if not new_callable:
+        mock_version.assert_called_once()
 
 
 def test_simple_check_requirements_invalid_version_format(
@@ -1,7 +1,11 @@
 import asyncio
+import io
+import sys
+from typing import Iterator
 from unittest import mock
 
 import pytest
+from rich.console import Console
 
 from esptest.devices.esp_serial import EspPortInfo
 from esptest.tools import uart_monitor
@@ -21,6 +25,13 @@ def _make_device() -> Device:
     )
 
 
+@pytest.fixture
+def detect_queue() -> Iterator['asyncio.Queue[Device]']:
+    queue: 'asyncio.Queue[Device]' = asyncio.Queue()
+    with mock.patch.object(uart_monitor, 'detect_queue', queue):
+        yield queue
+
+
 def test_update_chip_from_supported_port() -> None:
     chip = Chip()
     esp_port = EspPortInfo(
@@ -74,7 +85,7 @@ def test_debug_print_respects_debug_flag() -> None:
     uart_monitor.debug_logs.clear()
 
 
-def test_refresh_serial_ports_adds_new_device() -> None:
+def test_refresh_serial_ports_adds_new_device(detect_queue: 'asyncio.Queue[Device]') -> None:
     fake_port = mock.MagicMock()
     fake_port.usb_interface_path = '/sys/devices/usb/ttyUSB0'
     fake_port.location = '1-1:1.0'
@@ -84,8 +95,6 @@ def test_refresh_serial_ports_adds_new_device() -> None:
 
     uart_monitor.devices.clear()
     uart_monitor.recent_devices = []
-    while not uart_monitor.detect_queue.empty():
-        uart_monitor.detect_queue.get()
 
     with mock.patch.object(uart_monitor.list_ports, 'comports', return_value=[fake_port]):
         changed = uart_monitor.refresh_serial_ports(initial=True)
@@ -97,11 +106,9 @@ def test_refresh_serial_ports_adds_new_device() -> None:
     assert device.location == '1-1:1.0'
     assert device.chip.target == 'Detecting...'
     # newly discovered device must be queued for detection
-    assert not uart_monitor.detect_queue.empty()
+    assert not detect_queue.empty()
 
     uart_monitor.devices.clear()
-    while not uart_monitor.detect_queue.empty():
-        uart_monitor.detect_queue.get()
 
 
 def test_detect_port_chip_updates_chip_on_success() -> None:
@@ -154,7 +161,32 @@ def test_detect_chip_skips_lsof_when_missing() -> None:
     assert device.chip.target == 'esp32c3'
 
 
-def test_refresh_serial_ports_windows_without_usb_interface_path() -> None:
+def test_detect_chip_occupied_port_discards_lsof_output() -> None:
+    device = _make_device()
+    proc = mock.MagicMock(returncode=0)
+
+    async def _wait() -> int:
+        return 0
+
+    proc.wait = _wait
+
+    async def _fake_exec(*args, **kwargs):  # type: ignore
+        return proc
+
+    # fmt: off
+    with mock.patch.object(uart_monitor.asyncio, 'create_subprocess_exec', side_effect=_fake_exec) as exec_mock, \
+        mock.patch.object(uart_monitor, 'detect_port_info_no_cache') as detect_mock:
+        asyncio.run(uart_monitor.detect_chip(device))
+    # fmt: on
+
+    # only the return code of lsof is used, its output is not piped
+    assert exec_mock.call_args[1]['stdout'] == asyncio.subprocess.DEVNULL
+    assert exec_mock.call_args[1]['stderr'] == asyncio.subprocess.DEVNULL
+    detect_mock.assert_not_called()
+    assert device.chip.target == ''
+
+
+def test_refresh_serial_ports_windows_without_usb_interface_path(detect_queue: 'asyncio.Queue[Device]') -> None:
     fake_port = mock.MagicMock()
     fake_port.usb_interface_path = None
     fake_port.hwid = 'USB VID:PID=10C4:EA60'
@@ -165,8 +197,6 @@ def test_refresh_serial_ports_windows_without_usb_interface_path() -> None:
 
     uart_monitor.devices.clear()
     uart_monitor.recent_devices = []
-    while not uart_monitor.detect_queue.empty():
-        uart_monitor.detect_queue.get()
 
     # keep Python 3.7-compatible multi-context with-statement
     # fmt: off
@@ -182,20 +212,45 @@ def test_refresh_serial_ports_windows_without_usb_interface_path() -> None:
     assert device.location == 'COM3'
 
     uart_monitor.devices.clear()
-    while not uart_monitor.detect_queue.empty():
-        uart_monitor.detect_queue.get()
 
 
 def test_start_monitoring_win_polls_without_pyudev() -> None:
     # keep Python 3.7-compatible multi-context with-statement
     # fmt: off
-    with mock.patch.object(uart_monitor, '_bootstrap_monitoring') as bootstrap, \
-        mock.patch.object(uart_monitor, 'check_new_devices_status', side_effect=[None, KeyboardInterrupt()]), \
-        mock.patch.object(uart_monitor.time, 'sleep'):
+    with mock.patch.dict(sys.modules, {'pyudev': None}), \
+        mock.patch.object(uart_monitor, 'refresh_serial_ports') as refresh_mock, \
+        mock.patch.object(uart_monitor, 'display_serial_ports'), \
+        mock.patch.object(uart_monitor, 'POLL_INTERVAL', 0), \
+        mock.patch.object(uart_monitor, 'check_new_devices_status', side_effect=[None, KeyboardInterrupt()]) as poll:
         uart_monitor.start_monitoring_win()
     # fmt: on
 
-    bootstrap.assert_called_once()
+    refresh_mock.assert_called_once_with()
+    assert poll.call_count == 2
+
+
+def test_device_event_handler_refreshes_in_loop() -> None:
+    loop = mock.MagicMock()
+    uart_monitor.device_event_handler('add', mock.MagicMock(subsystem='usb'), loop)
+    loop.call_soon_threadsafe.assert_not_called()
+    uart_monitor.device_event_handler('add', mock.MagicMock(subsystem='tty'), loop)
+    loop.call_soon_threadsafe.assert_called_once_with(uart_monitor._schedule_refresh, loop)  # pylint: disable=protected-access
+
+
+def test_udev_events_are_coalesced_into_one_refresh() -> None:
+    loop = asyncio.new_event_loop()
+    try:
+        with mock.patch.object(uart_monitor, 'check_new_devices_status') as refresh_mock:
+            for _ in range(5):
+                uart_monitor._schedule_refresh(loop)  # pylint: disable=protected-access
+            loop.run_until_complete(asyncio.sleep(uart_monitor.UDEV_EVENT_DELAY * 2))
+            refresh_mock.assert_called_once()
+            # a later event schedules a new refresh
+            uart_monitor._schedule_refresh(loop)  # pylint: disable=protected-access
+            loop.run_until_complete(asyncio.sleep(uart_monitor.UDEV_EVENT_DELAY * 2))
+            assert refresh_mock.call_count == 2
+    finally:
+        loop.close()
 
 
 def test_start_monitoring_dispatches_by_platform() -> None:
@@ -219,6 +274,71 @@ def test_start_monitoring_dispatches_by_platform() -> None:
     win_mock.assert_not_called()
 
 
+def test_detect_workers_consume_queue() -> None:
+    batch = [_make_device() for _ in range(3)]
+    detected = []
+
+    async def _fake_detect_chip(device: Device) -> None:
+        detected.append(device)
+
+    async def _run_workers() -> None:
+        # the queue must be created in the running loop on Python < 3.10
+        queue: 'asyncio.Queue[Device]' = asyncio.Queue()
+        with mock.patch.object(uart_monitor, 'detect_queue', queue):
+            for device in batch:
+                queue.put_nowait(device)
+            workers = [asyncio.ensure_future(uart_monitor.detect_worker()) for _ in range(2)]
+            await queue.join()
+            for worker in workers:
+                worker.cancel()
+
+    # fmt: off
+    with mock.patch.object(uart_monitor, 'detect_chip', side_effect=_fake_detect_chip), \
+        mock.patch.object(uart_monitor, 'request_redraw') as redraw_mock:
+        asyncio.run(_run_workers())
+    # fmt: on
+
+    assert detected == batch
+    assert redraw_mock.call_count == len(batch)
+
+
+def test_redraw_requests_are_coalesced() -> None:
+    uart_monitor._redraw_pending.clear()  # pylint: disable=protected-access
+    # fmt: off
+    with mock.patch.object(uart_monitor, 'display_serial_ports') as display_mock:
+        assert not uart_monitor._redraw_if_requested()  # pylint: disable=protected-access
+        for _ in range(10):
+            uart_monitor.request_redraw()
+        assert uart_monitor._redraw_if_requested()  # pylint: disable=protected-access
+        assert not uart_monitor._redraw_if_requested()  # pylint: disable=protected-access
+    # fmt: on
+    display_mock.assert_called_once()
+
+
+def test_display_serial_ports_renders_rows() -> None:
+    device = _make_device()
+    device.chip = Chip(target='esp32c3', mac='aa:bb', description='could not open port: [Errno 16] busy')
+    recent = _make_device()
+    recent.location = 'loc-recent'
+    console = Console(file=io.StringIO(), width=300)
+    uart_monitor.devices.clear()
+    uart_monitor.devices['loc-a'] = device
+    # fmt: off
+    with mock.patch.object(uart_monitor, 'console', console), \
+        mock.patch.object(uart_monitor, 'recent_devices', [recent]), \
+        mock.patch.object(uart_monitor.time, 'time', return_value=100.0):
+        uart_monitor.display_serial_ports()
+    # fmt: on
+    uart_monitor.devices.clear()
+
+    output = console.file.getvalue()  # type: ignore
+    assert 'loc-a' in output
+    assert 'esp32c3' in output
+    assert 'loc-recent' in output
+    # description is not parsed as console markup
+    assert '[Errno 16] busy' in output
+
+
 if __name__ == '__main__':
     # Breakpoints do not work with coverage, disable coverage for debugging
     pytest.main([__file__, '--no-cov', '--log-cli-level=DEBUG'])
@@ -2,6 +2,7 @@ import json
 import logging
 import os
 import shutil
+import sys
 import zipfile
 from pathlib import Path
 from unittest.mock import MagicMock, patch
@@ -13,9 +14,10 @@ from packaging.version import Version
 
 import esptest.utility.parse_bin_path as parse_bin_path_module
 from esptest.all import DutConfig
-from esptest.common.compat_typing import Generator, List, Tuple
-from esptest.utility.merged_bin import probe_merged_bin
+from esptest.common.compat_typing import IO, List, Tuple
+from esptest.utility.merged_bin import PartitionInfo, probe_merged_bin
 from esptest.utility.parse_bin_path import (
+    DEFAULT_GEN_PART_TOOL,
     ParseBinPath,
     SDKConfig,
     _parse_partition_table_to_csv,
@@ -25,6 +27,8 @@ from esptest.utility.parse_bin_path import (
 )
 
 TEST_FILE_PATH = Path(__file__).parent / '_files'
+# content of the 24K nvs partition after erase
+NVS_ERASED_DATA = b'\xff' * (24 * 1024)
 
 
 def test_parse_partition_table_does_not_write_to_console(tmp_path: Path, capfd: pytest.CaptureFixture) -> None:
@@ -45,14 +49,55 @@ def test_parse_partition_table_does_not_write_to_console(tmp_path: Path, capfd:
     assert captured.err == ''
 
 
-@pytest.fixture()
-def test_bin_path() -> Generator[Path, None, None]:
+def test_parse_partition_table_uses_current_interpreter(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    part_csv = tmp_path / 'partition-table.csv'
+    calls = []
+
+    def _fake_run(cmd: List[str], **kwargs: object) -> MagicMock:
+        calls.append((cmd, kwargs))
+        part_csv.write_text('nvs,data,nvs,0x9000,24K,\n', encoding='utf-8')
+        return MagicMock(returncode=0, stdout=b'')
+
+    monkeypatch.setattr(parse_bin_path_module.subprocess, 'run', _fake_run)
+    _parse_partition_table_to_csv('gen_esp32part.py', 'partition-table.bin', str(part_csv))
+    assert calls[0][0] == [sys.executable, 'gen_esp32part.py', 'partition-table.bin', str(part_csv)]
+    assert calls[0][1]['check'] is True
+
+
+def test_parse_partition_table_in_process(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    part_bin = tmp_path / 'partition-table.bin'
+    gen_esp32part = parse_bin_path_module.load_gen_esp32part(DEFAULT_GEN_PART_TOOL)
+    table = gen_esp32part.PartitionTable.from_csv('nvs,data,nvs,0x9000,24K,\n')
+    part_bin.write_bytes(table.to_binary())
+    monkeypatch.setattr(parse_bin_path_module.subprocess, 'run', MagicMock(side_effect=AssertionError('subprocess')))
+
+    # bundled tool and a copy of it (e.g. from IDF_PATH)
+    idf_parttool = tmp_path / 'idf' / 'gen_esp32part.py'
+    idf_parttool.parent.mkdir()
+    shutil.copy(DEFAULT_GEN_PART_TOOL, str(idf_parttool))
+    for parttool in (DEFAULT_GEN_PART_TOOL, str(idf_parttool)):
+        part_csv = tmp_path / 'partition-table.csv'
+        assert _parse_partition_table_to_csv(parttool, str(part_bin), str(part_csv)) == str(part_csv)
+        partitions = parse_bin_path_module._parse_partition_table_csv_file(part_csv)
+        assert [(p.name, p.offset, p.size) for p in partitions] == [('nvs', '0x9000', 24 * 1024)]
+        part_csv.unlink()
+
+
+@pytest.fixture(scope='session')
+def test_bin_template(tmp_path_factory: pytest.TempPathFactory) -> Path:
     # removed sdkconfig, keep sdkconfig.json
-    bin_path = TEST_FILE_PATH / 'test-bin'
+    bin_path = tmp_path_factory.mktemp('test-bin-template') / 'test-bin'
     with zipfile.ZipFile(TEST_FILE_PATH / 'test-bin.zip', 'r') as zip_ref:
         zip_ref.extractall(bin_path)
-    yield bin_path
-    shutil.rmtree(bin_path)
+    return bin_path
+
+
+@pytest.fixture()
+def test_bin_path(test_bin_template: Path, tmp_path: Path) -> Path:
+    # the zip is extracted once, tests may modify the files so each test gets its own copy
+    bin_path = tmp_path / 'test-bin'
+    shutil.copytree(str(test_bin_template), str(bin_path))
+    return bin_path
 
 
 def test_dut_config_baudrate(test_bin_path: Path) -> None:
@@ -102,6 +147,58 @@ def test_get_baud_from_bin_path_fallback_checks_both_sdkconfig_paths(tmp_path: P
     assert get_baud_from_bin_path(tmp_path) == 115200
 
 
+def test_sdkconfig_text_values(tmp_path: Path) -> None:
+    sdkconfig_file = tmp_path / 'sdkconfig'
+    sdkconfig_file.write_text(
+        '#\n'
+        '# Serial flasher config\n'
+        'CONFIG_ESPTOOLPY_NO_STUB=y\n'
+        '# CONFIG_ESPTOOLPY_OCT_FLASH is not set\n'
+        'CONFIG_ESPTOOLPY_FLASHSIZE="4MB"\n'
+        'CONFIG_APP_PROJECT_VER=\n'
+        'CONFIG_ESP_CONSOLE_UART_BAUDRATE=115200\n'
+        'CONFIG_PARTITION_TABLE_OFFSET=0x8000\n',
+        encoding='utf-8',
+    )
+    assert SDKConfig.from_file(sdkconfig_file) == {
+        'ESPTOOLPY_NO_STUB': True,
+        'ESPTOOLPY_OCT_FLASH': False,
+        'ESPTOOLPY_FLASHSIZE': '4MB',
+        'ESP_CONSOLE_UART_BAUDRATE': 115200,
+        'PARTITION_TABLE_OFFSET': '0x8000',
+        'APP_PROJECT_VER': '',
+    }
+
+
+def test_sdkconfig_keys_interned(tmp_path: Path) -> None:
+    sdkconfig_file = tmp_path / 'sdkconfig'
+    sdkconfig_file.write_text(
+        'CONFIG_ESP_CONSOLE_UART_BAUDRATE=115200\n# CONFIG_SECURE_BOOT is not set\n', encoding='utf-8'
+    )
+    sdkconfig_json = tmp_path / 'sdkconfig.json'
+    sdkconfig_json.write_text('{"ESP_CONSOLE_UART_BAUDRATE": 115200}', encoding='utf-8')
+    for config in (SDKConfig.from_file(sdkconfig_file), SDKConfig.from_file(sdkconfig_json)):
+        assert all(sys.intern(key) is key for key in config)
+        assert not hasattr(config, '__dict__')
+
+
+def test_sdkconfig_from_file_cached_until_changed(tmp_path: Path) -> None:
+    sdkconfig_file = tmp_path / 'sdkconfig'
+    sdkconfig_file.write_text('CONFIG_CONSOLE_UART_BAUDRATE=115200\n', encoding='utf-8')
+    with patch.object(
+        parse_bin_path_module, '_parse_sdkconfig_file', wraps=parse_bin_path_module._parse_sdkconfig_file
+    ) as mock_parse:
+        first = SDKConfig.from_file(sdkconfig_file)
+        # callers may modify the result, it must not leak into the cache
+        first['CONSOLE_UART_BAUDRATE'] = 0
+        assert SDKConfig.from_file(str(sdkconfig_file)).console_baud == 115200
+        mock_parse.assert_called_once()
+
+        sdkconfig_file.write_text('CONFIG_CONSOLE_UART_BAUDRATE=2000000\n', encoding='utf-8')
+        assert SDKConfig.from_file(sdkconfig_file).console_baud == 2000000
+    assert mock_parse.call_count == 2
+
+
 def test_sdkconfig(test_bin_path: Path) -> None:
     # test loading JSON config
     json_config = test_bin_path / 'config' / 'sdkconfig.json'
@@ -166,7 +263,37 @@ def test_parse_bin_path(test_bin_path: Path) -> None:
     with open(nvs_bin, 'rb') as f:
         nvs_data = f.read()
         assert len(nvs_data) == 24 * 1024
-        assert nvs_data == b'\xff' * 24 * 1024
+        assert nvs_data == NVS_ERASED_DATA
+
+
+def test_gen_erase_nvs_bin_reused(test_bin_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    bin_parser = ParseBinPath(test_bin_path)
+    nvs = PartitionInfo('nvs', 'data', 'nvs', '0x9000', 3 * 4096 + 100, '')  # not a multiple of the chunk size
+    monkeypatch.setattr(bin_parser, 'get_partition_info', lambda name: nvs)
+    offset, nvs_bin = bin_parser._gen_erase_nvs_bin()  # pylint: disable=protected-access
+    try:
+        assert offset == '0x9000'
+        assert Path(nvs_bin).read_bytes() == b'\xff' * (3 * 4096 + 100)
+        # reused for the same size
+        assert bin_parser._gen_erase_nvs_bin()[1] == nvs_bin  # pylint: disable=protected-access
+    finally:
+        os.remove(nvs_bin)
+    # generated again if removed from the tmp dir
+    _, nvs_bin = bin_parser._gen_erase_nvs_bin()  # pylint: disable=protected-access
+    assert Path(nvs_bin).read_bytes() == b'\xff' * (3 * 4096 + 100)
+
+
+def test_get_erase_bin_regenerates_only_stale_size() -> None:
+    """Erase bins of all sizes share one per-process dir, a removed bin does not drop the others."""
+    small = parse_bin_path_module._get_erase_bin(4096)
+    large = parse_bin_path_module._get_erase_bin(8192)
+    assert Path(small).parent == Path(large).parent == Path(parse_bin_path_module._erase_bin_dir())
+    os.remove(large)
+    with patch.object(parse_bin_path_module, '_gen_erase_bin', wraps=parse_bin_path_module._gen_erase_bin) as mock_gen:
+        assert parse_bin_path_module._get_erase_bin(4096) == small
+        assert parse_bin_path_module._get_erase_bin(8192) == large
+    mock_gen.assert_called_once_with(large, 8192)
+    assert Path(large).read_bytes() == b'\xff' * 8192
 
 
 def test_parse_bin_gen_part(test_bin_path: Path) -> None:
@@ -211,6 +338,114 @@ def test_parse_partitions_when_partition_table_dir_read_only(test_bin_path: Path
     assert parser.partition_table_csv_path.is_file()
 
 
+def test_invalid_flasher_args_parsed_once(test_bin_path: Path) -> None:
+    (test_bin_path / 'flasher_args.json').write_text('{invalid json', encoding='utf-8')
+    parser = ParseBinPath(test_bin_path)
+    with patch.object(parser, '_parse_flash_args', wraps=parser._parse_flash_args) as mock_parse:
+        assert parser.flasher_args == {}
+        assert parser.flasher_args == {}
+    mock_parse.assert_called_once()
+
+
+def test_sdkconfig_falls_back_to_text_file(test_bin_path: Path) -> None:
+    (test_bin_path / 'config' / 'sdkconfig.json').unlink()
+    (test_bin_path / 'sdkconfig').write_text('CONFIG_IDF_TARGET="esp32c5"\n', encoding='utf-8')
+    assert ParseBinPath(test_bin_path).sdkconfig == {'IDF_TARGET': 'esp32c5'}
+    (test_bin_path / 'sdkconfig').unlink()
+    with pytest.raises(FileNotFoundError):
+        ParseBinPath(test_bin_path).sdkconfig  # pylint: disable=expression-not-assigned
+
+
+def test_flash_meta_read_once(test_bin_path: Path) -> None:
+    parser = ParseBinPath(test_bin_path)
+    from_flasher_args = parse_bin_path_module._FlashMeta.from_flasher_args
+    with patch.object(parse_bin_path_module._FlashMeta, 'from_flasher_args', wraps=from_flasher_args) as mock_meta:
+        args = parser.flash_bin_args(erase_nvs=False)
+        assert parser.flash_bin_args(erase_nvs=False) == args
+        assert parser.erase_flash_args()[-1] == 'erase_flash'
+    mock_meta.assert_called_once()
+    offset, bin_file = next(iter(parser.flasher_args['flash_files'].items()))
+    assert args[args.index(offset) + 1] == os.path.join(parser.bin_path, bin_file)
+
+
+def test_parttool_path_resolved_once(test_bin_path: Path) -> None:
+    parser = ParseBinPath(test_bin_path, parttool=DEFAULT_GEN_PART_TOOL)
+    with patch.object(parser, '_find_parttool', wraps=parser._find_parttool) as mock_find:
+        assert parser.parttool_path == os.path.realpath(DEFAULT_GEN_PART_TOOL)
+        assert parser.parttool_path == os.path.realpath(DEFAULT_GEN_PART_TOOL)
+    mock_find.assert_called_once()
+
+
+def test_parse_partitions_is_cached(test_bin_path: Path) -> None:
+    """partition-table.csv is parsed once until it changes, callers get their own list."""
+    parser = ParseBinPath(test_bin_path)
+    part_csv = test_bin_path / 'partition_table' / 'partition-table.csv'
+    with patch.object(
+        parse_bin_path_module,
+        '_parse_partition_table_csv_file',
+        wraps=parse_bin_path_module._parse_partition_table_csv_file,
+    ) as mock_parse:
+        partitions = parser.parse_partitions()
+        partitions.clear()
+        assert parser.get_partition_info('nvs').name == 'nvs'
+        assert len(parser.parse_partitions()) == 6
+        mock_parse.assert_called_once()
+        # rebuilt csv is picked up by the same instance
+        part_csv.write_text('nvs,data,nvs,0x9000,24K,\n', encoding='utf-8')
+        assert [p.name for p in parser.parse_partitions()] == ['nvs']
+    assert mock_parse.call_count == 2
+
+
+def test_parse_partition_table_csv_shared_until_changed(test_bin_path: Path) -> None:
+    part_csv = test_bin_path / 'partition_table' / 'partition-table.csv'
+    with patch.object(
+        parse_bin_path_module,
+        '_parse_partition_table_csv_file',
+        wraps=parse_bin_path_module._parse_partition_table_csv_file,
+    ) as mock_parse:
+        assert len(ParseBinPath(test_bin_path).parse_partitions()) == 6
+        assert len(ParseBinPath(test_bin_path).parse_partitions()) == 6
+        mock_parse.assert_called_once()
+        part_csv.write_text('nvs,data,nvs,0x9000,24K,\n', encoding='utf-8')
+        assert [p.name for p in ParseBinPath(test_bin_path).parse_partitions()] == ['nvs']
+    assert mock_parse.call_count == 2
+
+
+def test_parse_partition_table_csv_lines(test_bin_path: Path, tmp_path: Path) -> None:
+    part_csv = tmp_path / 'partition-table.csv'
+    part_csv.write_text(
+        '# Name, Type, SubType, Offset, Size, Flags\n'
+        'nvs,data,nvs,0x9000,24K,\n'
+        'phy_init, data, phy, 0xf000, 4096,\n'
+        'factory,app,factory,0x10000,2M,encrypted,readonly\n'
+        'short,data\n'
+        'storage,data,spiffs,0x210000,0x1000,\n',
+        encoding='utf-8',
+    )
+    partitions = ParseBinPath(test_bin_path)._parse_partition_table_csv(part_csv)
+    assert [(p.name, p.size, p.flags) for p in partitions] == [
+        ('nvs', 24 * 1024, ''),
+        ('phy_init', 4096, ''),
+        ('factory', 2 * 1024 * 1024, 'encrypted,readonly'),
+        ('storage', 0x1000, ''),
+    ]
+
+
+def test_gen_partition_csv_in_process_keeps_quiet_flag(
+    test_bin_path: Path, tmp_path: Path, capfd: pytest.CaptureFixture
+) -> None:
+    """The bundled gen_esp32part is shared with merged_bin, its ``quiet`` global must be restored."""
+    gen_esp32part = parse_bin_path_module.load_gen_esp32part(DEFAULT_GEN_PART_TOOL)
+    assert gen_esp32part.quiet is False
+    part_csv = tmp_path / 'partition-table.csv'
+    parse_bin_path_module._gen_partition_csv_in_process(
+        DEFAULT_GEN_PART_TOOL, str(test_bin_path / 'partition_table' / 'partition-table.bin'), str(part_csv)
+    )
+    assert 'nvs' in part_csv.read_text(encoding='utf-8')
+    assert gen_esp32part.quiet is False
+    assert capfd.readouterr().err == ''
+
+
 def test_parse_partitions_raises_when_generated_csv_not_found(
     test_bin_path: Path, monkeypatch: pytest.MonkeyPatch
 ) -> None:
@@ -219,6 +454,8 @@ def test_parse_partitions_raises_when_generated_csv_not_found(
     os.remove(str(partition_file))
     assert not partition_file.is_file()
 
+    # run gen_esp32part.py as a script
+    monkeypatch.setattr(parse_bin_path_module, '_gen_partition_csv_in_process', MagicMock(side_effect=ImportError))
     monkeypatch.setattr(
         parse_bin_path_module.subprocess,
         'run',
@@ -241,6 +478,99 @@ def test_bin_path_to_dir() -> None:
     assert parse_bin_path.chip == 'esp32c5'
 
 
+def test_bin_path_to_dir_reuses_cached_extraction(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """zip is extracted to a stable cache dir once, later calls (new processes) reuse it."""
+    monkeypatch.setattr(parse_bin_path_module, '_tmp_dir', lambda: str(tmp_path))
+    zip_file = str(TEST_FILE_PATH / 'test-bin.zip')
+    assert parse_bin_path_module._bin_path_hash(zip_file) == parse_bin_path_module._bin_path_hash(zip_file)
+
+    bin_path_to_dir_or_bin.cache_clear()
+    first = bin_path_to_dir(zip_file)
+    assert Path(first).parent.parent == tmp_path.resolve()
+
+    bin_path_to_dir_or_bin.cache_clear()
+    with patch.object(parse_bin_path_module.zipfile, 'ZipFile', side_effect=AssertionError('extracted again')):
+        assert bin_path_to_dir(zip_file) == first
+    bin_path_to_dir_or_bin.cache_clear()
+
+
+def test_bin_path_to_dir_http_zip_extracts_from_stream(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """http(s) zip is extracted from the downloaded stream, no .zip copy is saved."""
+    monkeypatch.setattr(parse_bin_path_module, '_tmp_dir', lambda: str(tmp_path))
+    url = 'https://example.com/firmware/test-bin.zip?token=1'
+
+    def _fake_download(remote: str, out_file: IO[bytes], timeout: object = None, progress: bool = True) -> None:
+        assert remote == url
+        out_file.write((TEST_FILE_PATH / 'test-bin.zip').read_bytes())
+
+    monkeypatch.setattr(parse_bin_path_module, '_url_validators', lambda _url: '"etag-1"||1024')
+
+    bin_path_to_dir_or_bin.cache_clear()
+    with patch.object(parse_bin_path_module, 'download_fileobj', side_effect=_fake_download) as mock_download:
+        bin_path = bin_path_to_dir(url)
+        assert Path(bin_path).name == 'test-bin'
+        assert ParseBinPath(bin_path).chip == 'esp32c5'
+        assert not list(tmp_path.rglob('*.zip'))
+        bin_path_to_dir_or_bin.cache_clear()
+        assert bin_path_to_dir(url) == bin_path
+    mock_download.assert_called_once()
+    bin_path_to_dir_or_bin.cache_clear()
+
+
+@pytest.mark.parametrize('second_validators', ['"etag-2"||1024', ''])
+def test_bin_path_to_dir_http_zip_revalidated(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, second_validators: str
+) -> None:
+    """Re-published urls (new ETag) and urls without validators are downloaded again."""
+    monkeypatch.setattr(parse_bin_path_module, '_tmp_dir', lambda: str(tmp_path))
+    url = 'https://example.com/firmware/latest/test-bin.zip'
+    validators = iter(['"etag-1"||1024', second_validators])
+    monkeypatch.setattr(parse_bin_path_module, '_url_validators', lambda _url: next(validators))
+
+    def _fake_download(remote: str, out_file: IO[bytes], timeout: object = None, progress: bool = True) -> None:
+        out_file.write((TEST_FILE_PATH / 'test-bin.zip').read_bytes())
+
+    bin_path_to_dir_or_bin.cache_clear()
+    with patch.object(parse_bin_path_module, 'download_fileobj', side_effect=_fake_download) as mock_download:
+        first = bin_path_to_dir(url)
+        bin_path_to_dir_or_bin.cache_clear()
+        assert bin_path_to_dir(url) != first
+    assert mock_download.call_count == 2
+    bin_path_to_dir_or_bin.cache_clear()
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='posix permissions')
+def test_tmp_dir_is_private(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """The cache dir is only accessible by the current user, a shared one is not used."""
+    monkeypatch.setattr(parse_bin_path_module.tempfile, 'gettempdir', lambda: str(tmp_path))
+    parse_bin_path_module._tmp_dir.cache_clear()
+    try:
+        cache_dir = Path(parse_bin_path_module._tmp_dir())
+        assert cache_dir.parent == tmp_path
+        assert cache_dir.stat().st_mode & 0o777 == 0o700
+
+        # pre-created by someone else with open permissions
+        cache_dir.chmod(0o777)
+        parse_bin_path_module._tmp_dir.cache_clear()
+        fallback_dir = Path(parse_bin_path_module._tmp_dir())
+        assert fallback_dir != cache_dir
+        assert fallback_dir.stat().st_mode & 0o777 == 0o700
+    finally:
+        parse_bin_path_module._tmp_dir.cache_clear()
+
+
+def test_evict_cache(tmp_path: Path) -> None:
+    """Cache entries not used for max_age seconds are removed."""
+    old_entry = tmp_path / 'old'
+    new_entry = tmp_path / 'new'
+    for entry in (old_entry, new_entry):
+        (entry / 'test-bin').mkdir(parents=True)
+    os.utime(old_entry, (0, 0))
+    parse_bin_path_module._evict_cache(str(tmp_path), 3600)
+    assert not old_entry.exists()
+    assert new_entry.is_dir()
+
+
 def _try_esptool_merge_bin(
     addr_data: List[Tuple[int, str]],
     chip: str,
@@ -570,7 +900,7 @@ def test_flash_partition_args_nvs_empty_generates_erase_bin(
     parse_bin_path = ParseBinPath(test_bin_path)
     args = parse_bin_path.flash_partition_args({'nvs': ''})
     assert out.is_file()
-    assert out.read_bytes() == b'\xff' * (24 * 1024)
+    assert out.read_bytes() == NVS_ERASED_DATA
     assert args[-2] == '0x9000'
     assert args[-1] == str(out)
 
@@ -1,25 +1,25 @@
 import os
 import sys
 
-from packaging.version import Version
-
-PUBLISH_DEV_VERSION = os.getenv('PUBLISH_DEV_VERSION')
-
 
 def check_dev_version() -> None:
-    if not PUBLISH_DEV_VERSION:
+    publish_dev_version = os.getenv('PUBLISH_DEV_VERSION')
+    if not publish_dev_version:
         return
-    if PUBLISH_DEV_VERSION == 'auto':
+    if publish_dev_version == 'auto':
         return
+    # lazy import, only needed when a dev version is given
+    from packaging.version import Version
+
     try:
-        ver = Version(PUBLISH_DEV_VERSION)
+        ver = Version(publish_dev_version)
         if ver.is_devrelease or ver.is_prerelease:
             return
         print('PUBLISH_DEV_VERSION must be dev or pre, eg:')
         print(' - 1.2.3a1')
         print(' - 1.2.3.dev2')
     except ValueError:
-        print(f'Invailed Version: {PUBLISH_DEV_VERSION}')
+        print(f'Invailed Version: {publish_dev_version}')
         sys.exit(1)
 
 